@@ -3,12 +3,9 @@
 3D animated visualization of spike neural network showing spiking process
 """
 
-import json
 import sys
 import argparse
 import numpy as np
-import os
-import re
 
 try:
     import matplotlib.pyplot as plt
@@ -19,28 +16,39 @@ except ImportError:
     print("Please install it using: pip install matplotlib")
     sys.exit(1)
 
-try:
-    import networkx as nx
-except ImportError:
-    print("ERROR: networkx not found.")
-    print("Please install it using: pip install networkx")
-    sys.exit(1)
+from frame_store import open_frame_store
+from network_graph import CompactGraph, layered_layout
+from network_render import RetainedRenderer3D, node_style
+from edge_lod import EdgeLOD, add_lod_arguments, lod_options
+from frame_export import export_animation
+from live_stream import is_live_address, open_live_stream
 
 
 class Spike3DAnimator:
-    def __init__(self, base_filename):
+    def __init__(self, base_filename, cache_frames=32, prefetch=4, lod_options=None):
         """
         Initialize the 3D spike animator
         
         Args:
-            base_filename: Base filename (e.g., 'spike_animation_step0.json')
+            base_filename: Base filename (e.g., 'spike_animation_step0.json'),
+                run file (e.g., 'spike_animation.snnr') or live address
+                ('shm:<name>', 'unix:<path>' or a named pipe)
+            cache_frames: Maximum number of decoded frames kept in memory
+            prefetch: Number of frames decoded ahead in the background
+            lod_options: EdgeLOD keyword arguments for large networks (None = all edges)
         """
         self.base_filename = base_filename
-        self.time_steps = []
+        self.cache_frames = cache_frames
+        self.prefetch = prefetch
+        self.lod_options = lod_options or {}
+        self.time_steps = None  # FrameStore, decodes frames on demand
+        self.stream = None  # Live frame source instead of files
         self.G = None
+        self.lod = None
         self.pos_3d = None
         self.fig = None
         self.ax = None
+        self.renderer = None  # Persistent artists, created on the first frame
         self.current_step = 0
         
         self._load_time_series()
@@ -48,235 +56,178 @@ class Spike3DAnimator:
         self._calculate_3d_layout()
     
     def _load_time_series(self):
-        """Load all time step files"""
-        match = re.search(r'(.+)_step\d+\.json$', self.base_filename)
-        if match:
-            base_path = match.group(1)
-            pattern = f"{base_path}_step(\\d+)\\.json"
-        else:
-            base_path = self.base_filename.replace('.json', '')
-            pattern = f"{base_path}_step(\\d+)\\.json"
-        
-        step_files = []
-        dir_path = os.path.dirname(self.base_filename) if os.path.dirname(self.base_filename) else '.'
-        
-        if not os.path.exists(dir_path):
-            dir_path = '.'
-        
-        for filename in os.listdir(dir_path):
-            match = re.match(pattern, filename)
-            if match:
-                step_num = int(match.group(1))
-                filepath = os.path.join(dir_path, filename)
-                step_files.append((step_num, filepath))
-        
-        step_files.sort(key=lambda x: x[0])
-        
-        if not step_files:
-            raise ValueError(f"No time step files found matching pattern: {pattern}")
-        
-        for step_num, filepath in step_files:
-            with open(filepath, 'r') as f:
-                self.time_steps.append(json.load(f))
-        
-        print(f"Loaded {len(self.time_steps)} time steps")
+        """Index all time steps of a run file or step files (frames are decoded lazily)"""
+        if is_live_address(self.base_filename):
+            print(f"Waiting for a simulator on {self.base_filename}...")
+            self.stream = open_live_stream(self.base_filename)
+            self.time_steps = [self.stream.wait()]  # Holds the newest live frame
+            print("Receiving live frames")
+            return
+        
+        self.time_steps = open_frame_store(self.base_filename,
+                                           cache_frames=self.cache_frames,
+                                           prefetch=self.prefetch)
+        
+        if not len(self.time_steps):
+            raise ValueError(f"No time step files found for: {self.base_filename}")
+        
+        print(f"Indexed {len(self.time_steps)} time steps")
     
     def _build_graph(self):
-        """Build networkx graph from first time step"""
-        self.G = nx.DiGraph()
-        
-        # Use first time step to establish structure
-        data = self.time_steps[0]
-        
-        for neuron in data['neurons']:
-            self.G.add_node(neuron['id'])
-        
-        for neuron in data['neurons']:
-            for conn in neuron['connections']:
-                self.G.add_edge(neuron['id'], conn['target'], weight=conn['weight'])
+        """Build the compact graph from the first time step"""
+        self.G = CompactGraph.from_snapshot(self.time_steps[0])
+        self.lod = EdgeLOD(self.G, **self.lod_options)
     
     def _calculate_3d_layout(self):
         """Calculate 3D positions for neurons (layered layout)"""
-        in_degree = dict(self.G.in_degree())
-        out_degree = dict(self.G.out_degree())
-        
-        input_nodes = [n for n in self.G.nodes() if in_degree[n] == 0]
-        output_nodes = [n for n in self.G.nodes() if out_degree[n] == 0]
-        hidden_nodes = [n for n in self.G.nodes() 
-                       if n not in input_nodes and n not in output_nodes]
-        
-        self.pos_3d = {}
-        
-        # Input layer (z=0)
-        for i, node_id in enumerate(input_nodes):
-            x = -2.0 + (i % 7) * 0.6
-            y = -1.0 + (i // 7) * 0.6
-            self.pos_3d[node_id] = np.array([x, y, 0])
+        self.pos_3d = layered_layout(self.G)
+    
+    def _init_renderer(self):
+        """Create the persistent artists for the current axis"""
+        self.ax.set_xlabel('X', fontsize=12)
+        self.ax.set_ylabel('Y', fontsize=12)
+        self.ax.set_zlabel('Z (Layer)', fontsize=12)
+        self.ax.set_title('3D Spike Network Animation', fontsize=14, fontweight='bold')
         
-        # Hidden layer (z=1)
-        for i, node_id in enumerate(hidden_nodes):
-            angle = 2 * np.pi * i / len(hidden_nodes)
-            radius = 1.5
-            self.pos_3d[node_id] = np.array([
-                radius * np.cos(angle),
-                radius * np.sin(angle),
-                1
-            ])
+        # Without learning the weights never change, so the edges can stay in
+        # the blit background instead of being redrawn every frame
+        if self.stream is not None:
+            static_edges = not getattr(self.stream, 'has_weights', True)
+        else:
+            static_edges = np.array_equal(self.time_steps[0].weights, self.time_steps[-1].weights)
         
-        # Output layer (z=2)
-        for i, node_id in enumerate(output_nodes):
-            x = -1.5 + i * 0.3
-            y = 2.0
-            self.pos_3d[node_id] = np.array([x, y, 2])
-    
-    def _get_neuron_data(self, step_idx):
-        """Get neuron data for a specific time step"""
-        data = self.time_steps[step_idx]
-        neuron_map = {n['id']: n for n in data['neurons']}
-        return neuron_map
+        # Output neurons get a label with their spike count
+        self.renderer = RetainedRenderer3D(self.ax, self.pos_3d, self.G.sources, self.G.targets,
+                                           label_nodes=self.G.layers()[2],
+                                           static_edges=static_edges, lod=self.lod)
+        return self.renderer.artists
     
     def _draw_frame(self, step_idx):
-        """Draw a single frame of the animation"""
-        self.ax.clear()
-        
-        neuron_map = self._get_neuron_data(step_idx)
-        
-        # Prepare node data
-        node_colors = []
-        node_sizes = []
-        node_positions = []
-        
-        for node_id in self.G.nodes():
-            neuron_data = neuron_map.get(node_id, {})
-            potential = neuron_data.get('potential', 0.0)
-            spiked = neuron_data.get('spiked', False)
-            
-            pos = self.pos_3d[node_id]
-            node_positions.append(pos)
-            
-            # Color based on state
-            if spiked:
-                node_colors.append('#FF0000')  # Bright red for spiked
-                node_sizes.append(300)
-            else:
-                # Color intensity based on potential
-                intensity = min(1.0, max(0.0, potential))
-                node_colors.append(plt.cm.viridis(intensity))
-                node_sizes.append(100 + intensity * 100)
+        """Update the persistent artists to show one time step"""
+        return self._draw_state(self.time_steps[step_idx],
+                                f'Step {step_idx}/{len(self.time_steps)-1}')
+    
+    def _draw_live_frame(self):
+        """Show the newest live frame (nothing is redrawn if none arrived)"""
+        data = self.stream.latest()
+        if data is None:
+            if self.renderer is not None and self.renderer.ax is self.ax:
+                return []
+            data = self.time_steps[0]
+        self.time_steps[0] = data
+        return self._draw_state(data, f'Live step {data.step}')
+    
+    def _draw_state(self, data, caption):
+        """Update the persistent artists to show one network state"""
+        if self.renderer is None or self.renderer.ax is not self.ax:
+            self._init_renderer()
         
-        # Draw edges (all edges, lighter)
-        for u, v in self.G.edges():
-            pos_u = self.pos_3d[u]
-            pos_v = self.pos_3d[v]
-            weight = self.G[u][v]['weight']
-            
-            x = [pos_u[0], pos_v[0]]
-            y = [pos_u[1], pos_v[1]]
-            z = [pos_u[2], pos_v[2]]
-            
-            # Highlight active connections (if post-synaptic neuron just spiked)
-            u_data = neuron_map.get(u, {})
-            v_data = neuron_map.get(v, {})
-            
-            if v_data.get('spiked', False):
-                # Active connection - brighter and thicker
-                self.ax.plot(x, y, z, color='#FF6600', alpha=0.8, 
-                           linewidth=weight * 3, linestyle='--')
-            else:
-                # Inactive connection
-                self.ax.plot(x, y, z, color='lightgray', alpha=0.2, 
-                           linewidth=weight * 1)
+        # Active connection = post-synaptic neuron just spiked
+        self.renderer.update_edges(data.weights, data.spiked[self.G.targets], data.spiked)
         
-        # Draw nodes
-        for i, (pos, color, size) in enumerate(zip(node_positions, node_colors, node_sizes)):
-            self.ax.scatter(pos[0], pos[1], pos[2], 
-                          c=[color], s=size, alpha=0.9, 
-                          edgecolors='black', linewidths=1.5)
+        node_colors, node_sizes = node_style(data.potential, data.spiked,
+                                             base_size=100, size_range=100, spiked_size=300)
+        self.renderer.update_nodes(node_colors, node_sizes)
         
-        # Add labels for output neurons
-        output_nodes = [n for n in self.G.nodes() if self.G.out_degree(n) == 0]
-        for node_id in output_nodes:
-            pos = self.pos_3d[node_id]
-            neuron_data = neuron_map.get(node_id, {})
-            spike_count = neuron_data.get('spike_count', 0)
-            digit = output_nodes.index(node_id)
-            self.ax.text(pos[0], pos[1], pos[2] + 0.2, 
-                        f"{digit}\n({spike_count})", 
-                        fontsize=8, ha='center', va='center')
+        for digit, node_id in enumerate(self.renderer.label_nodes):
+            self.renderer.set_label(digit, f"{digit}\n({data.spike_count[node_id]})")
         
-        # Set labels and title
-        self.ax.set_xlabel('X', fontsize=12)
-        self.ax.set_ylabel('Y', fontsize=12)
-        self.ax.set_zlabel('Z (Layer)', fontsize=12)
-        self.ax.set_title(f'3D Spike Network Animation - Step {step_idx}/{len(self.time_steps)-1}', 
-                         fontsize=14, fontweight='bold')
+        self.renderer.set_caption(caption)
+        return self.renderer.artists
+    
+    def export(self, output, fps=5, workers=None):
+        """
+        Render all frames offscreen in parallel and write a GIF, video or PNG directory
         
-        # Set equal aspect ratio
-        if node_positions:
-            max_range = np.array([
-                max([p[0] for p in node_positions]) - min([p[0] for p in node_positions]),
-                max([p[1] for p in node_positions]) - min([p[1] for p in node_positions]),
-                max([p[2] for p in node_positions]) - min([p[2] for p in node_positions])
-            ]).max() / 2.0
-            
-            mid_x = (max([p[0] for p in node_positions]) + min([p[0] for p in node_positions])) * 0.5
-            mid_y = (max([p[1] for p in node_positions]) + min([p[1] for p in node_positions])) * 0.5
-            mid_z = (max([p[2] for p in node_positions]) + min([p[2] for p in node_positions])) * 0.5
-            
-            self.ax.set_xlim(mid_x - max_range, mid_x + max_range)
-            self.ax.set_ylim(mid_y - max_range, mid_y + max_range)
-            self.ax.set_zlim(mid_z - max_range, mid_z + max_range)
+        Args:
+            output: Output path (.gif, .mp4 and other ffmpeg formats, or a directory)
+            fps: Frames per second of the output
+            workers: Number of worker processes (default: number of CPUs)
+        """
+        if self.stream is not None:
+            raise ValueError("Live streams cannot be exported; record a run file instead")
+        print(f"Exporting {len(self.time_steps)} frames to {output}...")
+        export_animation(type(self), {'base_filename': self.base_filename,
+                                      'cache_frames': self.cache_frames,
+                                      'prefetch': self.prefetch,
+                                      'lod_options': self.lod_options},
+                         len(self.time_steps), output, fps=fps, workers=workers)
+        print(f"Animation saved!")
     
-    def animate(self, interval=200, loop=True, save_gif=None):
+    def animate(self, interval=200, loop=True, save_gif=None, workers=None):
         """
         Create animated visualization
         
         Args:
             interval: Time between frames in milliseconds
             loop: Whether to loop the animation
-            save_gif: If provided, save animation as GIF file
+            save_gif: If provided, export the animation to this file instead of
+                showing it (see export())
+            workers: Number of export worker processes
         """
+        if save_gif:
+            self.export(save_gif, fps=1000/interval, workers=workers)
+            return None
+        
         self.fig = plt.figure(figsize=(16, 12))
         self.ax = self.fig.add_subplot(111, projection='3d')
+        self.renderer = None
+        
+        # Only the per-frame artists are redrawn when the backend can blit
+        blit = self.fig.canvas.supports_blit
         
         def update_frame(frame):
+            if self.stream is not None:
+                return self._draw_live_frame()
             step_idx = frame % len(self.time_steps) if loop else min(frame, len(self.time_steps) - 1)
-            self._draw_frame(step_idx)
+            return self._draw_frame(step_idx)
+        
+        # A live stream has no fixed length
+        num_frames = len(self.time_steps) if not loop and self.stream is None else None
         
         ani = animation.FuncAnimation(self.fig, update_frame, 
+                                     init_func=self._init_renderer,
                                      interval=interval,
-                                     frames=len(self.time_steps) if not loop else None,
+                                     frames=num_frames,
                                      repeat=loop,
-                                     blit=False)
+                                     blit=blit,
+                                     cache_frame_data=False)
         
-        if save_gif:
-            print(f"Saving animation to {save_gif}...")
-            ani.save(save_gif, writer='pillow', fps=1000/interval)
-            print(f"Animation saved!")
-        else:
-            plt.tight_layout()
-            plt.show()
+        plt.tight_layout()
+        plt.show()
         
         return ani
 
 
 def main():
     parser = argparse.ArgumentParser(description='3D animated visualization of spiking network')
-    parser.add_argument('base_file', help='Base JSON file (e.g., spike_animation_step0.json)')
+    parser.add_argument('base_file', help='Run file, base step file or live address (e.g., spike_animation.snnr, '
+                                          'spike_animation_step0.json or shm:snn_live)')
     parser.add_argument('--interval', type=int, default=200,
                        help='Time between frames in milliseconds (default: 200)')
     parser.add_argument('--no-loop', action='store_true',
                        help='Don\'t loop the animation')
     parser.add_argument('--save', type=str, default=None,
-                       help='Save animation as GIF file')
+                       help='Save animation as GIF, video (e.g. .mp4, needs ffmpeg) or PNG directory')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Worker processes for --save (default: number of CPUs)')
+    parser.add_argument('--cache-frames', type=int, default=32,
+                       help='Maximum number of decoded frames kept in memory (default: 32)')
+    parser.add_argument('--prefetch', type=int, default=4,
+                       help='Frames decoded ahead in the background (default: 4)')
+    add_lod_arguments(parser)
     
     args = parser.parse_args()
     
     try:
-        animator = Spike3DAnimator(args.base_file)
-        print(f"Starting 3D animation with {len(animator.time_steps)} time steps...")
-        print("Close the window to stop.")
-        animator.animate(interval=args.interval, loop=not args.no_loop, save_gif=args.save)
+        animator = Spike3DAnimator(args.base_file, cache_frames=args.cache_frames,
+                                   prefetch=args.prefetch, lod_options=lod_options(args))
+        if animator.stream is None:
+            print(f"Starting 3D animation with {len(animator.time_steps)} time steps...")
+        if not args.save:
+            print("Close the window to stop.")
+        animator.animate(interval=args.interval, loop=not args.no_loop, save_gif=args.save,
+                          workers=args.workers)
     except Exception as e:
         print(f"Error: {e}")
         import traceback
@@ -3,7 +3,6 @@
 Animated visualization of training process showing network learning all digits
 """
 
-import json
 import sys
 import argparse
 import numpy as np
@@ -20,23 +19,36 @@ except ImportError:
     print("Please install it using: pip install matplotlib")
     sys.exit(1)
 
-try:
-    import networkx as nx
-except ImportError:
-    print("ERROR: networkx not found.")
-    print("Please install it using: pip install networkx")
-    sys.exit(1)
+from network_run import RunReader, is_run_file, FRAME_TEST
+from frame_store import FrameStore, StepFileSource, RunFileSource
+from network_graph import CompactGraph, layered_layout
+from network_render import RetainedRenderer3D, node_style
+from edge_lod import EdgeLOD, add_lod_arguments, lod_options
+from frame_export import export_animation
 
 
 class TrainingAnimator:
-    def __init__(self, base_filename):
-        """Initialize training animator"""
+    def __init__(self, base_filename, cache_frames=32, prefetch=4, lod_options=None):
+        """
+        Initialize training animator
+        
+        Args:
+            base_filename: Run file or any training frame file
+            cache_frames: Maximum number of decoded frames kept in memory
+            prefetch: Number of frames decoded ahead in the background
+            lod_options: EdgeLOD keyword arguments for large networks (None = all edges)
+        """
         self.base_filename = base_filename
-        self.time_steps = []
+        self.cache_frames = cache_frames
+        self.prefetch = prefetch
+        self.lod_options = lod_options or {}
+        self.time_steps = None  # FrameStore, decodes frames on demand
         self.G = None
+        self.lod = None
         self.pos_3d = None
         self.fig = None
         self.ax = None
+        self.renderer = None  # Persistent artists, created on the first frame
         self.frame_info = []  # Store info about each frame
         
         self._load_training_frames()
@@ -44,24 +56,28 @@ class TrainingAnimator:
         self._calculate_3d_layout()
     
     def _load_training_frames(self):
-        """Load all training frames in order"""
+        """Load all training frames in order (run file, JSON exports or binary snapshots)"""
+        if os.path.isfile(self.base_filename) and is_run_file(self.base_filename):
+            self._load_run_frames()
+            return
+        
         # Extract pattern from base filename
         # Format: training_epoch0_test_digit0_step0.json
-        match = re.search(r'training_epoch(\d+)_test_digit(\d+)_step(\d+)\.json', self.base_filename)
+        match = re.search(r'training_epoch(\d+)_test_digit(\d+)_step(\d+)\.(?:json|snn)', self.base_filename)
         if not match:
             # Try alternative pattern
-            match = re.search(r'training_epoch(\d+)_digit(\d+)_step(\d+)\.json', self.base_filename)
+            match = re.search(r'training_epoch(\d+)_digit(\d+)_step(\d+)\.(?:json|snn)', self.base_filename)
         
         if match:
             base_pattern = "training_epoch{}_test_digit{}_step{}.json"
         else:
             # Try to find any training files in data/json first, then current directory
-            training_files = glob.glob("data/json/training_epoch*_test_digit*_step*.json")
+            training_files = glob.glob("data/json/training_epoch*_test_digit*_step*.*")
             if not training_files:
-                training_files = glob.glob("training_epoch*_test_digit*_step*.json")
+                training_files = glob.glob("training_epoch*_test_digit*_step*.*")
             if training_files:
                 self.base_filename = training_files[0]
-                match = re.search(r'training_epoch(\d+)_test_digit(\d+)_step(\d+)\.json', self.base_filename)
+                match = re.search(r'training_epoch(\d+)_test_digit(\d+)_step(\d+)\.(?:json|snn)', self.base_filename)
         
         if not match:
             raise ValueError(f"Could not parse training file pattern from: {self.base_filename}")
@@ -70,216 +86,156 @@ class TrainingAnimator:
         dir_path = os.path.dirname(self.base_filename) if os.path.dirname(self.base_filename) else '.'
         if dir_path == '.':
             # Try data/json first
-            training_files = glob.glob("data/json/training_epoch*_test_digit*_step*.json")
+            training_files = glob.glob("data/json/training_epoch*_test_digit*_step*.*")
             if not training_files:
-                training_files = glob.glob("training_epoch*_test_digit*_step*.json")
+                training_files = glob.glob("training_epoch*_test_digit*_step*.*")
         else:
-            training_files = glob.glob(os.path.join(dir_path, "training_epoch*_test_digit*_step*.json"))
+            training_files = glob.glob(os.path.join(dir_path, "training_epoch*_test_digit*_step*.*"))
         
-        # Parse and sort files
-        parsed_files = []
+        # Parse files, preferring binary snapshots when both formats exist
+        frame_files = {}
         for f in training_files:
-            match = re.search(r'training_epoch(\d+)_test_digit(\d+)_step(\d+)\.json', f)
+            match = re.search(r'training_epoch(\d+)_test_digit(\d+)_step(\d+)\.(?:json|snn)$', f)
             if match:
-                epoch = int(match.group(1))
-                digit = int(match.group(2))
-                step = int(match.group(3))
-                parsed_files.append((epoch, digit, step, f))
+                key = (int(match.group(1)), int(match.group(2)), int(match.group(3)))
+                if key not in frame_files or f.endswith('.snn'):
+                    frame_files[key] = f
         
         # Sort by epoch, then digit, then step
-        parsed_files.sort(key=lambda x: (x[0], x[1], x[2]))
+        parsed_files = sorted((epoch, digit, step, f)
+                              for (epoch, digit, step), f in frame_files.items())
         
         if not parsed_files:
             raise ValueError("No training frame files found")
         
-        # Load all frames
+        # Index all frames (decoded lazily by the frame store)
         for epoch, digit, step, filepath in parsed_files:
-            with open(filepath, 'r') as f:
-                data = json.load(f)
-                self.time_steps.append(data)
-                self.frame_info.append({
-                    'epoch': epoch,
-                    'digit': digit,
-                    'step': step,
-                    'file': filepath
-                })
+            self.frame_info.append({
+                'epoch': epoch,
+                'digit': digit,
+                'step': step,
+                'file': filepath
+            })
+        source = StepFileSource([info['file'] for info in self.frame_info], self.frame_info)
+        self.time_steps = FrameStore(source, cache_frames=self.cache_frames,
+                                     prefetch=self.prefetch)
         
-        print(f"Loaded {len(self.time_steps)} training frames")
+        print(f"Indexed {len(self.time_steps)} training frames")
         print(f"Epochs: {min(f['epoch'] for f in self.frame_info)} to {max(f['epoch'] for f in self.frame_info)}")
         print(f"Digits: 0-9")
     
-    def _build_graph(self):
-        """Build networkx graph from first frame"""
-        self.G = nx.DiGraph()
-        data = self.time_steps[0]
-        
-        for neuron in data['neurons']:
-            self.G.add_node(neuron['id'])
+    def _load_run_frames(self):
+        """Index the test frames recorded in a run container"""
+        run = RunReader(self.base_filename)
+        indices = run.frame_indices(FRAME_TEST) or run.frame_indices()
         
-        for neuron in data['neurons']:
-            for conn in neuron['connections']:
-                self.G.add_edge(neuron['id'], conn['target'], weight=conn['weight'])
-    
-    def _calculate_3d_layout(self):
-        """Calculate 3D positions (layered layout)"""
-        in_degree = dict(self.G.in_degree())
-        out_degree = dict(self.G.out_degree())
+        for index in indices:
+            info = run.frame_info(index)
+            self.frame_info.append({
+                'epoch': info['epoch'],
+                'digit': info['label'],
+                'step': info['step'],
+                'file': self.base_filename
+            })
         
-        input_nodes = [n for n in self.G.nodes() if in_degree[n] == 0]
-        output_nodes = [n for n in self.G.nodes() if out_degree[n] == 0]
-        hidden_nodes = [n for n in self.G.nodes() 
-                       if n not in input_nodes and n not in output_nodes]
+        if not indices:
+            raise ValueError(f"No frames found in run file: {self.base_filename}")
         
-        self.pos_3d = {}
+        source = RunFileSource(run, indices, self.frame_info)
+        self.time_steps = FrameStore(source, cache_frames=self.cache_frames,
+                                     prefetch=self.prefetch)
         
-        # Input layer (z=0)
-        for i, node_id in enumerate(input_nodes):
-            x = -2.0 + (i % 7) * 0.6
-            y = -1.0 + (i // 7) * 0.6
-            self.pos_3d[node_id] = np.array([x, y, 0])
-        
-        # Hidden layer (z=1)
-        for i, node_id in enumerate(hidden_nodes):
-            angle = 2 * np.pi * i / len(hidden_nodes)
-            radius = 1.5
-            self.pos_3d[node_id] = np.array([
-                radius * np.cos(angle),
-                radius * np.sin(angle),
-                1
-            ])
-        
-        # Output layer (z=2)
-        for i, node_id in enumerate(output_nodes):
-            x = -1.5 + i * 0.3
-            y = 2.0
-            self.pos_3d[node_id] = np.array([x, y, 2])
+        print(f"Indexed {len(self.time_steps)} training frames")
     
-    def _get_neuron_data(self, frame_idx):
-        """Get neuron data for a specific frame"""
-        data = self.time_steps[frame_idx]
-        neuron_map = {n['id']: n for n in data['neurons']}
-        return neuron_map
+    def _build_graph(self):
+        """Build the compact graph from the first frame"""
+        self.G = CompactGraph.from_snapshot(self.time_steps[0])
+        self.lod = EdgeLOD(self.G, **self.lod_options)
+    
+    def _calculate_3d_layout(self):
+        """Calculate 3D positions for neurons (layered layout)"""
+        self.pos_3d = layered_layout(self.G)
+    
+    def _init_renderer(self):
+        """Create the persistent artists for the current axis"""
+        self.ax.set_xlabel('X', fontsize=12)
+        self.ax.set_ylabel('Y', fontsize=12)
+        self.ax.set_zlabel('Z (Layer)', fontsize=12)
+        self.ax.set_title('Training Animation', fontsize=14, fontweight='bold')
+        
+        # Output neurons get a label with their spike count
+        self.renderer = RetainedRenderer3D(self.ax, self.pos_3d, self.G.sources, self.G.targets,
+                                           label_nodes=self.G.layers()[2], lod=self.lod)
+        return self.renderer.artists
     
     def _draw_frame(self, frame_idx):
-        """Draw a single frame"""
-        self.ax.clear()
+        """Update the persistent artists to show one frame"""
+        if self.renderer is None or self.renderer.ax is not self.ax:
+            self._init_renderer()
         
-        neuron_map = self._get_neuron_data(frame_idx)
+        data = self.time_steps[frame_idx]
         info = self.frame_info[frame_idx]
         
-        # Prepare node data
-        node_colors = []
-        node_sizes = []
-        node_positions = []
-        
-        for node_id in self.G.nodes():
-            neuron_data = neuron_map.get(node_id, {})
-            potential = neuron_data.get('potential', 0.0)
-            spiked = neuron_data.get('spiked', False)
-            
-            pos = self.pos_3d[node_id]
-            node_positions.append(pos)
-            
-            if spiked:
-                node_colors.append('#FF0000')
-                node_sizes.append(300)
-            else:
-                intensity = min(1.0, max(0.0, potential))
-                node_colors.append(plt.cm.viridis(intensity))
-                node_sizes.append(100 + intensity * 100)
+        # Active connection = post-synaptic neuron just spiked
+        self.renderer.update_edges(data.weights, data.spiked[self.G.targets], data.spiked)
         
-        # Draw edges
-        for u, v in self.G.edges():
-            pos_u = self.pos_3d[u]
-            pos_v = self.pos_3d[v]
-            weight = self.G[u][v]['weight']
-            
-            x = [pos_u[0], pos_v[0]]
-            y = [pos_u[1], pos_v[1]]
-            z = [pos_u[2], pos_v[2]]
-            
-            u_data = neuron_map.get(u, {})
-            v_data = neuron_map.get(v, {})
-            
-            if v_data.get('spiked', False):
-                self.ax.plot(x, y, z, color='#FF6600', alpha=0.8, 
-                           linewidth=weight * 3, linestyle='--')
-            else:
-                self.ax.plot(x, y, z, color='lightgray', alpha=0.2, 
-                           linewidth=weight * 1)
+        node_colors, node_sizes = node_style(data.potential, data.spiked,
+                                             base_size=100, size_range=100, spiked_size=300)
+        self.renderer.update_nodes(node_colors, node_sizes)
         
-        # Draw nodes
-        for i, (pos, color, size) in enumerate(zip(node_positions, node_colors, node_sizes)):
-            self.ax.scatter(pos[0], pos[1], pos[2], 
-                          c=[color], s=size, alpha=0.9, 
-                          edgecolors='black', linewidths=1.5)
+        # Output labels with spike counts, highlighting the current test digit
+        for digit, node_id in enumerate(self.renderer.label_nodes):
+            self.renderer.set_label(digit, f"{digit}\n({data.spike_count[node_id]})",
+                                    highlight=(digit == info['digit']))
         
-        # Add labels for output neurons with spike counts
-        output_nodes = [n for n in self.G.nodes() if self.G.out_degree(n) == 0]
-        for node_id in output_nodes:
-            pos = self.pos_3d[node_id]
-            neuron_data = neuron_map.get(node_id, {})
-            spike_count = neuron_data.get('spike_count', 0)
-            digit = output_nodes.index(node_id)
-            
-            # Highlight if this is the current test digit
-            if digit == info['digit']:
-                self.ax.text(pos[0], pos[1], pos[2] + 0.3, 
-                            f"→{digit}←\n({spike_count})", 
-                            fontsize=10, ha='center', va='center',
-                            bbox=dict(boxstyle='round', facecolor='yellow', alpha=0.7))
-            else:
-                self.ax.text(pos[0], pos[1], pos[2] + 0.2, 
-                            f"{digit}\n({spike_count})", 
-                            fontsize=8, ha='center', va='center')
-        
-        # Set labels and title
-        self.ax.set_xlabel('X', fontsize=12)
-        self.ax.set_ylabel('Y', fontsize=12)
-        self.ax.set_zlabel('Z (Layer)', fontsize=12)
-        
-        title = f"Training Animation - Epoch {info['epoch']}, Testing Digit {info['digit']}, Step {info['step']}"
-        self.ax.set_title(title, fontsize=14, fontweight='bold')
+        self.renderer.set_caption(f"Epoch {info['epoch']}, Testing Digit {info['digit']}, "
+                                  f"Step {info['step']}")
+        return self.renderer.artists
+    
+    def export(self, output, fps=5, workers=None):
+        """
+        Render all frames offscreen in parallel and write a GIF, video or PNG directory
         
-        # Set equal aspect ratio
-        if node_positions:
-            max_range = np.array([
-                max([p[0] for p in node_positions]) - min([p[0] for p in node_positions]),
-                max([p[1] for p in node_positions]) - min([p[1] for p in node_positions]),
-                max([p[2] for p in node_positions]) - min([p[2] for p in node_positions])
-            ]).max() / 2.0
-            
-            mid_x = (max([p[0] for p in node_positions]) + min([p[0] for p in node_positions])) * 0.5
-            mid_y = (max([p[1] for p in node_positions]) + min([p[1] for p in node_positions])) * 0.5
-            mid_z = (max([p[2] for p in node_positions]) + min([p[2] for p in node_positions])) * 0.5
-            
-            self.ax.set_xlim(mid_x - max_range, mid_x + max_range)
-            self.ax.set_ylim(mid_y - max_range, mid_y + max_range)
-            self.ax.set_zlim(mid_z - max_range, mid_z + max_range)
+        Args:
+            output: Output path (.gif, .mp4 and other ffmpeg formats, or a directory)
+            fps: Frames per second of the output
+            workers: Number of worker processes (default: number of CPUs)
+        """
+        print(f"Exporting {len(self.time_steps)} frames to {output}...")
+        export_animation(type(self), {'base_filename': self.base_filename,
+                                      'cache_frames': self.cache_frames,
+                                      'prefetch': self.prefetch,
+                                      'lod_options': self.lod_options},
+                         len(self.time_steps), output, fps=fps, workers=workers)
+        print(f"Animation saved!")
     
-    def animate(self, interval=200, loop=True, save_gif=None):
-        """Create animated visualization"""
+    def animate(self, interval=200, loop=True, save_gif=None, workers=None):
+        """Create animated visualization (or export it when save_gif is given)"""
+        if save_gif:
+            self.export(save_gif, fps=1000/interval, workers=workers)
+            return None
+        
         self.fig = plt.figure(figsize=(16, 12))
         self.ax = self.fig.add_subplot(111, projection='3d')
+        self.renderer = None
+        
+        # Only the per-frame artists are redrawn when the backend can blit
+        blit = self.fig.canvas.supports_blit
         
         def update_frame(frame):
             frame_idx = frame % len(self.time_steps) if loop else min(frame, len(self.time_steps) - 1)
-            self._draw_frame(frame_idx)
+            return self._draw_frame(frame_idx)
         
         ani = animation.FuncAnimation(self.fig, update_frame, 
+                                     init_func=self._init_renderer,
                                      interval=interval,
                                      frames=len(self.time_steps) if not loop else None,
                                      repeat=loop,
-                                     blit=False,
+                                     blit=blit,
                                      cache_frame_data=False)
         
-        if save_gif:
-            print(f"Saving animation to {save_gif}...")
-            ani.save(save_gif, writer='pillow', fps=1000/interval)
-            print(f"Animation saved!")
-        else:
-            plt.tight_layout()
-            plt.show()
+        plt.tight_layout()
+        plt.show()
         
         return ani
 
@@ -287,21 +243,31 @@ class TrainingAnimator:
 def main():
     parser = argparse.ArgumentParser(description='Animated visualization of training process')
     parser.add_argument('base_file', nargs='?', 
-                       help='Base training file (e.g., training_epoch0_test_digit0_step0.json)')
+                       help='Run file or base training file (e.g., training_run.snnr or '
+                            'training_epoch0_test_digit0_step0.json)')
     parser.add_argument('--interval', type=int, default=300,
                        help='Time between frames in milliseconds (default: 300)')
     parser.add_argument('--no-loop', action='store_true',
                        help='Don\'t loop the animation')
     parser.add_argument('--save', type=str, default=None,
-                       help='Save animation as GIF file')
+                       help='Save animation as GIF, video (e.g. .mp4, needs ffmpeg) or PNG directory')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Worker processes for --save (default: number of CPUs)')
+    parser.add_argument('--cache-frames', type=int, default=32,
+                       help='Maximum number of decoded frames kept in memory (default: 32)')
+    parser.add_argument('--prefetch', type=int, default=4,
+                       help='Frames decoded ahead in the background (default: 4)')
+    add_lod_arguments(parser)
     
     args = parser.parse_args()
     
     if not args.base_file:
         # Try to find training files automatically (check data/json first)
-        training_files = glob.glob("data/json/training_epoch*_test_digit*_step*.json")
+        training_files = glob.glob("data/json/training_run.snnr")
+        if not training_files:
+            training_files = glob.glob("data/json/training_epoch*_test_digit*_step*.*")
         if not training_files:
-            training_files = glob.glob("training_epoch*_test_digit*_step*.json")
+            training_files = glob.glob("training_epoch*_test_digit*_step*.*")
         if training_files:
             args.base_file = training_files[0]
             print(f"Auto-detected training file: {args.base_file}")
@@ -312,10 +278,13 @@ def main():
             sys.exit(1)
     
     try:
-        animator = TrainingAnimator(args.base_file)
+        animator = TrainingAnimator(args.base_file, cache_frames=args.cache_frames,
+                                    prefetch=args.prefetch, lod_options=lod_options(args))
         print(f"Starting training animation with {len(animator.time_steps)} frames...")
-        print("Close the window to stop.")
-        animator.animate(interval=args.interval, loop=not args.no_loop, save_gif=args.save)
+        if not args.save:
+            print("Close the window to stop.")
+        animator.animate(interval=args.interval, loop=not args.no_loop, save_gif=args.save,
+                          workers=args.workers)
     except Exception as e:
         print(f"Error: {e}")
         import traceback
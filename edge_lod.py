@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Level-of-detail edge selection for the 3D viewers
+
+The full MNIST network has 313,600 input->hidden edges; drawing all of them is
+slow and only produces a gray blur. An EdgeLOD picks the edges worth drawing:
+
+    all         every edge (default, no LOD)
+    topk        the K edges with the largest |weight|
+    spiking     edges touching a neuron that spiked in the current frame
+                (the K strongest of them if there are more than K)
+    stratified  a fixed random sample per layer pair (input->hidden, ...)
+                proportional to the number of edges in that pair
+
+K is either given directly or derived from a frame-time budget by timing how
+long Agg takes to draw a sample of the network's own edges. Everything that is
+not drawn is summarized by one "bundle" line per layer pair whose width grows
+with the number of edges it stands for.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from network_render import draw_edges, set_equal_aspect_3d
+
+
+LOD_MODES = ('all', 'topk', 'spiking', 'stratified')
+DEFAULT_MAX_EDGES = 5000
+
+BUNDLE_COLOR = (0.27, 0.51, 0.71, 0.35)  # steelblue, translucent
+
+
+def calibrate_max_edges(segments, frame_budget, figsize=(16, 12), dpi=100, sample=2000):
+    """
+    Estimate how many edges can be drawn within a frame-time budget
+
+    Draws a random sample of the given segments on an offscreen Agg figure of
+    the viewer's size and extrapolates from the time per edge.
+
+    Args:
+        segments: Edge segments, shape (num_edges, 2, 3)
+        frame_budget: Time available for drawing edges, in milliseconds
+        figsize: Figure size of the viewer in inches
+        dpi: Figure resolution
+        sample: Number of edges to time
+
+    Returns:
+        Maximum number of edges (at least 1)
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    if not len(segments):
+        return 1
+    rng = np.random.default_rng(0)
+    picked = rng.choice(len(segments), size=min(sample, len(segments)), replace=False)
+
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111, projection='3d')
+    set_equal_aspect_3d(ax, segments.reshape(-1, 3))
+    fig.canvas.draw()  # Sets up the projection used below
+
+    collection = draw_edges(ax, segments[picked], 'lightgray', 1.0)
+    collection.do_3d_projection()
+    renderer = fig.canvas.get_renderer()
+    start = time.perf_counter()
+    collection.draw(renderer)
+    per_edge = (time.perf_counter() - start) / len(picked)
+
+    return max(1, int(frame_budget / 1000.0 / per_edge))
+
+
+class EdgeLOD:
+    """Chooses which edges of a CompactGraph the 3D viewers draw"""
+
+    def __init__(self, graph, mode='all', max_edges=None, frame_budget=None, bundles=True, seed=0):
+        """
+        Initialize the edge selection
+
+        Args:
+            graph: CompactGraph of the network
+            mode: One of LOD_MODES
+            max_edges: Maximum number of edges to draw (K)
+            frame_budget: Derive K from this edge drawing time per frame in
+                milliseconds (used when max_edges is not given)
+            bundles: Summarize the layer pairs by bundle lines
+            seed: Seed of the stratified sample
+        """
+        if mode not in LOD_MODES:
+            raise ValueError(f"Unknown LOD mode: {mode} (expected one of {', '.join(LOD_MODES)})")
+        if max_edges is not None and max_edges <= 0:
+            raise ValueError(f"max_edges must be positive, got {max_edges}")
+        self.graph = graph
+        self.mode = mode
+        self.max_edges = max_edges
+        self.frame_budget = frame_budget
+        self.bundles = bundles
+        self.seed = seed
+        self._stratified = None
+
+    @property
+    def enabled(self):
+        """Whether only a subset of the edges is drawn"""
+        return self.mode != 'all' and self.graph.num_edges > self.edge_limit
+
+    @property
+    def is_static(self):
+        """Whether the selection only depends on the weights (not on spikes)"""
+        return self.mode != 'spiking'
+
+    @property
+    def edge_limit(self):
+        return self.max_edges if self.max_edges is not None else DEFAULT_MAX_EDGES
+
+    def calibrate(self, segments, figsize=(16, 12), dpi=100):
+        """
+        Derive max_edges from the frame budget (no-op if max_edges is set)
+
+        Args:
+            segments: Segments of all edges, shape (num_edges, 2, 3)
+            figsize: Figure size of the viewer in inches
+            dpi: Figure resolution
+        """
+        if self.mode == 'all' or self.max_edges is not None or not self.frame_budget:
+            return
+        self.max_edges = calibrate_max_edges(segments, self.frame_budget, figsize, dpi)
+        self._stratified = None
+        print(f"LOD: drawing up to {self.max_edges} edges for a {self.frame_budget:g} ms budget")
+
+    def select(self, weights, spiked=None):
+        """
+        Edges to draw for one frame
+
+        Args:
+            weights: Weight of every edge
+            spiked: Spike flag of every neuron (needed for the 'spiking' mode)
+
+        Returns:
+            Sorted array of edge ids, or None to draw every edge
+        """
+        if not self.enabled:
+            return None
+        limit = self.edge_limit
+
+        if self.mode == 'topk':
+            return np.sort(np.argpartition(-np.abs(weights), limit - 1)[:limit])
+
+        if self.mode == 'spiking':
+            if spiked is None:
+                return np.empty(0, dtype=np.int64)
+            touching = np.flatnonzero(spiked[self.graph.sources] | spiked[self.graph.targets])
+            if len(touching) > limit:
+                strongest = np.argpartition(-np.abs(weights[touching]), limit - 1)[:limit]
+                touching = np.sort(touching[strongest])
+            return touching
+
+        # Stratified: the sample is fixed so the drawing does not flicker
+        if self._stratified is None:
+            self._stratified = self._stratified_sample(limit)
+        return self._stratified
+
+    def _layer_pairs(self):
+        """Layer pair id (source layer * 3 + target layer) of every edge"""
+        layer = self.graph.layer_index()
+        return layer[self.graph.sources] * 3 + layer[self.graph.targets]
+
+    def _stratified_sample(self, limit):
+        pairs = self._layer_pairs()
+        counts = np.bincount(pairs, minlength=9)
+        rng = np.random.default_rng(self.seed)
+        picked = []
+        for pair in np.flatnonzero(counts):
+            members = np.flatnonzero(pairs == pair)
+            # Proportional quota, but every layer pair keeps at least one edge
+            quota = max(1, int(round(limit * counts[pair] / len(pairs))))
+            picked.append(members if quota >= len(members)
+                          else rng.choice(members, size=quota, replace=False))
+        return np.sort(np.concatenate(picked))
+
+    def bundle_segments(self, pos):
+        """
+        One line per pair of different layers connecting the layer centroids
+
+        Args:
+            pos: Node positions, shape (num_nodes, 3)
+
+        Returns:
+            (segments, widths, counts) for the layer pairs that have edges
+        """
+        layer = self.graph.layer_index()
+        counts = np.bincount(self._layer_pairs(), minlength=9)
+        segments, widths, bundle_counts = [], [], []
+        for pair in np.flatnonzero(counts):
+            source_layer, target_layer = divmod(int(pair), 3)
+            if source_layer == target_layer:
+                continue  # Recurrent edges within a layer have no direction to show
+            segments.append([pos[layer == source_layer].mean(axis=0),
+                             pos[layer == target_layer].mean(axis=0)])
+            widths.append(1.0 + np.log10(counts[pair]))
+            bundle_counts.append(int(counts[pair]))
+        return np.array(segments).reshape(-1, 2, 3), np.array(widths), np.array(bundle_counts)
+
+    def draw_bundles(self, ax, pos):
+        """
+        Draw the bundle lines into a 3D axis
+
+        Returns:
+            The Line3DCollection, or None if bundles are disabled
+        """
+        if not (self.enabled and self.bundles):
+            return None
+        segments, widths, _ = self.bundle_segments(pos)
+        if not len(segments):
+            return None
+        return draw_edges(ax, segments, BUNDLE_COLOR, widths)
+
+
+def _positive_int(value):
+    """argparse type for counts that must be at least 1"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {number}")
+    return number
+
+
+def add_lod_arguments(parser):
+    """Add the shared LOD options to a viewer's argument parser"""
+    group = parser.add_argument_group('edge level of detail')
+    group.add_argument('--lod', choices=LOD_MODES, default='all',
+                       help='Which edges to draw (default: all)')
+    group.add_argument('--max-edges', type=_positive_int, default=None,
+                       help=f'Maximum number of edges drawn in LOD mode (default: {DEFAULT_MAX_EDGES})')
+    group.add_argument('--frame-budget', type=float, default=None,
+                       help='Choose --max-edges from an edge drawing time per frame in milliseconds')
+    group.add_argument('--no-bundles', action='store_true',
+                       help='Do not draw layer bundle lines for the edges left out')
+
+
+def lod_options(args):
+    """EdgeLOD keyword arguments from parsed add_lod_arguments() options"""
+    return {
+        'mode': args.lod,
+        'max_edges': args.max_edges,
+        'frame_budget': args.frame_budget,
+        'bundles': not args.no_bundles,
+    }
@@ -6,7 +6,7 @@
 int main(int argc, char* argv[]) {
     if (argc < 2) {
         std::cerr << "Usage: " << argv[0] << " <output_json_file> [num_steps]\n";
-        std::cerr << "  output_json_file: Path to JSON file to write\n";
+        std::cerr << "  output_json_file: Path to JSON file to write (.snn for binary snapshots)\n";
         std::cerr << "  num_steps: Number of simulation steps (default: 10)\n";
         return 1;
     }
@@ -17,6 +17,8 @@ int main(int argc, char* argv[]) {
         system("mkdir -p data/json");
         output_file = "data/json/" + output_file;
     }
+    bool binary = output_file.size() > 4 &&
+                  output_file.compare(output_file.size() - 4, 4, ".snn") == 0;
     int num_steps = 10;
     if (argc >= 3) {
         num_steps = std::atoi(argv[2]);
@@ -73,13 +75,17 @@ int main(int argc, char* argv[]) {
             }
         }
         
-        std::ofstream out(step_file);
+        std::ofstream out(step_file, binary ? std::ios::binary : std::ios::out);
         if (!out) {
             std::cerr << "Error: Cannot open file " << step_file << " for writing\n";
             return 1;
         }
         
-        network.export_to_json(out);
+        if (binary) {
+            network.export_binary(out, step);
+        } else {
+            network.export_to_json(out);
+        }
         out.close();
         
         std::cout << "Exported step " << step << " to " << step_file << "\n";
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Parallel offscreen export of the 3D animations
+
+FuncAnimation.save() renders every frame one after another in the viewer
+process. Here each worker process builds its own animator on the Agg backend,
+renders short runs of consecutive frames (handed out in turn, so workers
+interleave) and hands the pixels back; the parent writes them in frame order
+to the output:
+
+    *.gif                   pillow (frames are quantized by the workers)
+    *.mp4, *.mkv, *.webm    ffmpeg, fed raw RGB frames over a pipe
+    directory               one PNG per frame, written by the workers
+
+Rendering dominates export time and frames are independent, so the export
+scales with the number of worker processes.
+"""
+
+import contextlib
+import io
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+
+FFMPEG_EXTENSIONS = ('.mp4', '.mkv', '.webm', '.mov', '.avi')
+
+# Per-process state of a worker, set by _init_worker
+_worker = {}
+
+
+def output_format(output):
+    """
+    Encoder used for an output path
+
+    Returns:
+        'gif', 'ffmpeg' or 'png'
+    """
+    extension = os.path.splitext(output)[1].lower()
+    if extension == '.gif':
+        return 'gif'
+    if extension in FFMPEG_EXTENSIONS:
+        return 'ffmpeg'
+    if not extension:
+        return 'png'
+    raise ValueError(f"Unsupported export format: {output} "
+                     f"(use .gif, {', '.join(FFMPEG_EXTENSIONS)} or a directory)")
+
+
+def _init_worker(animator_cls, animator_kwargs, figsize, dpi, fmt, output):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    # Every worker indexes the frames itself; keep its log lines out of the progress output
+    with contextlib.redirect_stdout(io.StringIO()):
+        animator = animator_cls(**animator_kwargs)
+    animator.fig = plt.figure(figsize=figsize, dpi=dpi)
+    animator.ax = animator.fig.add_subplot(111, projection='3d')
+    animator.renderer = None
+    _worker.update(animator=animator, format=fmt, output=output)
+
+
+def _render_frame(index):
+    animator = _worker['animator']
+    animator._draw_frame(index)
+    canvas = animator.fig.canvas
+    canvas.draw()
+    rgb = np.asarray(canvas.buffer_rgba())[..., :3]
+
+    if _worker['format'] == 'png':
+        from PIL import Image
+        Image.fromarray(rgb).save(os.path.join(_worker['output'], f'frame_{index:05d}.png'))
+        return index, None
+    if _worker['format'] == 'gif':
+        # Quantizing is the expensive part of GIF encoding, so it happens here in parallel
+        from PIL import Image
+        image = Image.fromarray(rgb).quantize(colors=256, method=Image.Quantize.FASTOCTREE)
+        return index, (image.size, image.tobytes(), image.getpalette())
+    return index, ((rgb.shape[1], rgb.shape[0]), np.ascontiguousarray(rgb).tobytes())
+
+
+class _Progress:
+    """Single-line progress indicator on stderr"""
+
+    def __init__(self, total, label):
+        self.total = total
+        self.label = label
+        self.done = 0
+        self.start = time.perf_counter()
+
+    def update(self):
+        self.done += 1
+        elapsed = time.perf_counter() - self.start
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        sys.stderr.write(f"\r{self.label}: {self.done}/{self.total} "
+                         f"({100 * self.done // self.total}%) {rate:.1f} frames/s")
+        if self.done == self.total:
+            sys.stderr.write('\n')
+        sys.stderr.flush()
+
+
+class _GifWriter:
+    def __init__(self, output, fps):
+        self.output = output
+        self.duration = 1000.0 / fps
+        self.frames = []
+
+    def write(self, payload):
+        from PIL import Image
+        size, data, palette = payload
+        image = Image.frombytes('P', size, data)
+        image.putpalette(palette)
+        self.frames.append(image)
+
+    def close(self):
+        if self.frames:
+            self.frames[0].save(self.output, save_all=True, append_images=self.frames[1:],
+                                duration=self.duration, loop=0)
+
+
+class _FFmpegWriter:
+    def __init__(self, output, fps):
+        self.output = output
+        self.fps = fps
+        self.process = None
+
+    def write(self, payload):
+        size, data = payload
+        if self.process is None:
+            ffmpeg = shutil.which('ffmpeg')
+            if ffmpeg is None:
+                raise RuntimeError(f"ffmpeg not found, cannot write {self.output} "
+                                   f"(export to .gif or a directory of PNGs instead)")
+            self.process = subprocess.Popen(
+                [ffmpeg, '-y', '-loglevel', 'error',
+                 '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f'{size[0]}x{size[1]}',
+                 '-r', str(self.fps), '-i', '-',
+                 '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-pix_fmt', 'yuv420p', self.output],
+                stdin=subprocess.PIPE)
+        self.process.stdin.write(data)
+
+    def close(self):
+        if self.process is not None:
+            self.process.stdin.close()
+            if self.process.wait() != 0:
+                raise RuntimeError(f"ffmpeg failed writing {self.output}")
+
+
+class _PngWriter:
+    def __init__(self, output, fps):
+        pass
+
+    def write(self, payload):
+        pass  # Workers write the PNG files themselves and return no payload
+
+    def close(self):
+        pass
+
+
+_WRITERS = {'gif': _GifWriter, 'ffmpeg': _FFmpegWriter, 'png': _PngWriter}
+
+
+def export_animation(animator_cls, animator_kwargs, num_frames, output, fps=5,
+                     workers=None, figsize=(16, 12), dpi=100):
+    """
+    Render frames in a process pool and write them to a GIF, video or PNG directory
+
+    Args:
+        animator_cls: Animator class with a _draw_frame(index) method and
+            fig/ax/renderer attributes (e.g. Spike3DAnimator)
+        animator_kwargs: Keyword arguments to rebuild the animator in each worker
+            (must be picklable)
+        num_frames: Number of frames to export, starting at frame 0
+        output: Output path (.gif, a video extension or a directory)
+        fps: Frames per second of the output
+        workers: Number of worker processes (default: number of CPUs); frames
+            are always rendered in child processes, so the caller's matplotlib
+            backend and figures are left alone
+        figsize: Figure size in inches
+        dpi: Figure resolution
+    """
+    fmt = output_format(output)
+    if fmt == 'ffmpeg' and shutil.which('ffmpeg') is None:
+        raise RuntimeError(f"ffmpeg not found, cannot write {output} "
+                           f"(export to .gif or a directory of PNGs instead)")
+    if fmt == 'png':
+        os.makedirs(output, exist_ok=True)
+
+    workers = max(1, min(workers or os.cpu_count() or 1, num_frames))
+    initargs = (animator_cls, animator_kwargs, figsize, dpi, fmt, output)
+    writer = _WRITERS[fmt](output, fps)
+    progress = _Progress(num_frames, f"Rendering {output}")
+
+    def write_all(results):
+        for _, payload in results:
+            writer.write(payload)
+            progress.update()
+
+    # Runs of up to 16 consecutive frames keep run-file replay mostly sequential
+    # within a worker while the parent, which writes in frame order, only buffers
+    # a few runs ahead. Spawn avoids forking the viewer's prefetch threads, and a
+    # single worker is a child process too: _init_worker switches to Agg, which
+    # must not happen in the caller (switching back would close its figures).
+    chunksize = max(1, min(16, num_frames // (workers * 4)))
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(workers, initializer=_init_worker, initargs=initargs) as pool:
+        write_all(pool.imap(_render_frame, range(num_frames), chunksize=chunksize))
+    writer.close()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Lazy, random-access frame store for the animators
+
+Frames are indexed up front (file names or run-file records) but only decoded
+on first access. Decoded frames are kept in a bounded LRU cache and the next
+few frames are prefetched on a background thread while the current one is
+being drawn, so playback can start immediately and memory stays bounded no
+matter how many frames a run has.
+"""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from network_snapshot import load_network_state, find_step_files
+from network_run import RunReader, is_run_file
+
+
+class StepFileSource:
+    """Frames stored as one file per step (JSON exports or binary snapshots)"""
+
+    def __init__(self, paths, infos=None):
+        """
+        Args:
+            paths: List of step file paths in playback order
+            infos: Optional list of per-frame info dicts
+        """
+        self.paths = list(paths)
+        self.infos = infos if infos is not None else [{'file': p} for p in self.paths]
+
+    def __len__(self):
+        return len(self.paths)
+
+    def load(self, index):
+        return load_network_state(self.paths[index])
+
+    def info(self, index):
+        return self.infos[index]
+
+
+class RunFileSource:
+    """Frames stored in a run container (.snnr)"""
+
+    def __init__(self, reader, indices=None, infos=None):
+        """
+        Args:
+            reader: RunReader (or path to a run file)
+            indices: Run frame indices to expose, in playback order (default: all)
+            infos: Optional list of per-frame info dicts (default: run frame tags)
+        """
+        self.reader = RunReader(reader) if isinstance(reader, str) else reader
+        self.indices = list(indices) if indices is not None else list(range(len(self.reader)))
+        self.infos = infos
+        # RunReader keeps a replay cursor, so access from the prefetch thread is serialized
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.indices)
+
+    def load(self, index):
+        with self._lock:
+            return self.reader.frame(self.indices[index])
+
+    def info(self, index):
+        if self.infos is not None:
+            return self.infos[index]
+        return self.reader.frame_info(self.indices[index])
+
+
+def _frame_nbytes(snapshot):
+    """Memory owned by a decoded frame (views into shared or mapped buffers are free)"""
+    total = 0
+    for array in (snapshot.indptr, snapshot.indices, snapshot.weights,
+                  snapshot.potential, snapshot.spiked, snapshot.spike_count):
+        if array.flags.owndata:
+            total += array.nbytes
+    return total
+
+
+class FrameStore:
+    """Sequence-like access to frames with an LRU cache and background prefetch"""
+
+    def __init__(self, source, cache_frames=32, max_bytes=512 * 1024 * 1024, prefetch=4):
+        """
+        Initialize the frame store
+
+        Args:
+            source: StepFileSource, RunFileSource or any object with
+                __len__, load(index) and info(index)
+            cache_frames: Maximum number of decoded frames kept in memory
+            max_bytes: Maximum memory used by decoded frames
+            prefetch: Number of frames to decode ahead of the last accessed one
+        """
+        self.source = source
+        self.cache_frames = max(1, cache_frames)
+        self.max_bytes = max_bytes
+        self.prefetch = prefetch
+        self._cache = OrderedDict()  # index -> (snapshot, nbytes)
+        self._cache_bytes = 0
+        self._pending = {}  # index -> Future
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1) if prefetch > 0 else None
+
+    def __len__(self):
+        return len(self.source)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def info(self, index):
+        """Per-frame info provided by the source"""
+        return self.source.info(index)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"Frame index {index} out of range")
+
+        with self._lock:
+            entry = self._cache.get(index)
+            if entry is not None:
+                self._cache.move_to_end(index)
+            future = self._pending.get(index)
+
+        if entry is not None:
+            frame = entry[0]
+        elif future is not None:
+            frame = future.result()
+        else:
+            frame = self.source.load(index)
+            self._insert(index, frame)
+
+        self._schedule_prefetch(index)
+        return frame
+
+    def _insert(self, index, frame):
+        nbytes = _frame_nbytes(frame)
+        with self._lock:
+            self._pending.pop(index, None)
+            if index in self._cache:
+                return
+            self._cache[index] = (frame, nbytes)
+            self._cache_bytes += nbytes
+            while len(self._cache) > 1 and (len(self._cache) > self.cache_frames or
+                                            self._cache_bytes > self.max_bytes):
+                _, (_, evicted_bytes) = self._cache.popitem(last=False)
+                self._cache_bytes -= evicted_bytes
+
+    def _load_and_insert(self, index):
+        try:
+            frame = self.source.load(index)
+        except Exception:
+            with self._lock:
+                self._pending.pop(index, None)
+            raise
+        self._insert(index, frame)
+        return frame
+
+    def _schedule_prefetch(self, index):
+        if self._executor is None:
+            return
+        # Never prefetch more than the cache can hold, or prefetched frames evict each other
+        count = min(self.prefetch, self.cache_frames - 1, len(self) - 1)
+        with self._lock:
+            for offset in range(1, count + 1):
+                ahead = (index + offset) % len(self)  # Animations loop back to the start
+                if ahead not in self._cache and ahead not in self._pending:
+                    self._pending[ahead] = self._executor.submit(self._load_and_insert, ahead)
+
+    def close(self):
+        """Stop the prefetch thread and drop cached frames"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        with self._lock:
+            self._cache.clear()
+            self._cache_bytes = 0
+            self._pending.clear()
+
+
+def open_frame_store(filename, num_frames=None, **kwargs):
+    """
+    Open a run file or a series of step files as a FrameStore
+
+    Args:
+        filename: Run file (.snnr) or any step file of a series
+        num_frames: Only expose the first N frames (None = all)
+        **kwargs: Passed on to FrameStore
+    """
+    if is_run_file(filename):
+        reader = RunReader(filename)
+        count = min(num_frames, len(reader)) if num_frames else len(reader)
+        source = RunFileSource(reader, range(count))
+    else:
+        step_files = find_step_files(filename)
+        if num_frames:
+            step_files = step_files[:num_frames]
+        source = StepFileSource([path for _, path in step_files],
+                                [{'step': step, 'file': path} for step, path in step_files])
+    return FrameStore(source, **kwargs)
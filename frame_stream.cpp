@@ -0,0 +1,92 @@
+#include "frame_stream.h"
+#include <sstream>
+#include <cstring>
+#include <cerrno>
+#include <cstdint>
+#include <csignal>
+#include <fcntl.h>
+#include <unistd.h>
+#include <sys/socket.h>
+#include <sys/un.h>
+
+namespace {
+
+const std::string UNIX_PREFIX = "unix:";
+
+int connect_unix_socket(const std::string& path) {
+    sockaddr_un addr;
+    if (path.size() >= sizeof(addr.sun_path)) {
+        return -1;
+    }
+    int fd = ::socket(AF_UNIX, SOCK_STREAM, 0);
+    if (fd < 0) {
+        return -1;
+    }
+    std::memset(&addr, 0, sizeof(addr));
+    addr.sun_family = AF_UNIX;
+    std::strncpy(addr.sun_path, path.c_str(), sizeof(addr.sun_path) - 1);
+    if (::connect(fd, reinterpret_cast<sockaddr*>(&addr), sizeof(addr)) < 0) {
+        ::close(fd);
+        return -1;
+    }
+    return fd;
+}
+
+}  // namespace
+
+FrameStream::FrameStream(const std::string& address) : fd(-1), frames_sent(0) {
+    // A viewer closing its end must not kill the simulation with SIGPIPE;
+    // the failed write is reported as EPIPE instead
+    std::signal(SIGPIPE, SIG_IGN);
+    
+    if (address.compare(0, UNIX_PREFIX.size(), UNIX_PREFIX) == 0) {
+        fd = connect_unix_socket(address.substr(UNIX_PREFIX.size()));
+    } else {
+        fd = ::open(address.c_str(), O_WRONLY);
+    }
+}
+
+FrameStream::~FrameStream() {
+    close();
+}
+
+bool FrameStream::send(const Network& network, int step) {
+    if (!is_open()) {
+        return false;
+    }
+    
+    std::ostringstream snapshot(std::ios::binary);
+    network.export_binary(snapshot, step);
+    const std::string payload = snapshot.str();
+    
+    uint32_t length = static_cast<uint32_t>(payload.size());
+    if (!write_all(reinterpret_cast<const char*>(&length), sizeof(length)) ||
+        !write_all(payload.data(), payload.size())) {
+        close();
+        return false;
+    }
+    frames_sent++;
+    return true;
+}
+
+void FrameStream::close() {
+    if (fd >= 0) {
+        ::close(fd);
+        fd = -1;
+    }
+}
+
+bool FrameStream::write_all(const char* data, size_t size) {
+    while (size > 0) {
+        ssize_t written = ::write(fd, data, size);
+        if (written < 0) {
+            if (errno == EINTR) {
+                continue;
+            }
+            return false;
+        }
+        data += written;
+        size -= static_cast<size_t>(written);
+    }
+    return true;
+}
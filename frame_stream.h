@@ -0,0 +1,42 @@
+#ifndef FRAME_STREAM_H
+#define FRAME_STREAM_H
+
+#include "network.h"
+#include <string>
+#include <cstddef>
+
+// Streams binary snapshots (see network_snapshot.py) to a live viewer
+// (live_stream.py) over a named pipe or a Unix domain socket. Every frame is a
+// little-endian u32 byte length followed by one snapshot. The viewer creates
+// the pipe or listening socket; the simulator connects to it:
+//   "unix:/tmp/snn.sock"  connect to a Unix socket
+//   "/tmp/snn.fifo"       open a named pipe (blocks until the viewer reads it)
+// If the viewer goes away the stream closes itself and the simulation goes on.
+class FrameStream {
+public:
+    explicit FrameStream(const std::string& address);
+    ~FrameStream();
+    
+    // Check if the viewer is connected
+    bool is_open() const { return fd >= 0; }
+    
+    // Send the current network state; returns false once the viewer is gone
+    bool send(const Network& network, int step);
+    
+    // Number of frames sent so far
+    size_t frame_count() const { return frames_sent; }
+    
+    // Close the connection
+    void close();
+    
+private:
+    int fd;
+    size_t frames_sent;
+    
+    bool write_all(const char* data, size_t size);
+    
+    FrameStream(const FrameStream&) = delete;
+    FrameStream& operator=(const FrameStream&) = delete;
+};
+
+#endif // FRAME_STREAM_H
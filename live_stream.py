@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Live frame stream from the C++ simulators to the viewers
+
+The simulators (simulate_spiking, train_with_animation with --stream) send
+every step as a length-prefixed binary snapshot:
+
+    length    u32 little-endian, size of the snapshot in bytes
+    snapshot  one .snn snapshot (see network_snapshot.py)
+
+over a named pipe or a Unix domain socket created by the viewer:
+
+    unix:/tmp/snn.sock    listening Unix socket
+    /tmp/snn.fifo         named pipe (created if it does not exist)
+
+A background thread reads and decodes frames into a small bounded queue. When
+the viewer draws slower than the simulator produces frames, the oldest queued
+frames are dropped so the viewer always shows the most recent state.
+
+train_mnist --shm <name> instead publishes into a POSIX shared-memory ring
+buffer ('shm:<name>', written by ShmPublisher in shm_publisher.cpp):
+
+    header (64 bytes, little-endian)
+        magic            4s   b'SNSM' (written last)
+        version          u16
+        header_size      u16
+        num_neurons      u32
+        num_edges        u32
+        num_slots        u32
+        flags            u32  (1 = slots carry weights)
+        slot_size        u64
+        topology_offset  u64
+        slots_offset     u64
+        sequence         u64  last complete frame (0 = none yet)
+        reserved         u64
+    topology (written once, 8-byte aligned sections)
+        indptr u32[num_neurons + 1], indices u32[num_edges], weights f32[num_edges]
+    slots[num_slots], frame s in slot s % num_slots
+        sequence u64 (0 while being written), step i32, reserved u32,
+        potential f32[N], spike_count i32[N], spiked u8[ceil(N / 8)],
+        weights f32[E] (only with flag 1)
+
+SharedStateReader maps the segment and copies a frame's arrays out of its slot
+before checking that the slot was not rewritten meanwhile, so every frame it
+returns is consistent. With copy=False it returns NumPy views into the slot
+instead; these are only valid until the simulator writes that slot again.
+"""
+
+import os
+import queue
+import socket
+import stat
+import struct
+import threading
+import time
+
+import numpy as np
+
+from network_snapshot import NetworkSnapshot
+
+
+UNIX_PREFIX = 'unix:'
+SHM_PREFIX = 'shm:'
+SHM_MAGIC = b'SNSM'
+SHM_FLAG_WEIGHTS = 1
+
+_LENGTH = struct.Struct('<I')
+_SHM_HEADER = struct.Struct('<4sHHIIIIQQQQQ')
+_SHM_SEQUENCE_OFFSET = 48
+_SLOT_HEADER_SIZE = 16
+
+
+def _align8(offset):
+    return (offset + 7) & ~7
+
+
+def _read_exact(read, size):
+    """Read exactly size bytes, or return None at end of stream"""
+    chunks = []
+    while size > 0:
+        chunk = read(size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+class FrameStreamReader:
+    """Receives snapshots from a simulator on a background thread"""
+
+    def __init__(self, address, max_queue=2):
+        """
+        Create the pipe or listening socket and start the reader thread
+
+        Args:
+            address: 'unix:<path>' for a Unix socket, otherwise a named pipe path
+            max_queue: Number of decoded frames buffered before old ones are dropped
+        """
+        self.address = address
+        self.frames = queue.Queue(maxsize=max(1, max_queue))
+        self.frames_received = 0
+        self.frames_dropped = 0
+        self.error = None
+        self._stop = threading.Event()
+        self._connection = None
+        self._socket = None
+        self._created = True
+
+        if address.startswith(UNIX_PREFIX):
+            self.path = address[len(UNIX_PREFIX):]
+            if os.path.exists(self.path):
+                os.unlink(self.path)  # Left over from an earlier viewer
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.bind(self.path)
+            self._socket.listen(1)
+        else:
+            self.path = address
+            if not os.path.exists(self.path):
+                os.mkfifo(self.path)
+            elif stat.S_ISFIFO(os.stat(self.path).st_mode):
+                self._created = False
+            else:
+                raise ValueError(f"{self.path} exists and is not a named pipe")
+
+        self._thread = threading.Thread(target=self._run, name='frame-stream', daemon=True)
+        self._thread.start()
+
+    def _connections(self):
+        """Yield a read(size) function per simulator connection until stopped"""
+        while not self._stop.is_set():
+            if self._socket is not None:
+                try:
+                    connection, _ = self._socket.accept()
+                except OSError:
+                    return  # Listening socket closed by close()
+                with connection:
+                    self._connection = connection
+                    yield connection.recv
+            else:
+                # Blocks until a simulator opens the pipe for writing
+                with open(self.path, 'rb', buffering=0) as pipe:
+                    self._connection = pipe
+                    yield pipe.read
+            self._connection = None
+
+    def _run(self):
+        try:
+            for read in self._connections():
+                while not self._stop.is_set():
+                    header = _read_exact(read, _LENGTH.size)
+                    if header is None:
+                        break  # Simulator finished; wait for the next one
+                    payload = _read_exact(read, _LENGTH.unpack(header)[0])
+                    if payload is None:
+                        break
+                    self._put(NetworkSnapshot.from_buffer(payload))
+        except Exception as e:
+            if not self._stop.is_set():
+                self.error = e
+
+    def _put(self, frame):
+        self.frames_received += 1
+        while True:
+            try:
+                self.frames.put_nowait(frame)
+                return
+            except queue.Full:
+                try:
+                    self.frames.get_nowait()
+                    self.frames_dropped += 1
+                except queue.Empty:
+                    pass
+
+    def latest(self):
+        """
+        Newest received frame, discarding older queued frames
+
+        Returns:
+            NetworkSnapshot, or None if no new frame arrived since the last call
+        """
+        frame = None
+        while True:
+            try:
+                newer = self.frames.get_nowait()
+            except queue.Empty:
+                return frame
+            if frame is not None:
+                self.frames_dropped += 1
+            frame = newer
+
+    def wait(self, timeout=None):
+        """
+        Block until a frame arrives
+
+        Returns:
+            NetworkSnapshot, or None on timeout
+        """
+        try:
+            return self.frames.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        """Stop the reader thread and remove the socket or pipe"""
+        self._stop.set()
+        if self._socket is not None:
+            # shutdown() wakes up a blocked accept()/recv()
+            for sock in (self._socket, self._connection):
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except (OSError, AttributeError):
+                    pass
+            self._socket.close()
+        else:
+            try:
+                # A reader blocked in open() only returns once a writer shows up
+                os.close(os.open(self.path, os.O_WRONLY | os.O_NONBLOCK))
+            except OSError:
+                pass
+        self._thread.join(timeout=1.0)
+        if self._created and os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+class SharedStateReader:
+    """Reads the live network state published by ShmPublisher (train_mnist --shm)"""
+
+    def __init__(self, name, copy=True, timeout=None):
+        """
+        Attach to a shared-memory segment
+
+        Args:
+            name: Segment name as given to the simulator (with or without '/')
+            copy: Return copies of the slot's arrays (consistent frames). With
+                False the frames are views into the segment: the simulator
+                overwrites them after num_slots - 1 further frames, possibly
+                while they are being read, so they are no consistent snapshot.
+            timeout: Seconds to wait for the simulator to create the segment
+                (None = wait forever)
+        """
+        from multiprocessing import shared_memory
+
+        self.name = name.lstrip('/')
+        self.copy = copy
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                self.shm = shared_memory.SharedMemory(name=self.name)
+            except FileNotFoundError:
+                if deadline is not None and time.monotonic() > deadline:
+                    raise
+                time.sleep(0.1)
+                continue
+            if bytes(self.shm.buf[:4]) == SHM_MAGIC:
+                break
+            self.shm.close()  # Created but not initialized yet
+            time.sleep(0.1)
+        self._untrack()
+
+        buf = self.shm.buf
+        (_magic, version, header_size, num_neurons, num_edges, num_slots, flags,
+         slot_size, topology_offset, slots_offset, _sequence, _reserved) = \
+            _SHM_HEADER.unpack_from(buf)
+        if version != 1 or header_size != _SHM_HEADER.size:
+            raise ValueError(f"Unsupported shared state version {version}")
+        self.num_neurons = num_neurons
+        self.num_edges = num_edges
+        self.num_slots = num_slots
+        self.has_weights = bool(flags & SHM_FLAG_WEIGHTS)
+        self.frames_received = 0
+        self.frames_dropped = 0
+        self._last_sequence = 0
+
+        self._sequence = np.ndarray((), dtype='<u8', buffer=buf, offset=_SHM_SEQUENCE_OFFSET)
+        offset = topology_offset
+        self.indptr = np.ndarray(num_neurons + 1, dtype='<u4', buffer=buf, offset=offset)
+        offset = _align8(offset + 4 * (num_neurons + 1))
+        self.indices = np.ndarray(num_edges, dtype='<u4', buffer=buf, offset=offset)
+        offset = _align8(offset + 4 * num_edges)
+        self.initial_weights = np.ndarray(num_edges, dtype='<f4', buffer=buf, offset=offset)
+
+        # Per-slot views, created once
+        self._slots = []
+        for i in range(num_slots):
+            base = slots_offset + i * slot_size
+            potential = base + _SLOT_HEADER_SIZE
+            spike_count = _align8(potential + 4 * num_neurons)
+            spiked = _align8(spike_count + 4 * num_neurons)
+            weights = _align8(spiked + (num_neurons + 7) // 8)
+            self._slots.append({
+                'sequence': np.ndarray((), dtype='<u8', buffer=buf, offset=base),
+                'step': np.ndarray((), dtype='<i4', buffer=buf, offset=base + 8),
+                'potential': np.ndarray(num_neurons, dtype='<f4', buffer=buf, offset=potential),
+                'spike_count': np.ndarray(num_neurons, dtype='<i4', buffer=buf, offset=spike_count),
+                'spiked': np.ndarray((num_neurons + 7) // 8, dtype=np.uint8, buffer=buf,
+                                     offset=spiked),
+                'weights': (np.ndarray(num_edges, dtype='<f4', buffer=buf, offset=weights)
+                            if self.has_weights else self.initial_weights),
+            })
+
+    def _untrack(self):
+        # Before Python 3.13 attaching registers the segment with the resource
+        # tracker, which would unlink the simulator's segment when we exit
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(self.shm._name, 'shared_memory')
+        except Exception:
+            pass
+
+    @property
+    def sequence(self):
+        """Sequence number of the last frame published by the simulator"""
+        return int(self._sequence)
+
+    def _read(self, sequence):
+        slot = self._slots[sequence % self.num_slots]
+        if int(slot['sequence']) != sequence:
+            return None  # Already being overwritten
+        spiked = np.unpackbits(slot['spiked'], count=self.num_neurons,
+                               bitorder='little').astype(bool)
+        arrays = [slot['weights'], slot['potential'], slot['spike_count']]
+        if self.copy:
+            # Copy first, then check the sequence: the copies are consistent
+            arrays = [array.copy() for array in arrays]
+        step = int(slot['step'])
+        if int(slot['sequence']) != sequence:
+            return None  # Overwritten while reading (views: only detects this point)
+        weights, potential, spike_count = arrays
+        return NetworkSnapshot(self.indptr, self.indices, weights, potential, spiked,
+                               spike_count, step)
+
+    def latest(self):
+        """
+        Newest published frame
+
+        Returns:
+            NetworkSnapshot, or None if nothing new was published since the last call
+        """
+        for _ in range(self.num_slots):
+            sequence = self.sequence
+            if sequence == 0 or sequence == self._last_sequence:
+                return None
+            frame = self._read(sequence)
+            if frame is not None:
+                if self._last_sequence:
+                    self.frames_dropped += sequence - self._last_sequence - 1
+                self.frames_received += 1
+                self._last_sequence = sequence
+                return frame
+        return None
+
+    def wait(self, timeout=None, poll_interval=0.01):
+        """
+        Block until a new frame is published
+
+        Returns:
+            NetworkSnapshot, or None on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            frame = self.latest()
+            if frame is not None:
+                return frame
+            if deadline is not None and time.monotonic() > deadline:
+                return None
+            time.sleep(poll_interval)
+
+    def close(self):
+        """Detach from the segment (the simulator owns and removes it)"""
+        # Views into the buffer must be gone before it can be unmapped
+        self._slots = []
+        self._sequence = self.indptr = self.indices = self.initial_weights = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass  # Frames handed out earlier still reference the mapping
+
+
+def is_live_address(address):
+    """Check whether an address names a live source rather than a file"""
+    if address.startswith((UNIX_PREFIX, SHM_PREFIX)):
+        return True
+    return os.path.exists(address) and stat.S_ISFIFO(os.stat(address).st_mode)
+
+
+def open_live_stream(address, **kwargs):
+    """
+    Open a live frame source
+
+    Args:
+        address: 'shm:<name>' for shared memory, 'unix:<path>' for a Unix socket,
+            otherwise a named pipe path
+        **kwargs: Passed on to the reader
+
+    Returns:
+        SharedStateReader or FrameStreamReader (both provide latest(), wait()
+        and close())
+    """
+    if address.startswith(SHM_PREFIX):
+        return SharedStateReader(address[len(SHM_PREFIX):], **kwargs)
+    return FrameStreamReader(address, **kwargs)
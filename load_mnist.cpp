@@ -8,9 +8,19 @@
 #include <cmath>
 #include <random>
 #include <cstdlib>
+#include <cstring>
+#include <ctime>
+#include <iterator>
+#include <utility>
+#include <fcntl.h>
+#include <unistd.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
 
 // MNIST data loader for C++
-// Loads MNIST dataset from original binary format or CSV
+// Loads MNIST dataset from original binary format (IDX) or CSV, and caches it
+// as one memory-mapped file of uint8 images and labels. Datasets converted by
+// mnist_dataset.py (images.npy / labels.npy) are mapped directly.
 
 class MNISTLoader {
 public:
@@ -21,48 +31,386 @@ public:
     
     // Load MNIST from CSV format (easier to work with)
     static std::vector<Sample> load_from_csv(const std::string& filename) {
-        std::vector<Sample> dataset;
-        std::ifstream file(filename);
+        return to_samples(load_csv(filename));
+    }
+    
+    // Whole dataset in two contiguous uint8 arrays: images (count x rows x cols
+    // pixels, 0-255, row-major) and labels. The arrays are either owned or
+    // read-only memory mappings of a cache file or of a .npy pair.
+    class Dataset {
+    public:
+        Dataset() : rows(0), cols(0), count(0), image_data(nullptr), label_data(nullptr) {}
+        
+        ~Dataset() { release(); }
+        
+        Dataset(Dataset&& other) : Dataset() { *this = std::move(other); }
+        
+        Dataset& operator=(Dataset&& other) {
+            if (this != &other) {
+                release();
+                rows = other.rows;
+                cols = other.cols;
+                count = other.count;
+                storage = std::move(other.storage);
+                mappings.swap(other.mappings);
+                image_data = other.image_data;  // Moving storage keeps its buffer
+                label_data = other.label_data;
+                other.clear_view();
+            }
+            return *this;
+        }
         
+        Dataset(const Dataset&) = delete;
+        Dataset& operator=(const Dataset&) = delete;
+        
+        // Allocate owned arrays for count images of rows x cols pixels
+        void allocate(size_t num_images, size_t num_rows, size_t num_cols) {
+            release();
+            rows = num_rows;
+            cols = num_cols;
+            count = num_images;
+            storage.assign(count * rows * cols + count, 0);
+            image_data = storage.data();
+            label_data = storage.data() + count * rows * cols;
+        }
+        
+        size_t size() const { return count; }
+        bool empty() const { return count == 0; }
+        size_t image_rows() const { return rows; }
+        size_t image_cols() const { return cols; }
+        size_t pixels() const { return rows * cols; }
+        bool is_mapped() const { return !mappings.empty(); }
+        
+        // Keep only the first max_images images
+        void truncate(size_t max_images) { count = std::min(count, max_images); }
+        
+        const uint8_t* image(size_t index) const { return image_data + index * pixels(); }
+        int label(size_t index) const { return label_data[index]; }
+        const uint8_t* images() const { return image_data; }
+        const uint8_t* labels() const { return label_data; }
+        
+        // Writable arrays (owned datasets only)
+        uint8_t* mutable_images() { return storage.data(); }
+        uint8_t* mutable_labels() { return storage.data() + count * rows * cols; }
+        
+        // Use arrays inside read-only mappings; the mappings (start, size) are
+        // unmapped together with the dataset
+        void adopt_mappings(const std::vector<std::pair<void*, size_t>>& regions, const uint8_t* images,
+                            const uint8_t* labels, size_t num_images, size_t num_rows, size_t num_cols) {
+            release();
+            mappings = regions;
+            rows = num_rows;
+            cols = num_cols;
+            count = num_images;
+            image_data = images;
+            label_data = labels;
+        }
+        
+    private:
+        size_t rows;
+        size_t cols;
+        size_t count;
+        const uint8_t* image_data;
+        const uint8_t* label_data;
+        std::vector<uint8_t> storage;                       // Owned images followed by labels
+        std::vector<std::pair<void*, size_t>> mappings;     // Memory-mapped files
+        
+        void clear_view() {
+            rows = cols = count = 0;
+            image_data = nullptr;
+            label_data = nullptr;
+        }
+        
+        void release() {
+            for (size_t i = 0; i < mappings.size(); ++i) {
+                munmap(mappings[i].first, mappings[i].second);
+            }
+            mappings.clear();
+            storage.clear();
+            storage.shrink_to_fit();
+            clear_view();
+        }
+    };
+    
+    // Load a dataset from any supported file and cache it: the original IDX
+    // files (give the images file, e.g. train-images-idx3-ubyte; the labels
+    // file name is derived from it), a CSV file (label,pixel0,...,pixel783 with
+    // a header line) or a cache file. After the first load a cache file
+    // <path>.cache is written next to the source, and later runs map it
+    // instead of parsing the source again. A directory written by
+    // mnist_dataset.py (or its images.npy / manifest.json) is mapped as is.
+    static Dataset load_dataset(const std::string& path) {
+        const std::string cache_path = path + ".cache";
+        const std::string npy_path = npy_images_path(path);
+        if (!npy_path.empty()) {
+            return load_npy(npy_path, idx_labels_path(npy_path));
+        }
+        if (is_cache_file(path)) {
+            return map_cache(path);
+        }
+        // The cache is stale if the source (for IDX also the labels file) is newer
+        const bool idx = is_idx_images_file(path);
+        const time_t source_mtime = idx ? std::max(file_mtime(path), file_mtime(idx_labels_path(path)))
+                                        : file_mtime(path);
+        if (file_mtime(cache_path) >= source_mtime && file_mtime(path) > 0) {
+            Dataset cached = map_cache(cache_path);
+            if (!cached.empty()) {
+                return cached;
+            }
+        }
+        
+        Dataset dataset = idx ? load_idx(path, idx_labels_path(path)) : load_csv(path);
+        if (!dataset.empty() && !save_cache(dataset, cache_path)) {
+            std::cerr << "Warning: Could not write dataset cache " << cache_path << "\n";
+        }
+        return dataset;
+    }
+    
+    // Load the original MNIST IDX files (big-endian headers, uint8 pixels)
+    static Dataset load_idx(const std::string& images_file, const std::string& labels_file) {
+        Dataset dataset;
+        std::ifstream images(images_file, std::ios::binary);
+        std::ifstream labels(labels_file, std::ios::binary);
+        if (!images.is_open() || !labels.is_open()) {
+            std::cerr << "Error: Could not open " << (images.is_open() ? labels_file : images_file) << "\n";
+            return dataset;
+        }
+        
+        uint32_t image_header[4];
+        uint32_t label_header[2];
+        if (!read_big_endian(images, image_header, 4) || !read_big_endian(labels, label_header, 2) ||
+            image_header[0] != IDX_IMAGES_MAGIC || label_header[0] != IDX_LABELS_MAGIC) {
+            std::cerr << "Error: " << images_file << " / " << labels_file << " are not MNIST IDX files\n";
+            return dataset;
+        }
+        if (image_header[1] != label_header[1]) {
+            std::cerr << "Error: " << image_header[1] << " images but " << label_header[1] << " labels\n";
+            return dataset;
+        }
+        
+        dataset.allocate(image_header[1], image_header[2], image_header[3]);
+        images.read(reinterpret_cast<char*>(dataset.mutable_images()),
+                    static_cast<std::streamsize>(dataset.size() * dataset.pixels()));
+        labels.read(reinterpret_cast<char*>(dataset.mutable_labels()),
+                    static_cast<std::streamsize>(dataset.size()));
+        if (!images || !labels) {
+            std::cerr << "Error: Truncated IDX file " << (images ? labels_file : images_file) << "\n";
+            return Dataset();
+        }
+        return dataset;
+    }
+    
+    // Load a CSV file (label,pixel0,...,pixel783 per line after a header line)
+    // into a dataset, parsing the integers in place
+    static Dataset load_csv(const std::string& filename) {
+        Dataset dataset;
+        std::ifstream file(filename, std::ios::binary);
         if (!file.is_open()) {
             std::cerr << "Error: Could not open " << filename << "\n";
             std::cerr << "MNIST CSV files can be downloaded from:\n";
             std::cerr << "  https://www.kaggle.com/datasets/oddrationale/mnist-in-csv\n";
             return dataset;
         }
+        std::string text((std::istreambuf_iterator<char>(file)), std::istreambuf_iterator<char>());
         
-        std::string line;
-        bool first_line = true;
+        // Skip the header line
+        const char* p = text.c_str();
+        const char* end = p + text.size();
+        while (p < end && *p != '\n') ++p;
         
-        while (std::getline(file, line)) {
-            if (first_line) {
-                first_line = false;
-                continue; // Skip header
-            }
-            
-            std::stringstream ss(line);
-            std::string item;
-            
-            Sample s;
+        std::vector<uint8_t> labels;
+        std::vector<uint8_t> pixels;
+        size_t pixels_per_line = 0;
+        while (p < end) {
+            ++p;  // Newline
+            size_t line_start = pixels.size();
             bool first = true;
-            
-            while (std::getline(ss, item, ',')) {
+            bool any = false;
+            while (p < end && *p != '\n') {
+                unsigned value = 0;
+                while (p < end && *p >= '0' && *p <= '9') {
+                    value = value * 10 + static_cast<unsigned>(*p - '0');
+                    any = true;
+                    ++p;
+                }
                 if (first) {
-                    s.label = std::stoi(item);
+                    labels.push_back(static_cast<uint8_t>(value));
                     first = false;
                 } else {
-                    // Normalize pixel values from 0-255 to 0-1
-                    double pixel_value = std::stod(item) / 255.0;
-                    s.data.push_back(pixel_value);
+                    pixels.push_back(static_cast<uint8_t>(std::min(value, 255u)));
                 }
+                while (p < end && *p != ',' && *p != '\n') ++p;  // '\r' and anything unexpected
+                if (p < end && *p == ',') ++p;
             }
-            
-            dataset.push_back(s);
+            if (!any) {
+                if (!first) labels.pop_back();
+                pixels.resize(line_start);
+                continue;  // Empty line
+            }
+            size_t line_pixels = pixels.size() - line_start;
+            if (pixels_per_line == 0) {
+                pixels_per_line = line_pixels;
+            }
+            pixels.resize(line_start + pixels_per_line, 0);  // Pad or cut short lines
+        }
+        
+        size_t side = static_cast<size_t>(std::sqrt(static_cast<double>(pixels_per_line)) + 0.5);
+        if (side * side != pixels_per_line) {
+            side = 0;  // Not square: keep one row
+        }
+        dataset.allocate(labels.size(), side ? side : 1, side ? side : pixels_per_line);
+        if (!labels.empty()) {
+            std::copy(pixels.begin(), pixels.end(), dataset.mutable_images());
+            std::copy(labels.begin(), labels.end(), dataset.mutable_labels());
+        }
+        return dataset;
+    }
+    
+    // Write a dataset as a cache file: 32-byte header (magic "SNNM", u16
+    // version, u16 header size, u32 count, rows, cols, images offset, labels
+    // offset, reserved), then the images and the labels
+    static bool save_cache(const Dataset& dataset, const std::string& filename) {
+        std::ofstream out(filename, std::ios::binary);
+        if (!out.is_open()) {
+            return false;
+        }
+        const uint32_t images_offset = CACHE_HEADER_SIZE;
+        const uint32_t labels_offset = images_offset + static_cast<uint32_t>(dataset.size() * dataset.pixels());
+        const uint32_t header[] = {
+            static_cast<uint32_t>(dataset.size()), static_cast<uint32_t>(dataset.image_rows()),
+            static_cast<uint32_t>(dataset.image_cols()), images_offset, labels_offset, 0
+        };
+        const uint16_t version = CACHE_VERSION;
+        const uint16_t header_size = CACHE_HEADER_SIZE;
+        out.write("SNNM", 4);
+        out.write(reinterpret_cast<const char*>(&version), sizeof(version));
+        out.write(reinterpret_cast<const char*>(&header_size), sizeof(header_size));
+        out.write(reinterpret_cast<const char*>(header), sizeof(header));
+        out.write(reinterpret_cast<const char*>(dataset.images()),
+                  static_cast<std::streamsize>(dataset.size() * dataset.pixels()));
+        out.write(reinterpret_cast<const char*>(dataset.labels()), static_cast<std::streamsize>(dataset.size()));
+        out.close();
+        return static_cast<bool>(out);
+    }
+    
+    // Map a cache file written by save_cache (read-only, shared page cache)
+    static Dataset map_cache(const std::string& filename) {
+        Dataset dataset;
+        size_t size = 0;
+        void* data = map_file(filename, size);
+        if (!data) {
+            return dataset;
+        }
+        if (size < CACHE_HEADER_SIZE) {
+            munmap(data, size);
+            return dataset;
+        }
+        
+        const char* bytes = static_cast<const char*>(data);
+        uint16_t version;
+        uint16_t header_size;
+        uint32_t header[6];
+        std::memcpy(&version, bytes + 4, sizeof(version));
+        std::memcpy(&header_size, bytes + 6, sizeof(header_size));
+        std::memcpy(header, bytes + 8, sizeof(header));
+        const size_t count = header[0];
+        const size_t pixels = static_cast<size_t>(header[1]) * header[2];
+        if (std::memcmp(bytes, "SNNM", 4) != 0 || version != CACHE_VERSION ||
+            header_size != CACHE_HEADER_SIZE || header[3] + count * pixels > size ||
+            header[4] + count > size) {
+            std::cerr << "Error: Invalid dataset cache " << filename << "\n";
+            munmap(data, size);
+            return dataset;
         }
+        dataset.adopt_mappings({{data, size}}, static_cast<const uint8_t*>(data) + header[3],
+                               static_cast<const uint8_t*>(data) + header[4], count, header[1], header[2]);
+        return dataset;
+    }
+    
+    // Map an images.npy / labels.npy pair written by mnist_dataset.py: uint8
+    // arrays of shape (count, rows, cols) or (count, pixels) and (count,)
+    static Dataset load_npy(const std::string& images_file, const std::string& labels_file) {
+        Dataset dataset;
+        std::vector<size_t> image_shape;
+        std::vector<size_t> label_shape;
+        size_t images_size = 0;
+        size_t labels_size = 0;
+        size_t images_offset = 0;
+        size_t labels_offset = 0;
+        void* images = map_npy(images_file, images_size, images_offset, image_shape);
+        void* labels = map_npy(labels_file, labels_size, labels_offset, label_shape);
         
+        bool valid = images && labels && (image_shape.size() == 2 || image_shape.size() == 3) &&
+                     label_shape.size() == 1 && label_shape[0] == image_shape[0];
+        size_t rows = 0;
+        size_t cols = 0;
+        if (valid) {
+            rows = image_shape.size() == 3 ? image_shape[1] : 1;
+            cols = image_shape.back();
+            valid = images_offset + image_shape[0] * rows * cols <= images_size &&
+                    labels_offset + label_shape[0] <= labels_size;
+        }
+        if (!valid) {
+            std::cerr << "Error: Could not map dataset " << images_file << " / " << labels_file << "\n";
+            if (images) munmap(images, images_size);
+            if (labels) munmap(labels, labels_size);
+            return dataset;
+        }
+        if (image_shape.size() == 2) {
+            // Flat images: square if the pixel count is a square
+            size_t side = static_cast<size_t>(std::sqrt(static_cast<double>(cols)) + 0.5);
+            if (side * side == cols) {
+                rows = cols = side;
+            }
+        }
+        dataset.adopt_mappings({{images, images_size}, {labels, labels_size}},
+                               static_cast<const uint8_t*>(images) + images_offset,
+                               static_cast<const uint8_t*>(labels) + labels_offset, image_shape[0], rows, cols);
         return dataset;
     }
     
+    // Samples with pixels scaled to 0-1 (at most max_samples of them)
+    static std::vector<Sample> to_samples(const Dataset& dataset, size_t max_samples = SIZE_MAX) {
+        std::vector<Sample> samples(std::min(dataset.size(), max_samples));
+        for (size_t i = 0; i < samples.size(); ++i) {
+            const uint8_t* image = dataset.image(i);
+            samples[i].data.resize(dataset.pixels());
+            for (size_t k = 0; k < dataset.pixels(); ++k) {
+                samples[i].data[k] = image[k] / 255.0;
+            }
+            samples[i].label = dataset.label(i);
+        }
+        return samples;
+    }
+    
+    // Dataset of samples with 0-1 pixels (rounded to 0-255), square images if
+    // the pixel count is a square
+    static Dataset from_samples(const std::vector<Sample>& samples) {
+        Dataset dataset;
+        const size_t pixels = samples.empty() ? 0 : samples[0].data.size();
+        size_t side = static_cast<size_t>(std::sqrt(static_cast<double>(pixels)) + 0.5);
+        if (side * side == pixels) {
+            dataset.allocate(samples.size(), side, side);
+        } else {
+            dataset.allocate(samples.size(), 1, pixels);
+        }
+        uint8_t* images = dataset.mutable_images();
+        uint8_t* labels = dataset.mutable_labels();
+        for (size_t i = 0; i < samples.size(); ++i) {
+            for (size_t k = 0; k < pixels && k < samples[i].data.size(); ++k) {
+                double value = std::min(std::max(samples[i].data[k], 0.0), 1.0);
+                images[i * pixels + k] = static_cast<uint8_t>(value * 255.0 + 0.5);
+            }
+            labels[i] = static_cast<uint8_t>(samples[i].label);
+        }
+        return dataset;
+    }
+    
+    // Synthetic MNIST-like dataset (samples_per_digit images of each digit)
+    static Dataset generate_synthetic_dataset(int samples_per_digit = 100) {
+        return from_samples(generate_synthetic_mnist(samples_per_digit));
+    }
+    
     // Generate synthetic MNIST-like data for testing (if real MNIST not available)
     static std::vector<Sample> generate_synthetic_mnist(int samples_per_digit = 100) {
         std::vector<Sample> dataset;
@@ -87,6 +435,151 @@ public:
     
     
 private:
+    // IDX and cache file format constants
+    static const uint32_t IDX_IMAGES_MAGIC = 0x00000803;
+    static const uint32_t IDX_LABELS_MAGIC = 0x00000801;
+    static const uint16_t CACHE_VERSION = 1;
+    static const uint16_t CACHE_HEADER_SIZE = 32;
+    
+    static bool has_magic(const std::string& path, const char magic[4]) {
+        std::ifstream file(path, std::ios::binary);
+        char bytes[4] = {0, 0, 0, 0};
+        file.read(bytes, 4);
+        return file && std::memcmp(bytes, magic, 4) == 0;
+    }
+    
+    static bool is_cache_file(const std::string& path) {
+        return has_magic(path, "SNNM");
+    }
+    
+    static bool is_idx_images_file(const std::string& path) {
+        static const char magic[4] = {0, 0, 8, 3};
+        return has_magic(path, magic);
+    }
+    
+    // train-images-idx3-ubyte -> train-labels-idx1-ubyte, images.npy -> labels.npy
+    static std::string idx_labels_path(const std::string& images_path) {
+        std::string path = images_path;
+        size_t slash = path.find_last_of('/');
+        size_t name_start = slash == std::string::npos ? 0 : slash + 1;
+        size_t pos = path.find("images", name_start);
+        if (pos != std::string::npos) path.replace(pos, 6, "labels");
+        pos = path.find("idx3", name_start);
+        if (pos != std::string::npos) path.replace(pos, 4, "idx1");
+        return path;
+    }
+    
+    // images.npy of a dataset directory, its manifest.json or the file itself
+    // (empty if path is none of these)
+    static std::string npy_images_path(const std::string& path) {
+        struct stat info;
+        std::string images_path = path;
+        const std::string manifest = "manifest.json";
+        if (stat(path.c_str(), &info) == 0 && S_ISDIR(info.st_mode)) {
+            images_path = path + "/images.npy";
+        } else if (path.size() >= manifest.size() &&
+                   path.compare(path.size() - manifest.size(), manifest.size(), manifest) == 0) {
+            images_path = path.substr(0, path.size() - manifest.size()) + "images.npy";
+        }
+        return has_magic(images_path, "\x93NUM") ? images_path : std::string();
+    }
+    
+    // Map a whole file read-only (nullptr on failure)
+    static void* map_file(const std::string& filename, size_t& size) {
+        int fd = open(filename.c_str(), O_RDONLY);
+        if (fd < 0) {
+            return nullptr;
+        }
+        struct stat info;
+        if (fstat(fd, &info) != 0 || info.st_size <= 0) {
+            close(fd);
+            return nullptr;
+        }
+        size = static_cast<size_t>(info.st_size);
+        void* data = mmap(nullptr, size, PROT_READ, MAP_SHARED, fd, 0);
+        close(fd);
+        return data == MAP_FAILED ? nullptr : data;
+    }
+    
+    // Map a .npy file holding a C-order uint8 array: returns the mapping and
+    // sets the offset of the data and the shape (nullptr if not such a file)
+    static void* map_npy(const std::string& filename, size_t& size, size_t& data_offset,
+                         std::vector<size_t>& shape) {
+        void* data = map_file(filename, size);
+        if (!data) {
+            return nullptr;
+        }
+        // Magic, version, header length (u16 for version 1, u32 for 2 and 3),
+        // then a Python dict literal, e.g.
+        // {'descr': '|u1', 'fortran_order': False, 'shape': (60000, 28, 28), }
+        const char* bytes = static_cast<const char*>(data);
+        size_t header_start = 10;
+        size_t header_length = 0;
+        if (size >= 12 && std::memcmp(bytes, "\x93NUMPY", 6) == 0) {
+            header_start = bytes[6] == 1 ? 10 : 12;
+            header_length = static_cast<unsigned char>(bytes[8]) | static_cast<unsigned char>(bytes[9]) << 8;
+            if (header_start == 12) {
+                header_length |= static_cast<size_t>(static_cast<unsigned char>(bytes[10])) << 16 |
+                                 static_cast<size_t>(static_cast<unsigned char>(bytes[11])) << 24;
+            }
+        }
+        data_offset = header_start + header_length;
+        if (header_length == 0 || data_offset > size) {
+            munmap(data, size);
+            return nullptr;
+        }
+        
+        const std::string header(bytes + header_start, header_length);
+        const size_t descr = header.find("'descr':");
+        const size_t order = header.find("'fortran_order':");
+        const size_t shape_start = header.find("'shape':");
+        bool valid = descr != std::string::npos && order != std::string::npos && shape_start != std::string::npos;
+        if (valid) {
+            const size_t type_start = header.find('\'', descr + 8);
+            const size_t order_value = header.find_first_not_of(' ', order + 16);
+            valid = type_start != std::string::npos && header.compare(type_start + 1, 3, "|u1") == 0 &&
+                    order_value != std::string::npos && header.compare(order_value, 5, "False") == 0;
+        }
+        const size_t shape_open = header.find('(', shape_start);
+        valid = valid && shape_open != std::string::npos;
+        shape.clear();
+        if (valid) {
+            const char* p = header.c_str() + shape_open + 1;
+            while (*p && *p != ')') {
+                char* end = nullptr;
+                long dimension = std::strtol(p, &end, 10);
+                if (end == p || dimension < 0) {
+                    valid = false;
+                    break;
+                }
+                shape.push_back(static_cast<size_t>(dimension));
+                p = end;
+                while (*p == ',' || *p == ' ') ++p;
+            }
+        }
+        if (!valid) {
+            munmap(data, size);
+            return nullptr;
+        }
+        return data;
+    }
+    
+    // Modification time of a file (0 if it does not exist)
+    static time_t file_mtime(const std::string& path) {
+        struct stat info;
+        return stat(path.c_str(), &info) == 0 ? info.st_mtime : 0;
+    }
+    
+    static bool read_big_endian(std::istream& in, uint32_t* values, size_t count) {
+        for (size_t i = 0; i < count; ++i) {
+            unsigned char bytes[4];
+            if (!in.read(reinterpret_cast<char*>(bytes), 4)) return false;
+            values[i] = static_cast<uint32_t>(bytes[0]) << 24 | static_cast<uint32_t>(bytes[1]) << 16 |
+                        static_cast<uint32_t>(bytes[2]) << 8 | bytes[3];
+        }
+        return true;
+    }
+    
     static void create_mnist_digit_pattern(int digit, std::vector<double>& pattern, 
                                           int image_size, int variation) {
         std::mt19937 gen(digit * 10000 + variation);
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+MNIST converted once into memory-mappable NumPy files
+
+`convert` reads MNIST from CSV (label,pixel0,...,pixel783) or the original IDX
+files (optionally gzipped) and writes a dataset directory:
+
+    images.npy         u8[count, rows, cols]  pixels 0-255
+    labels.npy         u8[count]
+    class_offsets.npy  u32[num_classes + 1]   per-class index table: the ids of
+    class_indices.npy  u32[count]             class c are class_indices[offsets[c]:offsets[c + 1]]
+    split_<name>.npy   u32[n]                 sorted sample ids of a split (e.g. train, validation)
+    manifest.json      shapes, class counts, splits and the source file
+
+Every array can be opened with np.load(mmap_mode='r'), so analysis scripts
+never parse the data again. MNISTLoader::load_dataset() in load_mnist.cpp maps
+images.npy and labels.npy directly (pass the directory or images.npy to
+train_mnist / test_mnist), and `export` writes a split as its own dataset
+directory for the trainers.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import struct
+import sys
+
+import numpy as np
+
+
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_FORMAT = 'snn-mnist'
+MANIFEST_VERSION = 1
+NUM_CLASSES = 10
+
+IDX_IMAGES_MAGIC = 0x00000803
+IDX_LABELS_MAGIC = 0x00000801
+
+
+def _open_source(filename):
+    """Open a source file for reading, decompressing .gz files"""
+    if filename.endswith('.gz'):
+        return gzip.open(filename, 'rb')
+    return open(filename, 'rb')
+
+
+def _read_idx(filename, magic, ndim):
+    """Read an IDX file (big-endian u32 magic and dimensions, then u8 data)"""
+    with _open_source(filename) as f:
+        data = f.read()
+    header = struct.unpack_from(f'>{1 + ndim}I', data)
+    if header[0] != magic:
+        raise ValueError(f"{filename}: not an IDX file (magic {header[0]:#010x})")
+    shape = header[1:]
+    offset = 4 * (1 + ndim)
+    count = int(np.prod(shape))
+    if len(data) < offset + count:
+        raise ValueError(f"{filename}: truncated ({len(data)} of {offset + count} bytes)")
+    return np.frombuffer(data, dtype=np.uint8, count=count, offset=offset).reshape(shape)
+
+
+def idx_labels_path(images_path):
+    """train-images-idx3-ubyte -> train-labels-idx1-ubyte (same rule as MNISTLoader)"""
+    directory, name = os.path.split(images_path)
+    name = name.replace('images', 'labels', 1).replace('idx3', 'idx1', 1)
+    return os.path.join(directory, name)
+
+
+def read_idx(images_file, labels_file=None):
+    """
+    Read the original MNIST IDX files
+
+    Returns:
+        (images, labels) as u8[count, rows, cols] and u8[count]
+    """
+    images = _read_idx(images_file, IDX_IMAGES_MAGIC, 3)
+    labels = _read_idx(labels_file or idx_labels_path(images_file), IDX_LABELS_MAGIC, 1)
+    if len(labels) != len(images):
+        raise ValueError(f"{len(images)} images but {len(labels)} labels")
+    return images, labels
+
+
+def read_csv(filename):
+    """
+    Read an MNIST CSV file (label,pixel0,...,pixel783 per line, optional header)
+
+    Returns:
+        (images, labels) as u8[count, rows, cols] and u8[count]
+    """
+    with _open_source(filename) as f:
+        text = f.read()
+    if text[:1] and not text[:1].isdigit():
+        text = text[text.find(b'\n') + 1:]
+    text = text.replace(b'\r', b'').rstrip(b'\n')
+    lines = text.count(b'\n') + 1 if text else 0
+    # One parse of all numbers; the line length gives the image size
+    values = np.fromstring(text.replace(b'\n', b','), dtype=np.int64, sep=',')
+    if lines == 0 or len(values) % lines != 0:
+        raise ValueError(f"{filename}: lines have different lengths")
+    table = values.reshape(lines, -1)
+    pixels = table.shape[1] - 1
+    side = int(round(np.sqrt(pixels)))
+    shape = (side, side) if side * side == pixels else (1, pixels)
+    images = np.clip(table[:, 1:], 0, 255).astype(np.uint8).reshape((lines,) + shape)
+    return images, table[:, 0].astype(np.uint8)
+
+
+def read_source(filename, labels_file=None):
+    """Read MNIST from an IDX images file or a CSV file (detected by content)"""
+    with _open_source(filename) as f:
+        magic = f.read(4)
+    if len(magic) == 4 and struct.unpack('>I', magic)[0] == IDX_IMAGES_MAGIC:
+        return read_idx(filename, labels_file)
+    return read_csv(filename)
+
+
+def class_index(labels, num_classes=NUM_CLASSES):
+    """
+    Group sample ids by label
+
+    Returns:
+        (offsets, indices): the ids of class c are indices[offsets[c]:offsets[c + 1]],
+        ascending within each class
+    """
+    labels = np.asarray(labels)
+    indices = np.argsort(labels, kind='stable').astype(np.uint32)
+    offsets = np.zeros(num_classes + 1, dtype=np.uint32)
+    np.cumsum(np.bincount(labels, minlength=num_classes)[:num_classes], out=offsets[1:])
+    return offsets, indices
+
+
+def stratified_split(labels, validation, seed=0, num_classes=NUM_CLASSES):
+    """
+    Split sample ids into train and validation with the same class balance
+
+    Args:
+        labels: Label of every sample
+        validation: Fraction (< 1) or number (>= 1) of validation samples
+        seed: Random seed; the same seed always gives the same split
+
+    Returns:
+        {'train': ids, 'validation': ids}, both sorted u32 arrays
+    """
+    labels = np.asarray(labels)
+    total = int(validation) if validation >= 1 else int(round(validation * len(labels)))
+    offsets, indices = class_index(labels, num_classes)
+    counts = np.diff(offsets.astype(np.int64))
+
+    # Per-class quotas proportional to the class sizes, rounded so they add up
+    # to exactly total (largest remainders get the leftover samples)
+    share = counts * min(total, len(labels)) / max(len(labels), 1)
+    quota = np.floor(share).astype(np.int64)
+    quota[np.argsort(quota - share, kind='stable')[:int(share.sum().round() - quota.sum())]] += 1
+
+    rng = np.random.default_rng(seed)
+    train, held_out = [], []
+    for c in range(num_classes):
+        members = rng.permutation(indices[offsets[c]:offsets[c + 1]])
+        cut = int(quota[c])
+        held_out.append(members[:cut])
+        train.append(members[cut:])
+    return {'train': np.sort(np.concatenate(train)).astype(np.uint32),
+            'validation': np.sort(np.concatenate(held_out)).astype(np.uint32)}
+
+
+class MNISTDataset:
+    """A converted dataset directory with its arrays memory-mapped"""
+
+    def __init__(self, directory):
+        """
+        Args:
+            directory: Directory written by write_dataset (or its manifest.json)
+        """
+        if os.path.basename(directory) == MANIFEST_NAME:
+            directory = os.path.dirname(directory) or '.'
+        self.directory = directory
+        with open(os.path.join(directory, MANIFEST_NAME)) as f:
+            self.manifest = json.load(f)
+        if self.manifest.get('format') != MANIFEST_FORMAT:
+            raise ValueError(f"{directory}: not an MNIST dataset directory")
+        self.images = self._load('images')
+        self.labels = self._load('labels')
+        self.class_offsets = self._load('class_offsets')
+        self.class_indices_table = self._load('class_indices')
+        self._splits = {}
+
+    def _load(self, name):
+        return np.load(os.path.join(self.directory, self.manifest['files'][name]), mmap_mode='r')
+
+    def __len__(self):
+        return len(self.labels)
+
+    @property
+    def split_names(self):
+        return list(self.manifest.get('splits', {}))
+
+    def split(self, name):
+        """Sorted sample ids of a split"""
+        if name not in self._splits:
+            info = self.manifest['splits'][name]
+            self._splits[name] = np.load(os.path.join(self.directory, info['file']), mmap_mode='r')
+        return self._splits[name]
+
+    def class_indices(self, label, split=None):
+        """Sample ids of one class, optionally restricted to a split"""
+        ids = self.class_indices_table[self.class_offsets[label]:self.class_offsets[label + 1]]
+        if split is None:
+            return ids
+        member = np.zeros(len(self), dtype=bool)
+        member[self.split(split)] = True
+        return ids[member[ids]]
+
+    def subset(self, split):
+        """(images, labels) of a split (copied out of the mapping)"""
+        ids = self.split(split)
+        return self.images[ids], self.labels[ids]
+
+
+def write_dataset(directory, images, labels, source=None, splits=None):
+    """
+    Write images, labels, the per-class index table, splits and the manifest
+
+    Args:
+        directory: Output directory (created if needed)
+        images: u8[count, rows, cols]
+        labels: u8[count]
+        source: Name of the file the data came from (recorded in the manifest)
+        splits: Optional dict of name -> sample ids
+    """
+    os.makedirs(directory, exist_ok=True)
+    images = np.ascontiguousarray(images, dtype=np.uint8)
+    labels = np.ascontiguousarray(labels, dtype=np.uint8)
+    offsets, indices = class_index(labels)
+
+    files = {'images': 'images.npy', 'labels': 'labels.npy',
+             'class_offsets': 'class_offsets.npy', 'class_indices': 'class_indices.npy'}
+    for name, array in (('images', images), ('labels', labels),
+                        ('class_offsets', offsets), ('class_indices', indices)):
+        np.save(os.path.join(directory, files[name]), array)
+
+    manifest = {
+        'format': MANIFEST_FORMAT,
+        'version': MANIFEST_VERSION,
+        'source': source,
+        'count': int(len(labels)),
+        'rows': int(images.shape[1]),
+        'cols': int(images.shape[2]),
+        'num_classes': NUM_CLASSES,
+        'class_counts': np.diff(offsets.astype(np.int64)).tolist(),
+        'files': files,
+        'splits': {},
+    }
+    _write_splits(directory, manifest, labels, splits or {})
+    return manifest
+
+
+def _write_splits(directory, manifest, labels, splits):
+    """Save split id arrays, record them in the manifest and write the manifest last"""
+    for name, ids in splits.items():
+        ids = np.sort(np.asarray(ids, dtype=np.uint32))
+        file_name = f'split_{name}.npy'
+        np.save(os.path.join(directory, file_name), ids)
+        manifest['splits'][name] = {
+            'file': file_name,
+            'count': int(len(ids)),
+            'class_counts': np.bincount(labels[ids], minlength=NUM_CLASSES)[:NUM_CLASSES].tolist(),
+        }
+    with open(os.path.join(directory, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def set_splits(directory, splits):
+    """Replace the splits of a converted dataset (reads only the labels)"""
+    dataset = MNISTDataset(directory)
+    manifest = dict(dataset.manifest, splits={})
+    for info in dataset.manifest.get('splits', {}).values():
+        path = os.path.join(directory, info['file'])
+        if os.path.exists(path):
+            os.remove(path)
+    _write_splits(directory, manifest, np.asarray(dataset.labels), splits)
+    return manifest
+
+
+def convert(source, directory, labels_file=None, validation=0.0, seed=0):
+    """Convert a CSV or IDX source into a dataset directory"""
+    images, labels = read_source(source, labels_file)
+    splits = stratified_split(labels, validation, seed) if validation > 0 else None
+    return write_dataset(directory, images, labels, os.path.basename(source), splits)
+
+
+def _print_info(directory):
+    dataset = MNISTDataset(directory)
+    manifest = dataset.manifest
+    print(f"{directory}: {manifest['count']} images of {manifest['rows']}x{manifest['cols']} "
+          f"(source {manifest.get('source')})")
+    print(f"  class counts: {manifest['class_counts']}")
+    for name, info in manifest.get('splits', {}).items():
+        print(f"  split {name}: {info['count']} samples, class counts {info['class_counts']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert MNIST to memory-mappable NumPy files')
+    subparsers = parser.add_subparsers(dest='command')
+
+    convert_parser = subparsers.add_parser('convert', help='Convert a CSV or IDX file')
+    convert_parser.add_argument('source', help='MNIST CSV file or IDX images file (.gz allowed)')
+    convert_parser.add_argument('directory', help='Output dataset directory')
+    convert_parser.add_argument('--labels', help='IDX labels file (default: derived from the images file)')
+    convert_parser.add_argument('--validation', type=float, default=0.0,
+                                help='Validation split: fraction (< 1) or number of samples')
+    convert_parser.add_argument('--seed', type=int, default=0, help='Seed of the split')
+
+    split_parser = subparsers.add_parser('split', help='Rebuild the train/validation split')
+    split_parser.add_argument('directory', help='Dataset directory')
+    split_parser.add_argument('--validation', type=float, required=True,
+                              help='Fraction (< 1) or number of validation samples')
+    split_parser.add_argument('--seed', type=int, default=0, help='Seed of the split')
+
+    export_parser = subparsers.add_parser('export', help='Write one split as its own dataset directory')
+    export_parser.add_argument('directory', help='Dataset directory')
+    export_parser.add_argument('split', help='Split name (e.g. train, validation)')
+    export_parser.add_argument('output', help='Output dataset directory')
+
+    info_parser = subparsers.add_parser('info', help='Print dataset summary')
+    info_parser.add_argument('directories', nargs='+', help='Dataset directories')
+
+    args = parser.parse_args()
+
+    if args.command == 'convert':
+        convert(args.source, args.directory, args.labels, args.validation, args.seed)
+        _print_info(args.directory)
+    elif args.command == 'split':
+        dataset = MNISTDataset(args.directory)
+        set_splits(args.directory, stratified_split(dataset.labels, args.validation, args.seed))
+        _print_info(args.directory)
+    elif args.command == 'export':
+        dataset = MNISTDataset(args.directory)
+        images, labels = dataset.subset(args.split)
+        write_dataset(args.output, images, labels, f"{dataset.manifest.get('source')}:{args.split}")
+        _print_info(args.output)
+    elif args.command == 'info':
+        for directory in args.directories:
+            _print_info(directory)
+    else:
+        parser.print_help()
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -6,12 +6,45 @@
 #include <fstream>
 #include <algorithm>
 #include <cctype>
+#include <cstdlib>
+#include <cstring>
+#include <cstdio>
+#include <cmath>
+#include <cstdint>
+#include <unordered_map>
+#ifdef _OPENMP
+#include <omp.h>
+#endif
 
-Network::Network(size_t num_neurons) {
+namespace {
+
+// Smallest network updated with more than one thread
+const size_t PARALLEL_MIN_NEURONS = 512;
+
+// Number of target ranges phase 2 of Network::update is split into
+long update_ranges(size_t num_neurons) {
+#ifdef _OPENMP
+    if (num_neurons >= PARALLEL_MIN_NEURONS) {
+        return std::max(1, omp_get_max_threads());
+    }
+#endif
+    (void)num_neurons;
+    return 1;
+}
+
+}  // namespace
+
+Network::Network(size_t num_neurons) : topology_dirty(true), stdp_rule(STDPRule::NearestSpike) {
     neurons.reserve(num_neurons);
+    neuron_index.reserve(num_neurons);
     for (size_t i = 0; i < num_neurons; ++i) {
         neurons.emplace_back(new Neuron());
+        neuron_index[neurons.back().get()] = static_cast<uint32_t>(i);
     }
+    spiked_flags.assign(num_neurons, 0);
+    input_buffer.assign(num_neurons, 0.0);
+    pre_trace.assign(num_neurons, 0.0);
+    post_trace.assign(num_neurons, 0.0);
 }
 
 Neuron* Network::get_neuron(size_t index) {
@@ -21,40 +54,305 @@ Neuron* Network::get_neuron(size_t index) {
     return nullptr;
 }
 
+const Neuron* Network::get_neuron(size_t index) const {
+    if (index < neurons.size()) {
+        return neurons[index].get();
+    }
+    return nullptr;
+}
+
+size_t Network::index_of(const Neuron* neuron) const {
+    auto it = neuron_index.find(neuron);
+    return it != neuron_index.end() ? it->second : neurons.size();
+}
+
 void Network::connect(size_t from, size_t to, double weight) {
     if (from < neurons.size() && to < neurons.size() && from != to) {
         neurons[from]->add_connection(neurons[to].get(), weight);
+        topology_dirty = true;
+    }
+}
+
+void Network::connect_dense(size_t from_start, size_t from_count, size_t to_start, size_t to_count,
+                            const std::vector<double>& weights) {
+    // Written so that huge starts and counts cannot wrap around
+    if (from_start > neurons.size() || from_count > neurons.size() - from_start ||
+        to_start > neurons.size() || to_count > neurons.size() - to_start ||
+        (to_count > 0 && weights.size() / to_count < from_count)) {
+        return;
+    }
+    
+    std::vector<Neuron::Connection> row;
+    row.reserve(to_count);
+    for (size_t i = 0; i < from_count; ++i) {
+        const size_t from = from_start + i;
+        row.clear();
+        for (size_t j = 0; j < to_count; ++j) {
+            if (to_start + j != from) {
+                row.emplace_back(neurons[to_start + j].get(), weights[i * to_count + j]);
+            }
+        }
+        neurons[from]->add_connections(row);
+    }
+    topology_dirty = true;
+}
+
+void Network::connect_sparse(const std::vector<Synapse>& synapses) {
+    // Group the synapses by source (counting sort, keeping their order)
+    std::vector<size_t> offsets(neurons.size() + 1, 0);
+    for (const auto& synapse : synapses) {
+        if (synapse.from < neurons.size() && synapse.to < neurons.size() && synapse.from != synapse.to) {
+            offsets[synapse.from + 1]++;
+        }
+    }
+    for (size_t i = 0; i < neurons.size(); ++i) {
+        offsets[i + 1] += offsets[i];
+    }
+    std::vector<size_t> order(offsets.back());
+    std::vector<size_t> fill(offsets.begin(), offsets.end() - 1);
+    for (size_t k = 0; k < synapses.size(); ++k) {
+        const auto& synapse = synapses[k];
+        if (synapse.from < neurons.size() && synapse.to < neurons.size() && synapse.from != synapse.to) {
+            order[fill[synapse.from]++] = k;
+        }
+    }
+    
+    std::vector<Neuron::Connection> row;
+    for (size_t i = 0; i < neurons.size(); ++i) {
+        if (offsets[i] == offsets[i + 1]) continue;
+        row.clear();
+        for (size_t k = offsets[i]; k < offsets[i + 1]; ++k) {
+            const auto& synapse = synapses[order[k]];
+            row.emplace_back(neurons[synapse.to].get(), synapse.weight);
+        }
+        neurons[i]->add_connections(row);
+    }
+    topology_dirty = true;
+}
+
+void Network::refresh_topology() {
+    row_offsets.assign(neurons.size() + 1, 0);
+    row_targets.clear();
+    row_slots.clear();
+    row_versions.resize(neurons.size());
+    row_in_order.resize(neurons.size());
+    std::vector<std::pair<uint32_t, uint32_t>> row;
+    for (size_t i = 0; i < neurons.size(); ++i) {
+        const auto& connections = neurons[i]->get_connections();
+        row.clear();
+        for (size_t k = 0; k < connections.size(); ++k) {
+            auto it = neuron_index.find(connections[k].target);
+            if (it != neuron_index.end()) {
+                row.emplace_back(it->second, static_cast<uint32_t>(k));
+            }
+        }
+        // Rows built in ascending target order (the usual case) need no slot lookup
+        bool in_order = row.size() == connections.size() && std::is_sorted(row.begin(), row.end());
+        row_in_order[i] = in_order ? 1 : 0;
+        if (!in_order) {
+            std::sort(row.begin(), row.end());
+        }
+        for (const auto& entry : row) {
+            row_targets.push_back(entry.first);
+            row_slots.push_back(entry.second);
+        }
+        row_offsets[i + 1] = static_cast<uint32_t>(row_targets.size());
+        row_versions[i] = neurons[i]->get_topology_version();
     }
+    
+    // Incoming connections per target (counting sort of the rows by target)
+    col_offsets.assign(neurons.size() + 1, 0);
+    for (uint32_t target : row_targets) {
+        col_offsets[target + 1]++;
+    }
+    for (size_t i = 0; i < neurons.size(); ++i) {
+        col_offsets[i + 1] += col_offsets[i];
+    }
+    col_sources.resize(row_targets.size());
+    col_slots.resize(row_targets.size());
+    std::vector<uint32_t> fill(col_offsets.begin(), col_offsets.end() - 1);
+    for (size_t i = 0; i < neurons.size(); ++i) {
+        for (uint32_t e = row_offsets[i]; e < row_offsets[i + 1]; ++e) {
+            uint32_t position = fill[row_targets[e]]++;
+            col_sources[position] = static_cast<uint32_t>(i);
+            col_slots[position] = row_slots[e];
+        }
+    }
+    topology_dirty = false;
 }
 
 void Network::update() {
-    // First, update all neurons
-    for (auto& neuron : neurons) {
-        neuron->update();
+    const long num_neurons = static_cast<long>(neurons.size());
+    const long num_ranges = update_ranges(neurons.size());
+    
+    // Phase 1: spike or decay, from the potentials at the start of the step.
+    // Connections added or removed directly on a Neuron change its topology version.
+    bool rows_changed = topology_dirty;
+#ifdef _OPENMP
+    #pragma omp parallel for schedule(static) if (num_ranges > 1) reduction(||:rows_changed)
+#endif
+    for (long i = 0; i < num_neurons; ++i) {
+        spiked_flags[i] = neurons[i]->update_state() ? 1 : 0;
+        if (!topology_dirty && neurons[i]->get_topology_version() != row_versions[i]) {
+            rows_changed = true;
+        }
+    }
+    if (rows_changed) {
+        refresh_topology();
+    }
+    spiked_list.clear();
+    for (size_t i = 0; i < neurons.size(); ++i) {
+        if (spiked_flags[i]) {
+            spiked_list.push_back(static_cast<uint32_t>(i));
+        }
+    }
+    if (spiked_list.empty()) return;
+    
+    // Phase 2: deliver the spikes. Each range of targets is owned by one thread
+    // and every target sums its inputs in ascending source order, so no two
+    // threads write the same neuron and the sums do not depend on the split.
+#ifdef _OPENMP
+    #pragma omp parallel for schedule(static) if (num_ranges > 1)
+#endif
+    for (long range = 0; range < num_ranges; ++range) {
+        const uint32_t first = static_cast<uint32_t>(neurons.size() * range / num_ranges);
+        const uint32_t last = static_cast<uint32_t>(neurons.size() * (range + 1) / num_ranges);
+        for (uint32_t source : spiked_list) {
+            const uint32_t* row_begin = row_targets.data() + row_offsets[source];
+            const uint32_t* row_end = row_targets.data() + row_offsets[source + 1];
+            const uint32_t* target = std::lower_bound(row_begin, row_end, first);
+            const Neuron::Connection* connections = neurons[source]->get_connections().data();
+            if (row_in_order[source]) {
+                for (; target != row_end && *target < last; ++target) {
+                    input_buffer[*target] += connections[target - row_begin].weight;
+                }
+            } else {
+                const uint32_t* slots = row_slots.data() + row_offsets[source];
+                for (; target != row_end && *target < last; ++target) {
+                    input_buffer[*target] += connections[slots[target - row_begin]].weight;
+                }
+            }
+        }
+        for (uint32_t i = first; i < last; ++i) {
+            if (input_buffer[i] != 0.0) {
+                neurons[i]->receive_spike(input_buffer[i]);
+                input_buffer[i] = 0.0;
+            }
+        }
     }
 }
 
 void Network::update_with_learning(int time_step, double learning_rate) {
     // Update all neurons
-    for (auto& neuron : neurons) {
-        neuron->update();
-    }
+    update();
     
     // Set time step for spike tracking
-    for (auto& neuron : neurons) {
-        neuron->set_time_step(time_step);
+    for (uint32_t index : spiked_list) {
+        neurons[index]->set_time_step(time_step);
     }
     
-    // Apply STDP learning rule
-    for (auto& neuron : neurons) {
-        neuron->update_stdp(time_step, learning_rate);
+    if (stdp_rule == STDPRule::Trace) {
+        update_traces(learning_rate);
+        return;
+    }
+    
+    // Apply STDP learning rule. The dt of a synapse only changes when one of
+    // its neurons spikes, so only the synapses of this step's spiking neurons
+    // are updated: first all outgoing ones, then the incoming ones from
+    // neurons that did not spike. Every synapse is written by one iteration,
+    // so the loops run in parallel without changing the result.
+    const long num_spikes = static_cast<long>(spiked_list.size());
+    const bool parallel = update_ranges(neurons.size()) > 1;
+    (void)parallel;
+    
+#ifdef _OPENMP
+    #pragma omp parallel for schedule(dynamic, 8) if (parallel)
+#endif
+    for (long k = 0; k < num_spikes; ++k) {
+        Neuron* pre = neurons[spiked_list[k]].get();
+        for (auto& conn : pre->get_connections_mutable()) {
+            if (conn.target != nullptr) {
+                Neuron::apply_stdp(conn.weight, time_step, conn.target->get_last_spike_time(), learning_rate);
+            }
+        }
+    }
+    
+#ifdef _OPENMP
+    #pragma omp parallel for schedule(dynamic, 8) if (parallel)
+#endif
+    for (long k = 0; k < num_spikes; ++k) {
+        const uint32_t post = spiked_list[k];
+        for (uint32_t e = col_offsets[post]; e < col_offsets[post + 1]; ++e) {
+            const uint32_t source = col_sources[e];
+            if (spiked_flags[source]) continue;  // Handled with the outgoing synapses
+            Neuron* pre = neurons[source].get();
+            Neuron::apply_stdp(pre->get_connections_mutable()[col_slots[e]].weight,
+                               pre->get_last_spike_time(), time_step, learning_rate);
+        }
+    }
+}
+
+void Network::update_traces(double learning_rate) {
+    // Decay the traces to this step; they still hold only earlier spikes
+    const double pre_decay = Neuron::stdp_window(1, Neuron::STDP_TAU_PLUS);
+    const double post_decay = Neuron::stdp_window(1, Neuron::STDP_TAU_MINUS);
+    for (size_t i = 0; i < neurons.size(); ++i) {
+        pre_trace[i] *= pre_decay;
+        post_trace[i] *= post_decay;
+    }
+    
+    // A spiking neuron depresses its outgoing synapses by the post-synaptic
+    // traces and potentiates its incoming ones by the pre-synaptic traces.
+    // As in the nearest-spike rule, each synapse is written by one iteration.
+    const long num_spikes = static_cast<long>(spiked_list.size());
+    const bool parallel = update_ranges(neurons.size()) > 1;
+    (void)parallel;
+    
+#ifdef _OPENMP
+    #pragma omp parallel for schedule(dynamic, 8) if (parallel)
+#endif
+    for (long k = 0; k < num_spikes; ++k) {
+        const uint32_t pre = spiked_list[k];
+        auto& connections = neurons[pre]->get_connections_mutable();
+        for (uint32_t e = row_offsets[pre]; e < row_offsets[pre + 1]; ++e) {
+            const uint32_t post = row_targets[e];
+            Neuron::apply_trace_stdp(connections[row_slots[e]].weight,
+                                     spiked_flags[post] ? pre_trace[pre] : 0.0,
+                                     post_trace[post], learning_rate);
+        }
     }
+    
+#ifdef _OPENMP
+    #pragma omp parallel for schedule(dynamic, 8) if (parallel)
+#endif
+    for (long k = 0; k < num_spikes; ++k) {
+        const uint32_t post = spiked_list[k];
+        for (uint32_t e = col_offsets[post]; e < col_offsets[post + 1]; ++e) {
+            const uint32_t source = col_sources[e];
+            if (spiked_flags[source]) continue;  // Handled with the outgoing synapses
+            Neuron::apply_trace_stdp(neurons[source]->get_connections_mutable()[col_slots[e]].weight,
+                                     pre_trace[source], 0.0, learning_rate);
+        }
+    }
+    
+    for (uint32_t index : spiked_list) {
+        pre_trace[index] += 1.0;
+        post_trace[index] += 1.0;
+    }
+}
+
+void Network::set_stdp_rule(STDPRule rule) {
+    stdp_rule = rule;
+    std::fill(pre_trace.begin(), pre_trace.end(), 0.0);
+    std::fill(post_trace.begin(), post_trace.end(), 0.0);
 }
 
 void Network::reset() {
     for (auto& neuron : neurons) {
         neuron->reset();
     }
+    std::fill(pre_trace.begin(), pre_trace.end(), 0.0);
+    std::fill(post_trace.begin(), post_trace.end(), 0.0);
 }
 
 void Network::print_state() const {
@@ -73,219 +371,587 @@ void Network::print_state() const {
     std::cout << std::endl;
 }
 
-void Network::export_to_json(std::ostream& out) const {
-    // Create mapping from neuron pointer to index
-    std::map<const Neuron*, size_t> neuron_to_index;
-    for (size_t i = 0; i < neurons.size(); ++i) {
-        neuron_to_index[neurons[i].get()] = i;
+namespace {
+
+// Append an integer in decimal
+void append_integer(std::string& out, long long value) {
+    char digits[24];
+    int length = 0;
+    unsigned long long magnitude = value < 0 ? 0ULL - static_cast<unsigned long long>(value)
+                                             : static_cast<unsigned long long>(value);
+    do {
+        digits[length++] = static_cast<char>('0' + magnitude % 10);
+        magnitude /= 10;
+    } while (magnitude > 0);
+    if (value < 0) out += '-';
+    while (length > 0) out += digits[--length];
+}
+
+// Append a number formatted like std::fixed << std::setprecision(4)
+void append_fixed4(std::string& out, double value) {
+    // value * 10^4 is off by at most ~1e-7 for |value| < 10^5, so unless it
+    // is that close to a rounding tie it rounds like the exact decimal value
+    const double scaled = std::fabs(value) * 10000.0;
+    if (scaled < 1e9) {
+        const double fraction = scaled - std::floor(scaled);
+        if (std::fabs(fraction - 0.5) > 1e-6) {
+            const long long units = static_cast<long long>(std::floor(scaled + 0.5));
+            if (std::signbit(value)) out += '-';
+            append_integer(out, units / 10000);
+            const long long decimals = units % 10000;
+            out += '.';
+            out += static_cast<char>('0' + decimals / 1000);
+            out += static_cast<char>('0' + decimals / 100 % 10);
+            out += static_cast<char>('0' + decimals / 10 % 10);
+            out += static_cast<char>('0' + decimals % 10);
+            return;
+        }
     }
-    
-    out << "{\n";
-    out << "  \"neurons\": [\n";
+    char buffer[64];
+    std::snprintf(buffer, sizeof(buffer), "%.4f", value);
+    out += buffer;
+}
+
+}  // namespace
+
+void Network::export_to_json(std::ostream& out) const {
+    // Formatted into a buffer that is written in large blocks
+    std::string json;
+    json.reserve(1 << 20);
+    json += "{\n";
+    json += "  \"neurons\": [\n";
     
     for (size_t i = 0; i < neurons.size(); ++i) {
-        out << "    {\n";
-        out << "      \"id\": " << i << ",\n";
-        out << "      \"potential\": " << std::fixed << std::setprecision(4) 
-            << neurons[i]->get_potential() << ",\n";
-        out << "      \"spiked\": " << (neurons[i]->spiked() ? "true" : "false") << ",\n";
-        out << "      \"spike_count\": " << neurons[i]->get_spike_count() << ",\n";
-        out << "      \"connections\": [\n";
+        json += "    {\n";
+        json += "      \"id\": ";
+        append_integer(json, static_cast<long long>(i));
+        json += ",\n      \"potential\": ";
+        append_fixed4(json, neurons[i]->get_potential());
+        json += ",\n      \"spiked\": ";
+        json += neurons[i]->spiked() ? "true" : "false";
+        json += ",\n      \"spike_count\": ";
+        append_integer(json, neurons[i]->get_spike_count());
+        json += ",\n      \"connections\": [\n";
         
         const auto& connections = neurons[i]->get_connections();
         for (size_t j = 0; j < connections.size(); ++j) {
-            auto it = neuron_to_index.find(connections[j].target);
-            if (it != neuron_to_index.end()) {
-                out << "        {\"target\": " << it->second 
-                    << ", \"weight\": " << std::fixed << std::setprecision(4) 
-                    << connections[j].weight << "}";
+            size_t target = index_of(connections[j].target);
+            if (target < neurons.size()) {
+                json += "        {\"target\": ";
+                append_integer(json, static_cast<long long>(target));
+                json += ", \"weight\": ";
+                append_fixed4(json, connections[j].weight);
+                json += '}';
                 if (j < connections.size() - 1) {
-                    out << ",";
+                    json += ',';
                 }
-                out << "\n";
+                json += '\n';
             }
         }
         
-        out << "      ]\n";
-        out << "    }";
+        json += "      ]\n";
+        json += "    }";
         if (i < neurons.size() - 1) {
-            out << ",";
+            json += ',';
+        }
+        json += '\n';
+        
+        if (json.size() >= (1 << 20)) {
+            out.write(json.data(), json.size());
+            json.clear();
         }
-        out << "\n";
     }
     
-    out << "  ]\n";
-    out << "}\n";
+    json += "  ]\n";
+    json += "}\n";
+    out.write(json.data(), json.size());
 }
 
-Network* Network::load_from_json(const std::string& filename) {
-    std::ifstream file(filename);
-    if (!file.is_open()) {
-        std::cerr << "Error: Could not open file: " << filename << "\n";
-        return nullptr;
+namespace {
+
+// Binary snapshot layout constants (must match network_snapshot.py)
+const char SNAPSHOT_MAGIC[4] = {'S', 'N', 'N', 'S'};
+const uint16_t SNAPSHOT_VERSION = 1;
+const uint16_t SNAPSHOT_HEADER_SIZE = 32;
+const uint32_t SNAPSHOT_FLAG_CHECKSUM = 1;  // checksum holds the CRC-32 of the sections
+
+// Append a plain value in host byte order (all supported hosts are little-endian)
+template <typename T>
+void append_raw(std::string& buffer, const T& value) {
+    buffer.append(reinterpret_cast<const char*>(&value), sizeof(T));
+}
+
+// Append an array and pad it with zeros so the next section starts on an
+// 8-byte boundary (offsets are relative to the end of the header, which is
+// itself a multiple of 8)
+template <typename T>
+void append_section(std::string& buffer, const std::vector<T>& values) {
+    if (!values.empty()) {
+        buffer.append(reinterpret_cast<const char*>(values.data()), values.size() * sizeof(T));
     }
+    buffer.append((8 - buffer.size() % 8) % 8, '\0');
+}
+
+// Read an array written by append_section at offset (advanced past the padding)
+template <typename T>
+void read_section(const std::string& buffer, size_t& offset, std::vector<T>& values, size_t count) {
+    values.resize(count);
+    if (count > 0) {
+        std::memcpy(values.data(), buffer.data() + offset, count * sizeof(T));
+    }
+    offset += count * sizeof(T);
+    offset += (8 - offset % 8) % 8;
+}
+
+// Size of the sections of a snapshot with the given number of neurons and edges
+size_t snapshot_body_size(size_t num_neurons, size_t num_edges) {
+    size_t size = 0;
+    const size_t section_bytes[] = {
+        (num_neurons + 1) * sizeof(uint32_t), num_edges * sizeof(uint32_t), num_edges * sizeof(float),
+        num_neurons * sizeof(float), num_neurons * sizeof(int32_t), (num_neurons + 7) / 8
+    };
+    for (size_t bytes : section_bytes) {
+        size += (bytes + 7) / 8 * 8;
+    }
+    return size;
+}
+
+// CRC-32 (the zlib polynomial, same as Python's zlib.crc32), eight bytes per
+// step with one lookup table per byte position
+uint32_t crc32(const char* data, size_t size) {
+    static const std::vector<uint32_t> table = [] {
+        std::vector<uint32_t> values(8 * 256);
+        for (uint32_t i = 0; i < 256; ++i) {
+            uint32_t crc = i;
+            for (int bit = 0; bit < 8; ++bit) {
+                crc = (crc & 1) ? (crc >> 1) ^ 0xEDB88320u : crc >> 1;
+            }
+            values[i] = crc;
+        }
+        for (uint32_t i = 0; i < 256; ++i) {
+            for (int k = 1; k < 8; ++k) {
+                values[k * 256 + i] = (values[(k - 1) * 256 + i] >> 8) ^ values[values[(k - 1) * 256 + i] & 0xFF];
+            }
+        }
+        return values;
+    }();
+    const uint32_t* t = table.data();
     
-    // First pass: find maximum "id" value (neurons are 0-indexed, so count = max_id + 1)
-    // Simple approach: look for all lines with "id": <number> and track the maximum
-    int max_id = -1;
-    std::string line;
-    bool in_neurons_array = false;
+    const unsigned char* bytes = reinterpret_cast<const unsigned char*>(data);
+    uint32_t crc = 0xFFFFFFFFu;
+    for (; size >= 8; size -= 8, bytes += 8) {
+        const uint32_t low = crc ^ (static_cast<uint32_t>(bytes[0]) | static_cast<uint32_t>(bytes[1]) << 8 |
+                                    static_cast<uint32_t>(bytes[2]) << 16 | static_cast<uint32_t>(bytes[3]) << 24);
+        const uint32_t high = static_cast<uint32_t>(bytes[4]) | static_cast<uint32_t>(bytes[5]) << 8 |
+                              static_cast<uint32_t>(bytes[6]) << 16 | static_cast<uint32_t>(bytes[7]) << 24;
+        crc = t[7 * 256 + (low & 0xFF)] ^ t[6 * 256 + ((low >> 8) & 0xFF)] ^
+              t[5 * 256 + ((low >> 16) & 0xFF)] ^ t[4 * 256 + (low >> 24)] ^
+              t[3 * 256 + (high & 0xFF)] ^ t[2 * 256 + ((high >> 8) & 0xFF)] ^
+              t[256 + ((high >> 16) & 0xFF)] ^ t[high >> 24];
+    }
+    for (; size > 0; --size, ++bytes) {
+        crc = t[(crc ^ *bytes) & 0xFF] ^ (crc >> 8);
+    }
+    return ~crc;
+}
+
+}  // namespace
+
+void Network::export_binary(std::ostream& out, int step) const {
+    // Flatten connections into CSR arrays
+    std::vector<uint32_t> indptr(neurons.size() + 1, 0);
+    std::vector<uint32_t> indices;
+    std::vector<float> weights;
+    std::vector<float> potential(neurons.size());
+    std::vector<int32_t> spike_count(neurons.size());
+    std::vector<uint8_t> spiked((neurons.size() + 7) / 8, 0);
     
-    while (std::getline(file, line)) {
-        // Check if we entered neurons array
-        if (line.find("\"neurons\"") != std::string::npos) {
-            in_neurons_array = true;
+    for (size_t i = 0; i < neurons.size(); ++i) {
+        for (const auto& conn : neurons[i]->get_connections()) {
+            size_t target = index_of(conn.target);
+            if (target < neurons.size()) {
+                indices.push_back(static_cast<uint32_t>(target));
+                weights.push_back(static_cast<float>(conn.weight));
+            }
         }
-        
-        // Check if we exited neurons array (the closing ] after all neurons)
-        // The neurons array closes with "  ]" on a line that doesn't contain "connections"
-        if (in_neurons_array && line.find("  ]") == 0 && 
-            line.find("\"connections\"") == std::string::npos &&
-            line.length() <= 4) {
-            // This is the closing bracket of the neurons array
-            break;
+        indptr[i + 1] = static_cast<uint32_t>(indices.size());
+        potential[i] = static_cast<float>(neurons[i]->get_potential());
+        spike_count[i] = neurons[i]->get_spike_count();
+        if (neurons[i]->spiked()) {
+            spiked[i / 8] |= static_cast<uint8_t>(1u << (i % 8));
         }
-        
-        // While in neurons array, find all "id" fields and track max
-        // Look for pattern: "id": <number>
-        if (in_neurons_array) {
-            size_t id_pos = line.find("\"id\"");
-            if (id_pos != std::string::npos) {
-                // Find the colon after "id"
-                size_t colon_pos = line.find(':', id_pos);
-                if (colon_pos != std::string::npos) {
-                    std::string id_str = line.substr(colon_pos + 1);
-                    // Remove comma if present
-                    size_t comma_pos = id_str.find(',');
-                    if (comma_pos != std::string::npos) {
-                        id_str = id_str.substr(0, comma_pos);
-                    }
-                    // Trim whitespace
-                    id_str.erase(0, id_str.find_first_not_of(" \t"));
-                    id_str.erase(id_str.find_last_not_of(" \t") + 1);
-                    try {
-                        int id = std::stoi(id_str);
-                        if (id > max_id) max_id = id;
-                    } catch (...) {
-                        // Ignore parsing errors
-                    }
-                }
-            }
+    }
+    
+    // Sections, assembled in memory so that they can be checksummed and
+    // written with one call
+    std::string body;
+    body.reserve(snapshot_body_size(neurons.size(), indices.size()));
+    append_section(body, indptr);
+    append_section(body, indices);
+    append_section(body, weights);
+    append_section(body, potential);
+    append_section(body, spike_count);
+    append_section(body, spiked);
+    
+    // Header
+    std::string header;
+    header.append(SNAPSHOT_MAGIC, 4);
+    append_raw(header, SNAPSHOT_VERSION);
+    append_raw(header, SNAPSHOT_HEADER_SIZE);
+    append_raw(header, static_cast<uint32_t>(neurons.size()));
+    append_raw(header, static_cast<uint32_t>(indices.size()));
+    append_raw(header, static_cast<int32_t>(step));
+    append_raw(header, SNAPSHOT_FLAG_CHECKSUM);
+    append_raw(header, crc32(body.data(), body.size()));
+    append_raw(header, static_cast<uint32_t>(0));  // reserved
+    
+    out.write(header.data(), header.size());
+    out.write(body.data(), body.size());
+}
+
+Network* Network::load_binary(std::istream& in) {
+    char magic[4];
+    uint16_t version = 0;
+    uint16_t header_size = 0;
+    uint32_t num_neurons = 0;
+    uint32_t num_edges = 0;
+    int32_t step = 0;
+    uint32_t flags = 0;
+    uint32_t checksum = 0;
+    uint32_t reserved = 0;
+    in.read(magic, 4);
+    in.read(reinterpret_cast<char*>(&version), sizeof(version));
+    in.read(reinterpret_cast<char*>(&header_size), sizeof(header_size));
+    in.read(reinterpret_cast<char*>(&num_neurons), sizeof(num_neurons));
+    in.read(reinterpret_cast<char*>(&num_edges), sizeof(num_edges));
+    in.read(reinterpret_cast<char*>(&step), sizeof(step));
+    in.read(reinterpret_cast<char*>(&flags), sizeof(flags));
+    in.read(reinterpret_cast<char*>(&checksum), sizeof(checksum));
+    in.read(reinterpret_cast<char*>(&reserved), sizeof(reserved));
+    if (!in || std::memcmp(magic, SNAPSHOT_MAGIC, 4) != 0) {
+        std::cerr << "Error: Not a network snapshot\n";
+        return nullptr;
+    }
+    if (version > SNAPSHOT_VERSION || header_size != SNAPSHOT_HEADER_SIZE) {
+        std::cerr << "Error: Unsupported snapshot version " << version << "\n";
+        return nullptr;
+    }
+    
+    std::string body(snapshot_body_size(num_neurons, num_edges), '\0');
+    in.read(&body[0], static_cast<std::streamsize>(body.size()));
+    if (static_cast<size_t>(in.gcount()) != body.size()) {
+        std::cerr << "Error: Truncated snapshot (" << in.gcount() << " of " << body.size() << " bytes)\n";
+        return nullptr;
+    }
+    if ((flags & SNAPSHOT_FLAG_CHECKSUM) && crc32(body.data(), body.size()) != checksum) {
+        std::cerr << "Error: Snapshot checksum mismatch\n";
+        return nullptr;
+    }
+    
+    size_t offset = 0;
+    std::vector<uint32_t> indptr;
+    std::vector<uint32_t> indices;
+    std::vector<float> weights;
+    std::vector<float> potential;
+    read_section(body, offset, indptr, num_neurons + 1);
+    read_section(body, offset, indices, num_edges);
+    read_section(body, offset, weights, num_edges);
+    read_section(body, offset, potential, num_neurons);
+    
+    for (uint32_t i = 0; i < num_neurons; ++i) {
+        if (indptr[i] > indptr[i + 1] || indptr[i + 1] > num_edges) {
+            std::cerr << "Error: Invalid snapshot topology\n";
+            return nullptr;
+        }
+    }
+    for (uint32_t target : indices) {
+        if (target >= num_neurons) {
+            std::cerr << "Error: Invalid snapshot topology\n";
+            return nullptr;
         }
     }
-    // Neuron count is max_id + 1 (ids are 0-indexed)
-    int neuron_count = max_id + 1;
     
-    if (neuron_count <= 0) {
-        std::cerr << "Error: No neurons found in JSON file (max_id=" << max_id << ")\n";
+    // Rows are already grouped by source, so they are installed directly
+    Network* network = new Network(num_neurons);
+    std::vector<Neuron::Connection> row;
+    for (uint32_t i = 0; i < num_neurons; ++i) {
+        row.clear();
+        for (uint32_t e = indptr[i]; e < indptr[i + 1]; ++e) {
+            row.emplace_back(network->neurons[indices[e]].get(), weights[e]);
+        }
+        Neuron* neuron = network->neurons[i].get();
+        if (!row.empty()) {
+            neuron->add_connections(row);
+        }
+        neuron->apply_input(potential[i] - neuron->get_potential());
+    }
+    return network;
+}
+
+Network* Network::load_binary(const std::string& filename) {
+    std::ifstream file(filename, std::ios::binary);
+    if (!file.is_open()) {
+        std::cerr << "Error: Could not open file: " << filename << "\n";
         return nullptr;
     }
+    return load_binary(file);
+}
+
+namespace {
+
+// Single-pass reader over the NUL-terminated text of a JSON document. Numbers
+// are parsed in place and values the loader does not use are skipped, so the
+// layout (whitespace, key order, extra keys) does not matter.
+class JsonReader {
+public:
+    explicit JsonReader(const char* text) : begin(text), p(text) {}
     
-    // Create network with the correct number of neurons
-    Network* network = new Network(neuron_count);
+    // Skip whitespace and consume c if it comes next
+    bool consume(char c) {
+        skip_whitespace();
+        if (*p != c) return false;
+        ++p;
+        return true;
+    }
     
-    // Second pass: read connections
-    file.clear();
-    file.seekg(0, std::ios::beg);
+    // Read an object key and the colon after it (keys are compared unescaped)
+    bool read_key(const char*& key, size_t& length) {
+        skip_whitespace();
+        key = p + 1;
+        if (!skip_string()) return false;
+        length = static_cast<size_t>(p - 1 - key);
+        return consume(':');
+    }
     
-    int current_neuron = -1;
-    bool in_connections = false;
-    bool in_connection_obj = false;
-    int target = -1;
-    double weight = 0.0;
-    
-    while (std::getline(file, line)) {
-        // Find neuron id
-        size_t id_pos = line.find("\"id\"");
-        if (id_pos != std::string::npos) {
-            size_t colon_pos = line.find(':', id_pos);
-            if (colon_pos != std::string::npos) {
-                std::string id_str = line.substr(colon_pos + 1);
-                // Remove comma if present
-                size_t comma_pos = id_str.find(',');
-                if (comma_pos != std::string::npos) {
-                    id_str = id_str.substr(0, comma_pos);
-                }
-                // Trim whitespace
-                id_str.erase(0, id_str.find_first_not_of(" \t"));
-                id_str.erase(id_str.find_last_not_of(" \t") + 1);
-                current_neuron = std::stoi(id_str);
-            }
+    bool read_number(double& value) {
+        skip_whitespace();
+    
+        // Fast path for plain decimals such as 0.1234 (what export_to_json
+        // writes): with at most 15 digits and 22 decimals, mantissa / 10^k
+        // is exact in both operands and rounds exactly like strtod
+        static const double powers_of_ten[] = {
+            1e0, 1e1, 1e2, 1e3, 1e4, 1e5, 1e6, 1e7, 1e8, 1e9, 1e10, 1e11,
+            1e12, 1e13, 1e14, 1e15, 1e16, 1e17, 1e18, 1e19, 1e20, 1e21, 1e22
+        };
+        const char* q = p;
+        const bool negative = *q == '-';
+        if (negative) ++q;
+        int64_t mantissa = 0;
+        int digits = 0;
+        int decimals = 0;
+        while (*q >= '0' && *q <= '9') {
+            mantissa = mantissa * 10 + (*q++ - '0');
+            digits++;
         }
-        
-        // Check if entering connections array
-        if (line.find("\"connections\"") != std::string::npos && 
-            line.find('[') != std::string::npos) {
-            in_connections = true;
-            continue;
+        if (*q == '.') {
+            ++q;
+            while (*q >= '0' && *q <= '9') {
+                mantissa = mantissa * 10 + (*q++ - '0');
+                digits++;
+                decimals++;
+            }
         }
-        
-        // Check if exiting connections array
-        if (in_connections && line.find(']') != std::string::npos && 
-            line.find("\"connections\"") == std::string::npos) {
-            in_connections = false;
-            continue;
+        if (digits > 0 && digits <= 15 && decimals <= 22 && *q != 'e' && *q != 'E') {
+            value = static_cast<double>(mantissa) / powers_of_ten[decimals];
+            if (negative) value = -value;
+            p = q;
+            return true;
         }
-        
-        // Check if entering a connection object
-        if (in_connections && line.find('{') != std::string::npos) {
-            in_connection_obj = true;
-            target = -1;
-            weight = 0.0;
-            continue;
+    
+        char* end = nullptr;
+        value = std::strtod(p, &end);
+        if (end == p) return false;
+        p = end;
+        return true;
+    }
+    
+    // Read a non-negative integer (neuron ids and targets)
+    bool read_index(long& value) {
+        skip_whitespace();
+        const char* start = p;
+        value = 0;
+        while (*p >= '0' && *p <= '9') {
+            value = value * 10 + (*p - '0');
+            ++p;
         }
-        
-        // Check if exiting a connection object
-        if (in_connection_obj && line.find('}') != std::string::npos) {
-            if (current_neuron >= 0 && target >= 0) {
-                network->connect(current_neuron, target, weight);
+        if (*p == '.' || *p == 'e' || *p == 'E' || p == start) {
+            // Written as a floating point number, e.g. 3.0
+            p = start;
+            double number;
+            if (!read_number(number) || number < 0.0 || number != static_cast<double>(static_cast<long>(number))) {
+                return false;
             }
-            in_connection_obj = false;
-            continue;
+            value = static_cast<long>(number);
         }
-        
-        // Read target
-        if (in_connection_obj) {
-            size_t target_pos = line.find("\"target\"");
-            if (target_pos != std::string::npos) {
-                size_t colon_pos = line.find(':', target_pos);
-                if (colon_pos != std::string::npos) {
-                    std::string target_str = line.substr(colon_pos + 1);
-                    size_t comma_pos = target_str.find(',');
-                    if (comma_pos != std::string::npos) {
-                        target_str = target_str.substr(0, comma_pos);
-                    }
-                    target_str.erase(0, target_str.find_first_not_of(" \t"));
-                    target_str.erase(target_str.find_last_not_of(" \t") + 1);
-                    target = std::stoi(target_str);
+        return true;
+    }
+    
+    // Skip one value of any type
+    bool skip_value() {
+        skip_whitespace();
+        if (*p == '{' || *p == '[') {
+            const char close = *p == '{' ? '}' : ']';
+            ++p;
+            if (consume(close)) return true;
+            do {
+                const char* key;
+                size_t length;
+                if (close == '}' && !read_key(key, length)) return false;
+                if (!skip_value()) return false;
+            } while (consume(','));
+            return consume(close);
+        }
+        if (*p == '"') return skip_string();
+        if (std::strncmp(p, "true", 4) == 0 || std::strncmp(p, "null", 4) == 0) {
+            p += 4;
+            return true;
+        }
+        if (std::strncmp(p, "false", 5) == 0) {
+            p += 5;
+            return true;
+        }
+        double number;
+        return read_number(number);
+    }
+    
+    // Position in the text (for error messages)
+    size_t offset() const { return static_cast<size_t>(p - begin); }
+    
+private:
+    const char* begin;
+    const char* p;
+    
+    void skip_whitespace() {
+        while (*p == ' ' || *p == '\n' || *p == '\r' || *p == '\t') ++p;
+    }
+    
+    bool skip_string() {
+        if (*p != '"') return false;
+        ++p;
+        while (*p != '"') {
+            if (*p == '\0') return false;
+            if (*p == '\\' && p[1] != '\0') ++p;
+            ++p;
+        }
+        ++p;
+        return true;
+    }
+};
+    
+bool key_is(const char* key, size_t length, const char* name) {
+    return std::strlen(name) == length && std::strncmp(key, name, length) == 0;
+}
+
+// "connections": [{"target": t, "weight": w}, ...] of one neuron; the source is
+// filled in by the caller once the neuron's id is known
+bool read_connections(JsonReader& json, std::vector<Network::Synapse>& synapses) {
+    if (!json.consume('[')) return false;
+    if (json.consume(']')) return true;
+    do {
+        if (!json.consume('{')) return false;
+        long target = -1;
+        double weight = 0.0;
+        if (!json.consume('}')) {
+            do {
+                const char* key;
+                size_t length;
+                if (!json.read_key(key, length)) return false;
+                if (key_is(key, length, "target")) {
+                    if (!json.read_index(target)) return false;
+                } else if (key_is(key, length, "weight")) {
+                    if (!json.read_number(weight)) return false;
+                } else if (!json.skip_value()) {
+                    return false;
                 }
-            }
+            } while (json.consume(','));
+            if (!json.consume('}')) return false;
         }
-        
-        // Read weight
-        if (in_connection_obj) {
-            size_t weight_pos = line.find("\"weight\"");
-            if (weight_pos != std::string::npos) {
-                size_t colon_pos = line.find(':', weight_pos);
-                if (colon_pos != std::string::npos) {
-                    std::string weight_str = line.substr(colon_pos + 1);
-                    size_t comma_pos = weight_str.find(',');
-                    if (comma_pos != std::string::npos) {
-                        weight_str = weight_str.substr(0, comma_pos);
-                    }
-                    size_t brace_pos = weight_str.find('}');
-                    if (brace_pos != std::string::npos) {
-                        weight_str = weight_str.substr(0, brace_pos);
-                    }
-                    weight_str.erase(0, weight_str.find_first_not_of(" \t"));
-                    weight_str.erase(weight_str.find_last_not_of(" \t") + 1);
-                    weight = std::stod(weight_str);
+        if (target >= 0) {
+            synapses.push_back({0, static_cast<size_t>(target), weight});
+        }
+    } while (json.consume(','));
+    return json.consume(']');
+}
+
+// "neurons": [{"id": i, ..., "connections": [...]}, ...]; a neuron without an
+// id gets its position in the array
+bool read_neurons(JsonReader& json, std::vector<Network::Synapse>& synapses, long& max_id) {
+    if (!json.consume('[')) return false;
+    if (json.consume(']')) return true;
+    long position = 0;
+    do {
+        if (!json.consume('{')) return false;
+        long id = position;
+        const size_t first_synapse = synapses.size();
+        if (!json.consume('}')) {
+            do {
+                const char* key;
+                size_t length;
+                if (!json.read_key(key, length)) return false;
+                if (key_is(key, length, "id")) {
+                    if (!json.read_index(id)) return false;
+                } else if (key_is(key, length, "connections")) {
+                    if (!read_connections(json, synapses)) return false;
+                } else if (!json.skip_value()) {
+                    return false;
                 }
-            }
+            } while (json.consume(','));
+            if (!json.consume('}')) return false;
+        }
+        for (size_t k = first_synapse; k < synapses.size(); ++k) {
+            synapses[k].from = static_cast<size_t>(id);
         }
+        max_id = std::max(max_id, id);
+        position++;
+    } while (json.consume(','));
+    return json.consume(']');
+}
+
+}  // namespace
+
+Network* Network::load_from_json(const std::string& filename) {
+    std::ifstream file(filename, std::ios::binary);
+    if (!file.is_open()) {
+        std::cerr << "Error: Could not open file: " << filename << "\n";
+        return nullptr;
     }
     
+    // Read the whole file with one call and parse it in a single pass
+    file.seekg(0, std::ios::end);
+    std::string text(static_cast<size_t>(std::max<std::streamoff>(file.tellg(), 0)), '\0');
+    file.seekg(0, std::ios::beg);
+    file.read(&text[0], static_cast<std::streamsize>(text.size()));
+    text.resize(static_cast<size_t>(file.gcount()));
     file.close();
+    
+    // Connections are collected first and installed in bulk once the number
+    // of neurons (max id + 1) is known
+    JsonReader json(text.c_str());
+    std::vector<Synapse> synapses;
+    long max_id = -1;
+    bool valid = json.consume('{');
+    if (valid && !json.consume('}')) {
+        do {
+            const char* key;
+            size_t length;
+            valid = json.read_key(key, length) &&
+                    (key_is(key, length, "neurons") ? read_neurons(json, synapses, max_id) : json.skip_value());
+        } while (valid && json.consume(','));
+        valid = valid && json.consume('}');
+    }
+    if (!valid) {
+        std::cerr << "Error: Invalid JSON in " << filename << " at offset " << json.offset() << "\n";
+        return nullptr;
+    }
+    
+    long neuron_count = max_id + 1;
+    if (neuron_count <= 0) {
+        std::cerr << "Error: No neurons found in JSON file (max_id=" << max_id << ")\n";
+        return nullptr;
+    }
+    
+    Network* network = new Network(static_cast<size_t>(neuron_count));
+    network->connect_sparse(synapses);
     return network;
 }
 
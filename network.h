@@ -4,10 +4,60 @@
 #include "neuron.h"
 #include <vector>
 #include <memory>
+#include <string>
+#include <iosfwd>
+#include <cstdint>
+#include <unordered_map>
 
 class Network {
+public:
+    // Learning rule used by update_with_learning
+    enum class STDPRule {
+        NearestSpike,  // Compare the last spike times of the pre- and post-synaptic neuron
+        Trace          // Per-neuron spike traces, all spike pairs contribute
+    };
+    
+    // One connection for connect_sparse
+    struct Synapse {
+        size_t from;
+        size_t to;
+        double weight;
+    };
+    
 private:
     std::vector<std::unique_ptr<Neuron>> neurons;
+    std::unordered_map<const Neuron*, uint32_t> neuron_index;  // Neuron pointer -> index
+    
+    // Index of the connections for the synchronous update: per source neuron the
+    // target indices sorted ascending and the position of each connection in the
+    // neuron's vector. Rebuilt after connect() or when a neuron's connections
+    // change (its topology version differs from the one the row was built from).
+    std::vector<uint32_t> row_offsets;
+    std::vector<uint32_t> row_targets;
+    std::vector<uint32_t> row_slots;
+    std::vector<uint64_t> row_versions;
+    std::vector<uint8_t> row_in_order;  // Connections already sorted by target
+    std::vector<uint32_t> col_offsets;  // Incoming connections per target:
+    std::vector<uint32_t> col_sources;  // source index and position in the
+    std::vector<uint32_t> col_slots;    // source's connection vector
+    bool topology_dirty;
+    
+    // Per-step buffers
+    std::vector<uint8_t> spiked_flags;
+    std::vector<uint32_t> spiked_list;
+    std::vector<double> input_buffer;   // Input received for the next step
+    
+    // Trace-based STDP: traces jump by 1 on a spike and decay by exp(-1/tau)
+    // every step, tau_plus for the pre-synaptic and tau_minus for the
+    // post-synaptic role of a neuron
+    STDPRule stdp_rule;
+    std::vector<double> pre_trace;
+    std::vector<double> post_trace;
+    
+    void refresh_topology();
+    
+    // Trace-based STDP on the synapses of this step's spiking neurons
+    void update_traces(double learning_rate);
 
 public:
     // Constructor: creates a network with specified number of neurons
@@ -15,19 +65,43 @@ public:
     
     // Get neuron at index
     Neuron* get_neuron(size_t index);
+    const Neuron* get_neuron(size_t index) const;
     
     // Connect two neurons
     void connect(size_t from, size_t to, double weight);
     
-    // Update all neurons in the network (one time step)
+    // Connect every neuron of [from_start, from_start + from_count) to every
+    // neuron of [to_start, to_start + to_count). weights is the row-major
+    // from_count x to_count matrix; nothing is connected if it is too small
+    // or a range is out of bounds.
+    void connect_dense(size_t from_start, size_t from_count, size_t to_start, size_t to_count,
+                       const std::vector<double>& weights);
+    
+    // Connect many pairs at once, same result as calling connect() for each
+    // in order (a later duplicate updates the weight)
+    void connect_sparse(const std::vector<Synapse>& synapses);
+    
+    // Update all neurons in the network (one time step). The step is synchronous:
+    // spikes are determined from the potentials at the start of the step and
+    // delivered afterwards, so they arrive in the next step regardless of neuron
+    // order. Runs in parallel when built with OpenMP; the result does not depend
+    // on the number of threads.
     void update();
     
-    // Update with learning (STDP)
+    // Update with learning (STDP), applied to the synapses of the neurons that
+    // spiked in this step with the rule selected by set_stdp_rule
     void update_with_learning(int time_step, double learning_rate = 0.01);
     
+    // Select the learning rule of update_with_learning (clears the traces)
+    void set_stdp_rule(STDPRule rule);
+    STDPRule get_stdp_rule() const { return stdp_rule; }
+    
     // Get number of neurons
     size_t size() const { return neurons.size(); }
     
+    // Index of a neuron of this network (size() if it is not part of it)
+    size_t index_of(const Neuron* neuron) const;
+    
     // Reset all neurons
     void reset();
     
@@ -37,6 +111,17 @@ public:
     // Export network state to JSON (for visualization)
     void export_to_json(std::ostream& out) const;
     
+    // Export network state as a binary snapshot (see network_snapshot.py for the
+    // layout): raw little-endian CSR topology, float32 weights and potentials,
+    // spike counts and flags, and a CRC-32 of the sections in the header
+    void export_binary(std::ostream& out, int step = -1) const;
+    
+    // Load a network from a binary snapshot (connections, weights and membrane
+    // potentials; float32 precision). Returns nullptr if the snapshot is invalid,
+    // truncated or fails its checksum.
+    static Network* load_binary(std::istream& in);
+    static Network* load_binary(const std::string& filename);
+    
     // Load network from JSON file (weights and connections)
     static Network* load_from_json(const std::string& filename);
 };
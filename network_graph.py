@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Compact array-backed graph model shared by the viewers
+
+The viewers used to build a networkx DiGraph with an attribute dict per node and
+per edge, which for the full MNIST network (~395k edges) costs hundreds of MB and
+several seconds. CompactGraph keeps the same information in a handful of NumPy
+arrays (CSR topology, per-node state, in/out degree) and only produces a networkx
+graph on demand for layouts that need one (e.g. spring_layout).
+"""
+
+import hashlib
+
+import numpy as np
+
+
+def topology_hash(indptr, indices):
+    """
+    Hash of the edge set of a CSR graph (weights and neuron state are ignored)
+
+    Returns:
+        Hex digest string
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(indptr, dtype='<u4').tobytes())
+    digest.update(np.ascontiguousarray(indices, dtype='<u4').tobytes())
+    return digest.hexdigest()
+
+
+class CompactGraph:
+    """Directed graph in CSR form with per-node neuron state"""
+
+    def __init__(self, indptr, indices, weights, potential=None, spiked=None, spike_count=None):
+        """
+        Initialize the graph from CSR arrays
+
+        Args:
+            indptr: Row offsets of the outgoing edges, length num_nodes + 1
+            indices: Target node of every edge
+            weights: Weight of every edge
+            potential: Membrane potential of every node (default: zeros)
+            spiked: Spike flag of every node (default: False)
+            spike_count: Total spike count of every node (default: zeros)
+        """
+        self.indptr = np.asarray(indptr, dtype=np.uint32)
+        self.indices = np.asarray(indices, dtype=np.uint32)
+        self.weights = np.asarray(weights, dtype=np.float32)
+
+        num_nodes = len(self.indptr) - 1
+        self.potential = (np.zeros(num_nodes, dtype=np.float32) if potential is None
+                          else np.asarray(potential, dtype=np.float32))
+        self.spiked = (np.zeros(num_nodes, dtype=bool) if spiked is None
+                       else np.asarray(spiked, dtype=bool))
+        self.spike_count = (np.zeros(num_nodes, dtype=np.int32) if spike_count is None
+                            else np.asarray(spike_count, dtype=np.int32))
+
+        # Topology never changes after construction, so degrees are computed once
+        self.out_degree = np.diff(self.indptr.astype(np.int64))
+        self.in_degree = np.bincount(self.indices, minlength=num_nodes)
+        self.sources = np.repeat(np.arange(num_nodes, dtype=np.uint32), self.out_degree)
+
+        self._layers = None
+        self._topology_hash = None
+        self._nx_graph = None
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """Build a graph from a NetworkSnapshot (arrays are shared, not copied)"""
+        return cls(snapshot.indptr, snapshot.indices, snapshot.weights,
+                   snapshot.potential, snapshot.spiked, snapshot.spike_count)
+
+    @property
+    def num_nodes(self):
+        return len(self.indptr) - 1
+
+    @property
+    def num_edges(self):
+        return len(self.indices)
+
+    @property
+    def targets(self):
+        """Target node of every edge (alias of indices)"""
+        return self.indices
+
+    def nodes(self):
+        """Node ids in order"""
+        return range(self.num_nodes)
+
+    @property
+    def topology_hash(self):
+        """Hash of the edge set, computed on first use"""
+        if self._topology_hash is None:
+            self._topology_hash = topology_hash(self.indptr, self.indices)
+        return self._topology_hash
+
+    def matches_topology(self, snapshot):
+        """Check whether a snapshot has exactly the edge set of this graph"""
+        if snapshot.indptr is self.indptr and snapshot.indices is self.indices:
+            return True  # Frames of a run file share the keyframe topology arrays
+        if snapshot.num_neurons != self.num_nodes or snapshot.num_edges != self.num_edges:
+            return False
+        return topology_hash(snapshot.indptr, snapshot.indices) == self.topology_hash
+
+    def update_state(self, snapshot):
+        """
+        Take over the neuron state and weights of another snapshot of the same network
+
+        Args:
+            snapshot: NetworkSnapshot with the same number of neurons and edges
+        """
+        if snapshot.num_neurons != self.num_nodes or snapshot.num_edges != self.num_edges:
+            raise ValueError("Snapshot does not match the graph topology")
+        self.weights = np.asarray(snapshot.weights, dtype=np.float32)
+        self.potential = np.asarray(snapshot.potential, dtype=np.float32)
+        self.spiked = np.asarray(snapshot.spiked, dtype=bool)
+        self.spike_count = np.asarray(snapshot.spike_count, dtype=np.int32)
+
+    def out_edges(self, node):
+        """Edge ids of the outgoing edges of a node"""
+        return np.arange(self.indptr[node], self.indptr[node + 1])
+
+    def edge_id(self, source, target):
+        """
+        Edge id of the connection source -> target
+
+        Returns:
+            Edge id, or -1 if there is no such connection
+        """
+        start, end = int(self.indptr[source]), int(self.indptr[source + 1])
+        matches = np.flatnonzero(self.indices[start:end] == target)
+        return start + int(matches[0]) if len(matches) else -1
+
+    def edge_weight(self, source, target):
+        """Weight of the connection source -> target"""
+        edge = self.edge_id(source, target)
+        if edge < 0:
+            raise KeyError(f"No connection {source} -> {target}")
+        return float(self.weights[edge])
+
+    def layers(self):
+        """
+        Split nodes into input, hidden and output layers by degree
+
+        Nodes without incoming edges are inputs, nodes without outgoing edges are
+        outputs and all others are hidden.
+
+        Returns:
+            (input_nodes, hidden_nodes, output_nodes) arrays of node ids
+        """
+        if self._layers is None:
+            is_input = self.in_degree == 0
+            is_output = self.out_degree == 0
+            self._layers = (np.flatnonzero(is_input),
+                            np.flatnonzero(~is_input & ~is_output),
+                            np.flatnonzero(is_output))
+        return self._layers
+
+    def layer_index(self):
+        """Layer of every node: 0 = input, 1 = hidden, 2 = output"""
+        z = np.ones(self.num_nodes, dtype=np.int64)
+        z[self.out_degree == 0] = 2
+        z[self.in_degree == 0] = 0
+        return z
+
+    def to_networkx(self, attributes=True):
+        """
+        Build an equivalent networkx DiGraph
+
+        Only needed for networkx layouts and drawing helpers.
+
+        Args:
+            attributes: Attach 'potential', 'spiked' and 'spike_count' node attributes
+                and 'weight' edge attributes. Without attributes the graph only
+                describes the (fixed) topology and is cached across calls.
+        """
+        if not attributes and self._nx_graph is not None:
+            return self._nx_graph
+
+        import networkx as nx
+
+        G = nx.DiGraph()
+        if attributes:
+            G.add_nodes_from((i, {'potential': p, 'spiked': s, 'spike_count': c})
+                             for i, (p, s, c) in enumerate(zip(self.potential.tolist(),
+                                                               self.spiked.tolist(),
+                                                               self.spike_count.tolist())))
+            G.add_weighted_edges_from(zip(self.sources.tolist(), self.indices.tolist(),
+                                          self.weights.tolist()))
+        else:
+            G.add_nodes_from(range(self.num_nodes))
+            G.add_edges_from(zip(self.sources.tolist(), self.indices.tolist()))
+            self._nx_graph = G
+        return G
+
+
+def layered_layout(graph):
+    """
+    3D positions for a layered network: inputs on a grid at z=0, hidden nodes on
+    a circle at z=1 and outputs on a line at z=2
+
+    Args:
+        graph: CompactGraph
+
+    Returns:
+        Array of shape (num_nodes, 3)
+    """
+    input_nodes, hidden_nodes, output_nodes = graph.layers()
+    pos = np.zeros((graph.num_nodes, 3))
+
+    # Input layer (z=0)
+    i = np.arange(len(input_nodes))
+    pos[input_nodes, 0] = -2.0 + (i % 7) * 0.6
+    pos[input_nodes, 1] = -1.0 + (i // 7) * 0.6
+
+    # Hidden layer (z=1)
+    if len(hidden_nodes):
+        angle = 2 * np.pi * np.arange(len(hidden_nodes)) / len(hidden_nodes)
+        radius = 1.5
+        pos[hidden_nodes, 0] = radius * np.cos(angle)
+        pos[hidden_nodes, 1] = radius * np.sin(angle)
+        pos[hidden_nodes, 2] = 1
+
+    # Output layer (z=2)
+    pos[output_nodes, 0] = -1.5 + np.arange(len(output_nodes)) * 0.3
+    pos[output_nodes, 1] = 2.0
+    pos[output_nodes, 2] = 2
+    return pos
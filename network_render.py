@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Batched drawing helpers for the 3D viewers
+
+Drawing one ax.plot() per edge and one ax.scatter() per node creates hundreds of
+thousands of matplotlib artists per frame. These helpers turn the graph arrays
+into per-element color/size/width arrays so that all edges go into a single
+Line3DCollection and all nodes into a single scatter.
+"""
+
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.colors import to_rgba
+from mpl_toolkits.mplot3d.art3d import Line3DCollection
+
+
+SPIKED_COLOR = '#FF0000'
+ACTIVE_EDGE_COLOR = '#FF6600'
+INACTIVE_EDGE_COLOR = 'lightgray'
+
+
+def edge_segments(pos, sources, targets):
+    """
+    Line segments for a set of edges
+
+    Args:
+        pos: Node positions, shape (num_nodes, 3)
+        sources: Source node of every edge
+        targets: Target node of every edge
+
+    Returns:
+        Array of shape (num_edges, 2, 3)
+    """
+    return np.stack([pos[sources], pos[targets]], axis=1)
+
+
+def node_style(potential, spiked, base_size, size_range, spiked_size):
+    """
+    Per-node colors and sizes: spiked nodes are red, all others are colored and
+    sized by their potential (clipped to 0..1) on the viridis colormap
+
+    Args:
+        potential: Membrane potential of every node
+        spiked: Spike flag of every node
+        base_size: Marker size at potential 0
+        size_range: Extra marker size at potential 1
+        spiked_size: Marker size of spiked nodes
+
+    Returns:
+        (colors, sizes) with colors as an RGBA array of shape (num_nodes, 4)
+    """
+    intensity = np.clip(potential, 0.0, 1.0)
+    colors = plt.cm.viridis(intensity)
+    colors[spiked] = to_rgba(SPIKED_COLOR)
+    sizes = np.where(spiked, spiked_size, base_size + intensity * size_range)
+    return colors, sizes
+
+
+def draw_edges(ax, segments, colors, widths, linestyles='solid'):
+    """
+    Add all edges to a 3D axis as a single Line3DCollection
+
+    Returns:
+        The Line3DCollection
+    """
+    collection = Line3DCollection(segments, colors=colors, linewidths=widths,
+                                  linestyles=linestyles)
+    ax.add_collection3d(collection, autolim=False)  # Limits are set by set_equal_aspect_3d
+    return collection
+
+
+def draw_nodes(ax, pos, colors, sizes, alpha=0.9, linewidths=1.5):
+    """
+    Add all nodes to a 3D axis as a single scatter
+
+    Returns:
+        The scatter artist
+    """
+    return ax.scatter(pos[:, 0], pos[:, 1], pos[:, 2], c=colors, s=sizes, alpha=alpha,
+                      edgecolors='black', linewidths=linewidths)
+
+
+def set_equal_aspect_3d(ax, pos):
+    """Set equal axis ranges around the node positions"""
+    if not len(pos):
+        return
+    low = pos.min(axis=0)
+    high = pos.max(axis=0)
+    max_range = (high - low).max() / 2.0
+    mid = (high + low) * 0.5
+    ax.set_xlim(mid[0] - max_range, mid[0] + max_range)
+    ax.set_ylim(mid[1] - max_range, mid[1] + max_range)
+    ax.set_zlim(mid[2] - max_range, mid[2] + max_range)
+
+
+class RetainedRenderer3D:
+    """
+    Node scatter, edge collections and labels of a 3D axis created once and
+    updated in place every frame
+
+    All edges live in one Line3DCollection drawn in the inactive style; active
+    edges are drawn on top by a small overlay collection that only holds the
+    currently active segments. Node positions never change, so the 3D
+    projection done by the last full draw stays valid and the artists can be
+    blitted. With static_edges the base edge collection is left out of the
+    per-frame artists and stays in the cached background, which is what makes
+    blitting pay off: rasterizing thousands of long lines dominates frame time.
+
+    With an enabled EdgeLOD only the selected edges are put into the base
+    collection (reselected every frame for the 'spiking' mode) and the rest of
+    the network is represented by static layer bundle lines.
+    """
+
+    def __init__(self, ax, pos, sources, targets, label_nodes=(), label_offset=0.2,
+                 node_alpha=0.9, node_linewidth=1.5, static_edges=False, lod=None):
+        """
+        Create the artists
+
+        Args:
+            ax: 3D axis to draw into
+            pos: Node positions, shape (num_nodes, 3)
+            sources: Source node of every edge
+            targets: Target node of every edge
+            label_nodes: Nodes that get a text label (e.g. the output neurons)
+            label_offset: Height of the labels above their nodes
+            node_alpha: Alpha of the node markers
+            node_linewidth: Width of the black node outlines
+            static_edges: Weights do not change between frames, so the base
+                edges only need to be drawn by full redraws
+            lod: EdgeLOD choosing the drawn edges (None = all edges)
+        """
+        self.ax = ax
+        self.pos = pos
+        self.segments = edge_segments(pos, sources, targets)
+        if lod is not None:
+            lod.calibrate(self.segments, ax.figure.get_size_inches(), ax.figure.dpi)
+        self.lod = lod if lod is not None and lod.enabled else None
+        self.static_edges = static_edges and (self.lod is None or self.lod.is_static)
+        self.edge_ids = None  # Drawn edges when an LOD is active
+        initial = self.segments[:0] if self.lod is not None else self.segments
+        self.edges = draw_edges(ax, initial, to_rgba(INACTIVE_EDGE_COLOR, alpha=0.2), 1.0)
+        self.bundles = self.lod.draw_bundles(ax, pos) if self.lod is not None else None
+        self.active_edges = draw_edges(ax, self.segments[:0], to_rgba(ACTIVE_EDGE_COLOR, alpha=0.8),
+                                       1.0, linestyles='--')
+        self.nodes = draw_nodes(ax, pos, 'white', 100, alpha=node_alpha, linewidths=node_linewidth)
+
+        self.label_nodes = np.asarray(label_nodes, dtype=np.int64)
+        self.labels = [ax.text(pos[node, 0], pos[node, 1], pos[node, 2] + label_offset, '',
+                               fontsize=8, ha='center', va='center')
+                       for node in self.label_nodes]
+        self.caption = ax.text2D(0.5, 0.98, '', transform=ax.transAxes, ha='center', va='top',
+                                 fontsize=12, fontweight='bold')
+        set_equal_aspect_3d(ax, pos)
+
+    @property
+    def artists(self):
+        """All artists that change between frames"""
+        artists = [self.active_edges, self.nodes, *self.labels, self.caption]
+        return artists if self.static_edges else [self.edges, *artists]
+
+    def update_edges(self, weights, active, spiked=None, width_scale=1.0, active_width_scale=3.0):
+        """
+        Restyle the edges for a new frame
+
+        Args:
+            weights: Weight of every edge
+            active: Boolean mask of active edges
+            spiked: Spike flag of every node (used by the 'spiking' LOD mode)
+            width_scale: Line width per unit weight of inactive edges
+            active_width_scale: Line width per unit weight of active edges
+        """
+        if self.lod is None:
+            self.edges.set_linewidth(weights * width_scale)
+            active_ids = np.flatnonzero(active)
+        else:
+            edge_ids = self.lod.select(weights, spiked)
+            if self.edge_ids is None or not np.array_equal(edge_ids, self.edge_ids):
+                self.edge_ids = edge_ids
+                self.edges.set_segments(self.segments[edge_ids])
+                self._reproject(self.edges)
+            self.edges.set_linewidth(weights[self.edge_ids] * width_scale)
+            # Only drawn edges are highlighted, the bundles stand for the rest
+            active_ids = self.edge_ids[active[self.edge_ids]]
+
+        self.active_edges.set_segments(self.segments[active_ids])
+        self.active_edges.set_linewidth(weights[active_ids] * active_width_scale)
+        self._reproject(self.active_edges)
+
+    def update_nodes(self, colors, sizes):
+        """Restyle the nodes for a new frame"""
+        self.nodes.set_facecolor(colors)
+        self.nodes.set_sizes(sizes)
+        self._reproject(self.nodes)
+
+    def set_label(self, index, text, highlight=False):
+        """
+        Set the text of one node label
+
+        Args:
+            index: Position of the node in label_nodes
+            text: Label text
+            highlight: Draw the label larger on a yellow box
+        """
+        label = self.labels[index]
+        label.set_text(text)
+        label.set_fontsize(10 if highlight else 8)
+        label.set_bbox(dict(boxstyle='round', facecolor='yellow', alpha=0.7) if highlight else None)
+
+    def set_caption(self, text):
+        """Set the per-frame caption shown at the top of the axis"""
+        self.caption.set_text(text)
+
+    def _reproject(self, artist):
+        # Blitted frames skip Axes3D.draw, which normally projects 3D artists;
+        # reuse the projection matrix of the last full draw
+        if getattr(self.ax, 'M', None) is not None:
+            artist.do_3d_projection()
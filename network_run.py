@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Delta-encoded run container: a whole simulation run in a single file
+
+Topology never changes during a run and weights only change under STDP, so
+instead of one full export per step a run file stores a keyframe and then
+per-step deltas:
+
+    header (32 bytes, little-endian)
+        magic        4s   b'SNNR'
+        version      u16
+        header_size  u16
+        reserved     u32[6]
+    records (until end of file)
+        record_size  u32  bytes following this field
+        record_type  u32  0 = delta, 1 = keyframe
+        step         i32
+        epoch        i32  (-1 if not applicable)
+        label        i32  (-1 if not applicable)
+        kind         u32  FRAME_* constant below
+        payload
+            keyframe: a complete binary snapshot (see network_snapshot.py)
+            delta:    num_neurons u32, num_spiked u32, num_changed u32, reserved u32,
+                      potential f32[num_neurons], spike_count i32[num_neurons],
+                      spiked_ids u32[num_spiked],
+                      changed_edges u32[num_changed], changed_weights f32[num_changed]
+
+Written by RunRecorder in run_recorder.cpp.
+"""
+
+import bisect
+import os
+import struct
+import sys
+import argparse
+
+import numpy as np
+
+from network_snapshot import NetworkSnapshot, load_network_state, find_step_files
+
+
+RUN_MAGIC = b'SNNR'
+RUN_VERSION = 1
+RUN_EXTENSION = '.snnr'
+
+RECORD_DELTA = 0
+RECORD_KEYFRAME = 1
+
+FRAME_SIMULATION = 0
+FRAME_TRAINING = 1
+FRAME_TEST = 2
+FRAME_PROGRESS = 3
+
+_HEADER = struct.Struct('<4sHH6I')
+_RECORD = struct.Struct('<IIiiiI')
+_DELTA = struct.Struct('<IIII')
+
+
+def is_run_file(filename):
+    """Check whether a file starts with the run container magic"""
+    with open(filename, 'rb') as f:
+        return f.read(len(RUN_MAGIC)) == RUN_MAGIC
+
+
+class RunReader:
+    """Random access to the frames of a run container"""
+
+    def __init__(self, filename):
+        """
+        Open a run file and index its records
+
+        Args:
+            filename: Path to a .snnr file
+        """
+        self.filename = filename
+        self._data = np.memmap(filename, dtype=np.uint8, mode='r')
+        if len(self._data) < _HEADER.size:
+            raise ValueError(f"File too small for a run header: {filename}")
+
+        magic, version, header_size = _HEADER.unpack_from(self._data[:_HEADER.size].tobytes())[:3]
+        if magic != RUN_MAGIC:
+            raise ValueError(f"Not a run file (magic {magic!r}): {filename}")
+        if version > RUN_VERSION:
+            raise ValueError(f"Unsupported run file version {version}")
+
+        # Index records: (payload offset, payload size, type, step, epoch, label, kind)
+        self._records = []
+        self._keyframes = []
+        offset = header_size
+        while offset + _RECORD.size <= len(self._data):
+            (record_size, record_type, step, epoch,
+             label, kind) = _RECORD.unpack_from(self._data[offset:offset + _RECORD.size].tobytes())
+            end = offset + 4 + record_size
+            if end > len(self._data):
+                break  # Truncated final record (writer still running or crashed)
+            if record_type == RECORD_KEYFRAME:
+                self._keyframes.append(len(self._records))
+            self._records.append((offset + _RECORD.size, end - offset - _RECORD.size,
+                                  record_type, step, epoch, label, kind))
+            offset = end
+
+        if not self._keyframes or self._keyframes[0] != 0:
+            raise ValueError(f"Run file does not start with a keyframe: {filename}")
+
+        self._keyframe_cache = {}
+        self._cursor = None  # (frame index, weights) of the last reconstructed frame
+
+    def __len__(self):
+        return len(self._records)
+
+    def frame_info(self, index):
+        """Tags stored with a frame: step, epoch, label and kind"""
+        _, _, _, step, epoch, label, kind = self._records[index]
+        return {'step': step, 'epoch': epoch, 'label': label, 'kind': kind}
+
+    def frame_indices(self, kind=None):
+        """Indices of all frames, optionally only those of one FRAME_* kind"""
+        return [i for i, record in enumerate(self._records)
+                if kind is None or record[6] == kind]
+
+    def _payload(self, index):
+        offset, size = self._records[index][:2]
+        return self._data[offset:offset + size]
+
+    def _keyframe(self, index):
+        if index not in self._keyframe_cache:
+            self._keyframe_cache[index] = NetworkSnapshot.from_buffer(self._payload(index))
+        return self._keyframe_cache[index]
+
+    def _delta(self, index):
+        payload = self._payload(index)
+        num_neurons, num_spiked, num_changed, _ = _DELTA.unpack_from(payload[:_DELTA.size].tobytes())
+        offset = _DELTA.size
+        arrays = []
+        for dtype, count in (('<f4', num_neurons), ('<i4', num_neurons), ('<u4', num_spiked),
+                             ('<u4', num_changed), ('<f4', num_changed)):
+            arrays.append(payload[offset:offset + 4 * count].view(dtype))
+            offset += 4 * count
+        return arrays
+
+    def _weights_at(self, index):
+        """Reconstruct the weight array of a frame by replaying deltas from its keyframe"""
+        key = self._keyframes[bisect.bisect_right(self._keyframes, index) - 1]
+
+        if self._cursor is not None and key <= self._cursor[0] <= index:
+            start, weights = self._cursor
+        else:
+            start, weights = key, self._keyframe(key).weights
+
+        for i in range(start + 1, index + 1):
+            changed_edges, changed_weights = self._delta(i)[3:]
+            if len(changed_edges):
+                if not weights.flags.writeable:
+                    weights = weights.copy()
+                weights[changed_edges] = changed_weights
+
+        self._cursor = (index, weights)
+        return weights, key
+
+    def frame(self, index):
+        """
+        Reconstruct one frame
+
+        Returns:
+            NetworkSnapshot sharing topology arrays with its keyframe
+        """
+        if index < 0:
+            index += len(self._records)
+        record_type, step = self._records[index][2:4]
+        weights, key = self._weights_at(index)
+        keyframe = self._keyframe(key)
+
+        if record_type == RECORD_KEYFRAME:
+            return keyframe
+
+        potential, spike_count, spiked_ids = self._delta(index)[:3]
+        spiked = np.zeros(keyframe.num_neurons, dtype=bool)
+        spiked[spiked_ids] = True
+        # Hand out a private copy so later replays cannot modify this frame
+        frame_weights = weights if not weights.flags.writeable else weights.copy()
+        return NetworkSnapshot(keyframe.indptr, keyframe.indices, frame_weights,
+                               potential, spiked, spike_count, step)
+
+    def __getitem__(self, index):
+        return self.frame(index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.frame(i)
+
+
+def write_run(filename, snapshots, infos=None):
+    """
+    Pack a sequence of snapshots into a run container
+
+    Args:
+        filename: Output .snnr path
+        snapshots: Iterable of NetworkSnapshot
+        infos: Optional list of dicts with 'step', 'epoch', 'label', 'kind' per frame
+    """
+    with open(filename, 'wb') as f:
+        f.write(_HEADER.pack(RUN_MAGIC, RUN_VERSION, _HEADER.size, 0, 0, 0, 0, 0, 0))
+
+        previous = None
+        for i, snapshot in enumerate(snapshots):
+            info = infos[i] if infos else {}
+            tags = (info.get('step', snapshot.step), info.get('epoch', -1),
+                    info.get('label', -1), info.get('kind', FRAME_SIMULATION))
+
+            if (previous is None or snapshot.num_neurons != previous.num_neurons or
+                    not np.array_equal(snapshot.indptr, previous.indptr) or
+                    not np.array_equal(snapshot.indices, previous.indices)):
+                payload = snapshot.to_bytes()
+                f.write(_RECORD.pack(len(payload) + _RECORD.size - 4, RECORD_KEYFRAME, *tags))
+                f.write(payload)
+            else:
+                changed = np.flatnonzero(snapshot.weights != previous.weights).astype('<u4')
+                spiked_ids = np.flatnonzero(snapshot.spiked).astype('<u4')
+                parts = [_DELTA.pack(snapshot.num_neurons, len(spiked_ids), len(changed), 0),
+                         snapshot.potential.astype('<f4').tobytes(),
+                         snapshot.spike_count.astype('<i4').tobytes(),
+                         spiked_ids.tobytes(), changed.tobytes(),
+                         snapshot.weights[changed].astype('<f4').tobytes()]
+                payload = b''.join(parts)
+                f.write(_RECORD.pack(len(payload) + _RECORD.size - 4, RECORD_DELTA, *tags))
+                f.write(payload)
+            previous = snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect and create run container files')
+    subparsers = parser.add_subparsers(dest='command')
+
+    info_parser = subparsers.add_parser('info', help='List the frames of a run file')
+    info_parser.add_argument('run_file', help='Run container (.snnr)')
+
+    pack_parser = subparsers.add_parser('pack', help='Pack a series of step files into a run file')
+    pack_parser.add_argument('base_file', help='Any step file of the series (e.g. spike_animation_step0.json)')
+    pack_parser.add_argument('output', help='Output run file (.snnr)')
+
+    args = parser.parse_args()
+
+    if args.command == 'info':
+        reader = RunReader(args.run_file)
+        print(f"{args.run_file}: {len(reader)} frames, {len(reader._keyframes)} keyframes")
+        for i in range(len(reader)):
+            info = reader.frame_info(i)
+            print(f"  frame {i}: step {info['step']}, epoch {info['epoch']}, "
+                  f"label {info['label']}, kind {info['kind']}")
+    elif args.command == 'pack':
+        step_files = find_step_files(args.base_file)
+        if not step_files:
+            print(f"Error: No step files found for {args.base_file}")
+            sys.exit(1)
+        snapshots = (load_network_state(path) for _, path in step_files)
+        infos = [{'step': step} for step, _ in step_files]
+        write_run(args.output, snapshots, infos)
+        total = sum(os.path.getsize(path) for _, path in step_files)
+        print(f"Packed {len(step_files)} steps ({total} bytes) into {args.output} "
+              f"({os.path.getsize(args.output)} bytes)")
+    else:
+        parser.print_help()
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
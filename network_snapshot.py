@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Binary network snapshot format shared by the C++ exporters and the Python viewers
+
+A snapshot holds one time step of a network in columnar form so that NumPy can
+map it directly instead of parsing hundreds of thousands of JSON objects:
+
+    header (32 bytes, little-endian)
+        magic        4s   b'SNNS'
+        version      u16
+        header_size  u16
+        num_neurons  u32
+        num_edges    u32
+        step         i32  (-1 if unknown)
+        flags        u32  (bit 0: checksum is set)
+        checksum     u32  CRC-32 (zlib.crc32) of all bytes after the header
+        reserved     u32
+    sections (each starting at an 8-byte aligned offset)
+        indptr       u32[num_neurons + 1]   CSR row offsets (outgoing edges)
+        indices      u32[num_edges]         CSR target neuron ids
+        weights      f32[num_edges]
+        potential    f32[num_neurons]
+        spike_count  i32[num_neurons]
+        spiked       u8[ceil(num_neurons / 8)]  bitset, LSB first
+
+The same layout is written by Network::export_binary() and read by
+Network::load_binary() in network.cpp.
+"""
+
+import json
+import os
+import re
+import struct
+import sys
+import zlib
+import argparse
+
+import numpy as np
+
+
+SNAPSHOT_MAGIC = b'SNNS'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_EXTENSION = '.snn'
+SNAPSHOT_FLAG_CHECKSUM = 1
+
+_HEADER = struct.Struct('<4sHHIIiIII')
+
+
+def _align8(offset):
+    return (offset + 7) & ~7
+
+
+def _section_layout(num_neurons, num_edges):
+    """
+    Compute the byte offset of every section for the given sizes
+
+    Returns:
+        (sections, total_size) where sections is a list of
+        (name, dtype, count, offset) tuples
+    """
+    sections = []
+    offset = _HEADER.size
+    for name, dtype, count in (('indptr', '<u4', num_neurons + 1),
+                               ('indices', '<u4', num_edges),
+                               ('weights', '<f4', num_edges),
+                               ('potential', '<f4', num_neurons),
+                               ('spike_count', '<i4', num_neurons),
+                               ('spiked', 'u1', (num_neurons + 7) // 8)):
+        offset = _align8(offset)
+        sections.append((name, np.dtype(dtype), count, offset))
+        offset += np.dtype(dtype).itemsize * count
+    return sections, _align8(offset)
+
+
+class NetworkSnapshot:
+    """One time step of a network stored as contiguous NumPy arrays"""
+
+    def __init__(self, indptr, indices, weights, potential, spiked, spike_count, step=-1):
+        """
+        Initialize a snapshot from arrays
+
+        Args:
+            indptr: CSR row offsets, length num_neurons + 1
+            indices: Target neuron id of every edge
+            weights: Weight of every edge
+            potential: Membrane potential of every neuron
+            spiked: Boolean spike flag of every neuron
+            spike_count: Total spike count of every neuron
+            step: Simulation step this snapshot was taken at (-1 if unknown)
+        """
+        self.indptr = np.asarray(indptr, dtype=np.uint32)
+        self.indices = np.asarray(indices, dtype=np.uint32)
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.potential = np.asarray(potential, dtype=np.float32)
+        self.spiked = np.asarray(spiked, dtype=bool)
+        self.spike_count = np.asarray(spike_count, dtype=np.int32)
+        self.step = int(step)
+        self._sources = None
+
+    @property
+    def num_neurons(self):
+        return len(self.potential)
+
+    @property
+    def num_edges(self):
+        return len(self.indices)
+
+    def sources(self):
+        """Source neuron id of every edge (expanded from indptr)"""
+        if self._sources is None:
+            self._sources = np.repeat(np.arange(self.num_neurons, dtype=np.uint32),
+                                      np.diff(self.indptr.astype(np.int64)))
+        return self._sources
+
+    @classmethod
+    def from_dict(cls, data, step=-1):
+        """Build a snapshot from the JSON structure written by export_to_json"""
+        neurons = sorted(data['neurons'], key=lambda n: n['id'])
+        num_neurons = neurons[-1]['id'] + 1 if neurons else 0
+
+        potential = np.zeros(num_neurons, dtype=np.float32)
+        spiked = np.zeros(num_neurons, dtype=bool)
+        spike_count = np.zeros(num_neurons, dtype=np.int32)
+        counts = np.zeros(num_neurons, dtype=np.int64)
+        targets = []
+        weights = []
+
+        for neuron in neurons:
+            neuron_id = neuron['id']
+            potential[neuron_id] = neuron['potential']
+            spiked[neuron_id] = neuron['spiked']
+            spike_count[neuron_id] = neuron['spike_count']
+            connections = neuron['connections']
+            counts[neuron_id] = len(connections)
+            targets.extend(conn['target'] for conn in connections)
+            weights.extend(conn['weight'] for conn in connections)
+
+        indptr = np.zeros(num_neurons + 1, dtype=np.uint32)
+        np.cumsum(counts, out=indptr[1:])
+        return cls(indptr, targets, weights, potential, spiked, spike_count, step)
+
+    def to_dict(self):
+        """Convert back to the JSON structure written by export_to_json"""
+        neurons = []
+        for i in range(self.num_neurons):
+            start, end = int(self.indptr[i]), int(self.indptr[i + 1])
+            neurons.append({
+                'id': i,
+                'potential': float(self.potential[i]),
+                'spiked': bool(self.spiked[i]),
+                'spike_count': int(self.spike_count[i]),
+                'connections': [{'target': int(t), 'weight': float(w)}
+                                for t, w in zip(self.indices[start:end],
+                                                self.weights[start:end])]
+            })
+        return {'neurons': neurons}
+
+    @classmethod
+    def from_buffer(cls, buffer, verify=True):
+        """
+        Create a snapshot whose arrays are views into a bytes-like buffer
+
+        Args:
+            buffer: bytes, bytearray, memoryview or np.memmap holding a snapshot
+            verify: Check the CRC-32 of the sections if the snapshot has one
+        """
+        raw = np.frombuffer(buffer, dtype=np.uint8)
+        if len(raw) < _HEADER.size:
+            raise ValueError("Buffer too small for a snapshot header")
+
+        (magic, version, header_size, num_neurons, num_edges,
+         step, flags, checksum, _reserved) = _HEADER.unpack_from(raw[:_HEADER.size].tobytes())
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"Not a network snapshot (magic {magic!r})")
+        if version > SNAPSHOT_VERSION or header_size != _HEADER.size:
+            raise ValueError(f"Unsupported snapshot version {version}")
+
+        sections, total_size = _section_layout(num_neurons, num_edges)
+        if len(raw) < total_size:
+            raise ValueError(f"Truncated snapshot ({len(raw)} of {total_size} bytes)")
+        if verify and flags & SNAPSHOT_FLAG_CHECKSUM:
+            if zlib.crc32(raw[_HEADER.size:total_size]) != checksum:
+                raise ValueError("Snapshot checksum mismatch")
+
+        arrays = {}
+        for name, dtype, count, offset in sections:
+            arrays[name] = raw[offset:offset + dtype.itemsize * count].view(dtype)
+
+        spiked = np.unpackbits(arrays['spiked'], count=num_neurons,
+                               bitorder='little').astype(bool)
+        return cls(arrays['indptr'], arrays['indices'], arrays['weights'],
+                   arrays['potential'], spiked, arrays['spike_count'], step)
+
+    def to_bytes(self):
+        """Serialize to the binary snapshot format"""
+        sections, total_size = _section_layout(self.num_neurons, self.num_edges)
+        out = bytearray(total_size)
+
+        values = {
+            'indptr': self.indptr,
+            'indices': self.indices,
+            'weights': self.weights,
+            'potential': self.potential,
+            'spike_count': self.spike_count,
+            'spiked': np.packbits(self.spiked, bitorder='little'),
+        }
+        for name, dtype, count, offset in sections:
+            array = np.ascontiguousarray(values[name], dtype=dtype)
+            out[offset:offset + dtype.itemsize * count] = array.tobytes()
+        checksum = zlib.crc32(memoryview(out)[_HEADER.size:])
+        _HEADER.pack_into(out, 0, SNAPSHOT_MAGIC, SNAPSHOT_VERSION, _HEADER.size,
+                          self.num_neurons, self.num_edges, self.step,
+                          SNAPSHOT_FLAG_CHECKSUM, checksum, 0)
+        return bytes(out)
+
+    def save(self, filename):
+        """Write the snapshot to a file"""
+        with open(filename, 'wb') as f:
+            f.write(self.to_bytes())
+
+
+def is_snapshot_file(filename):
+    """Check whether a file starts with the snapshot magic"""
+    with open(filename, 'rb') as f:
+        return f.read(len(SNAPSHOT_MAGIC)) == SNAPSHOT_MAGIC
+
+
+def read_snapshot(filename, mmap=True, verify=True):
+    """
+    Read a binary snapshot file
+
+    Args:
+        filename: Path to a .snn file
+        mmap: Map the file instead of reading it (arrays become read-only views)
+        verify: Check the snapshot's CRC-32 (reads the whole file once)
+    """
+    if mmap:
+        return NetworkSnapshot.from_buffer(np.memmap(filename, dtype=np.uint8, mode='r'), verify)
+    with open(filename, 'rb') as f:
+        return NetworkSnapshot.from_buffer(f.read(), verify)
+
+
+def load_network_state(filename):
+    """
+    Load one network state from a binary snapshot, a run container or an
+    export_to_json file (for run containers the first frame is returned)
+
+    Returns:
+        NetworkSnapshot
+    """
+    with open(filename, 'rb') as f:
+        magic = f.read(4)
+    if magic == SNAPSHOT_MAGIC:
+        return read_snapshot(filename)
+    if magic == b'SNNR':
+        from network_run import RunReader  # network_run imports this module
+        return RunReader(filename).frame(0)
+    with open(filename, 'r') as f:
+        return NetworkSnapshot.from_dict(json.load(f))
+
+
+def find_step_files(base_filename):
+    """
+    Find all step files belonging to the same series as base_filename
+
+    Both '<base>_stepN.json' and '<base>_stepN.snn' files are matched.
+
+    Args:
+        base_filename: Any file of the series (e.g. 'network_step0.json')
+
+    Returns:
+        List of (step_number, path) tuples sorted by step
+    """
+    match = re.search(r'(.+)_step\d+\.(?:json|snn)$', base_filename)
+    if match:
+        base_path = match.group(1)
+    else:
+        base_path = os.path.splitext(base_filename)[0]
+
+    dir_path = os.path.dirname(base_path) or '.'
+    if not os.path.exists(dir_path):
+        dir_path = '.'
+    pattern = re.compile(re.escape(os.path.basename(base_path)) + r'_step(\d+)\.(?:json|snn)$')
+
+    step_files = {}
+    for filename in os.listdir(dir_path):
+        match = pattern.match(filename)
+        if match:
+            step_num = int(match.group(1))
+            # Prefer the binary snapshot when both formats exist for a step
+            if step_num not in step_files or filename.endswith(SNAPSHOT_EXTENSION):
+                step_files[step_num] = os.path.join(dir_path, filename)
+
+    return sorted(step_files.items())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert and inspect network snapshots')
+    subparsers = parser.add_subparsers(dest='command')
+
+    convert_parser = subparsers.add_parser('convert', help='Convert JSON exports to .snn')
+    convert_parser.add_argument('json_files', nargs='+', help='JSON files written by export_to_json')
+
+    info_parser = subparsers.add_parser('info', help='Print snapshot summary')
+    info_parser.add_argument('files', nargs='+', help='Snapshot or JSON files')
+
+    args = parser.parse_args()
+
+    if args.command == 'convert':
+        for json_file in args.json_files:
+            snapshot = load_network_state(json_file)
+            out_file = os.path.splitext(json_file)[0] + SNAPSHOT_EXTENSION
+            snapshot.save(out_file)
+            print(f"{json_file} -> {out_file} ({os.path.getsize(out_file)} bytes)")
+    elif args.command == 'info':
+        for filename in args.files:
+            snapshot = load_network_state(filename)
+            print(f"{filename}: {snapshot.num_neurons} neurons, {snapshot.num_edges} edges, "
+                  f"{int(snapshot.spiked.sum())} spiked, step {snapshot.step}")
+    else:
+        parser.print_help()
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,15 @@
 #include "neuron.h"
 #include <algorithm>
+#include <cmath>
+#include <unordered_map>
+
+const size_t Neuron::SPIKE_HISTORY_CAPACITY;
 
 Neuron::Neuron(double threshold, double resting, double decay)
     : membrane_potential(resting), threshold(threshold), 
       resting_potential(resting), decay_factor(decay),
-      has_spiked(false), spike_count(0), last_spike_time(-1) {
+      topology_version(0), has_spiked(false), spike_count(0), last_spike_time(-1),
+      spike_history_start(0), spike_history_size(0) {
 }
 
 void Neuron::add_connection(Neuron* target, double weight) {
@@ -16,13 +21,50 @@ void Neuron::add_connection(Neuron* target, double weight) {
     
     if (it == connections.end()) {
         connections.emplace_back(target, weight);
+        topology_version++;
     } else {
         // Update weight if connection exists
         it->weight = weight;
     }
 }
 
+void Neuron::add_connections(const std::vector<Connection>& batch) {
+    // Common case (building a network): no connections yet and distinct targets
+    if (connections.empty()) {
+        std::vector<const Neuron*> batch_targets;
+        batch_targets.reserve(batch.size());
+        for (const auto& conn : batch) {
+            batch_targets.push_back(conn.target);
+        }
+        std::sort(batch_targets.begin(), batch_targets.end());
+        if (std::adjacent_find(batch_targets.begin(), batch_targets.end()) == batch_targets.end()) {
+            connections = batch;
+            topology_version++;
+            return;
+        }
+    }
+    
+    // Otherwise look up every target once in a hash of the existing connections
+    std::unordered_map<const Neuron*, size_t> position;
+    position.reserve(connections.size() + batch.size());
+    for (size_t k = 0; k < connections.size(); ++k) {
+        position[connections[k].target] = k;
+    }
+    connections.reserve(connections.size() + batch.size());
+    for (const auto& conn : batch) {
+        auto inserted = position.emplace(conn.target, connections.size());
+        if (inserted.second) {
+            connections.push_back(conn);
+            topology_version++;
+        } else {
+            // Update weight if connection exists
+            connections[inserted.first->second].weight = conn.weight;
+        }
+    }
+}
+
 void Neuron::remove_connection(Neuron* target) {
+    const size_t count = connections.size();
     connections.erase(
         std::remove_if(connections.begin(), connections.end(),
             [target](const Connection& conn) {
@@ -30,9 +72,23 @@ void Neuron::remove_connection(Neuron* target) {
             }),
         connections.end()
     );
+    if (connections.size() != count) {
+        topology_version++;
+    }
 }
 
 void Neuron::update() {
+    if (update_state()) {
+        // Send spikes to all connected neurons
+        for (auto& conn : connections) {
+            if (conn.target != nullptr) {
+                conn.target->receive_spike(conn.weight);
+            }
+        }
+    }
+}
+
+bool Neuron::update_state() {
     // Reset spike flag
     has_spiked = false;
     
@@ -45,18 +101,12 @@ void Neuron::update() {
         
         // Reset membrane potential after spike
         membrane_potential = resting_potential;
-        
-        // Send spikes to all connected neurons
-        for (auto& conn : connections) {
-            if (conn.target != nullptr) {
-                conn.target->receive_spike(conn.weight);
-            }
-        }
     } else {
         // Decay membrane potential towards resting potential (only if no spike)
         membrane_potential = resting_potential + 
                             (membrane_potential - resting_potential) * decay_factor;
     }
+    return has_spiked;
 }
 
 void Neuron::receive_spike(double weight) {
@@ -72,14 +122,27 @@ void Neuron::apply_input(double current) {
 void Neuron::set_time_step(int time_step) {
     if (has_spiked) {
         last_spike_time = time_step;
-        spike_history.push_back(time_step);
-        // Keep only recent spike history (last 100 spikes)
-        if (spike_history.size() > 100) {
-            spike_history.erase(spike_history.begin());
+        // Keep only recent spike history (last 100 spikes): once the ring
+        // is full the newest spike overwrites the oldest
+        if (spike_history_size < SPIKE_HISTORY_CAPACITY) {
+            spike_history[(spike_history_start + spike_history_size) % SPIKE_HISTORY_CAPACITY] = time_step;
+            spike_history_size++;
+        } else {
+            spike_history[spike_history_start] = time_step;
+            spike_history_start = (spike_history_start + 1) % SPIKE_HISTORY_CAPACITY;
         }
     }
 }
 
+std::vector<int> Neuron::get_spike_history() const {
+    std::vector<int> history;
+    history.reserve(spike_history_size);
+    for (size_t i = 0; i < spike_history_size; ++i) {
+        history.push_back(get_spike_history_at(i));
+    }
+    return history;
+}
+
 void Neuron::update_stdp(int /* current_time */, double learning_rate, double tau_plus, double tau_minus) {
     // STDP: Spike-Timing Dependent Plasticity
     // If pre-synaptic neuron spikes before post-synaptic: strengthen (LTP)
@@ -89,26 +152,58 @@ void Neuron::update_stdp(int /* current_time */, double learning_rate, double ta
     
     for (auto& conn : connections) {
         if (conn.target == nullptr) continue;
-        
-        int post_spike_time = conn.target->get_last_spike_time();
-        if (post_spike_time < 0) continue; // Post-synaptic neuron hasn't spiked
-        
-        int dt = post_spike_time - last_spike_time; // Time difference
-        
-        if (dt > 0) {
-            // Pre before post: Long-Term Potentiation (LTP)
-            double weight_change = learning_rate * exp(-dt / tau_plus);
-            conn.weight += weight_change;
-            // Clamp weight
-            if (conn.weight > 1.0) conn.weight = 1.0;
-        } else if (dt < 0) {
-            // Post before pre: Long-Term Depression (LTD)
-            double weight_change = -learning_rate * exp(dt / tau_minus);
-            conn.weight += weight_change;
-            // Clamp weight
-            if (conn.weight < 0.0) conn.weight = 0.0;
+        apply_stdp(conn.weight, last_spike_time, conn.target->get_last_spike_time(),
+                   learning_rate, tau_plus, tau_minus);
+    }
+}
+
+void Neuron::apply_stdp(double& weight, int pre_spike_time, int post_spike_time,
+                        double learning_rate, double tau_plus, double tau_minus) {
+    if (pre_spike_time < 0 || post_spike_time < 0) return; // One side hasn't spiked
+    
+    int dt = post_spike_time - pre_spike_time; // Time difference
+    
+    if (dt > 0) {
+        // Pre before post: Long-Term Potentiation (LTP)
+        weight += learning_rate * stdp_window(dt, tau_plus);
+        // Clamp weight
+        if (weight > 1.0) weight = 1.0;
+    } else if (dt < 0) {
+        // Post before pre: Long-Term Depression (LTD)
+        weight += -learning_rate * stdp_window(-dt, tau_minus);
+        // Clamp weight
+        if (weight < 0.0) weight = 0.0;
+    }
+}
+
+void Neuron::apply_trace_stdp(double& weight, double potentiation, double depression,
+                              double learning_rate) {
+    double change = learning_rate * (potentiation - depression);
+    if (change > 0.0) {
+        weight += change;
+        if (weight > 1.0) weight = 1.0;
+    } else if (change < 0.0) {
+        weight += change;
+        if (weight < 0.0) weight = 0.0;
+    }
+}
+
+double Neuron::stdp_window(int dt, double tau) {
+    // exp() per synapse dominated training; spike time differences are small integers
+    static const double TABLE_TAU = 20.0;
+    static const int TABLE_SIZE = 1024;
+    static const std::vector<double> table = [] {
+        std::vector<double> values(TABLE_SIZE);
+        for (int i = 0; i < TABLE_SIZE; ++i) {
+            values[i] = exp(-i / TABLE_TAU);
         }
+        return values;
+    }();
+    
+    if (tau == TABLE_TAU && dt < TABLE_SIZE) {
+        return table[dt];
     }
+    return exp(-dt / tau);
 }
 
 void Neuron::reset() {
@@ -116,6 +211,7 @@ void Neuron::reset() {
     has_spiked = false;
     spike_count = 0;
     last_spike_time = -1;
-    spike_history.clear();
+    spike_history_start = 0;
+    spike_history_size = 0;
 }
 
@@ -2,11 +2,21 @@
 #define NEURON_H
 
 #include <vector>
+#include <array>
+#include <cstdint>
 #include <memory>
 #include <functional>
 
 class Neuron {
 public:
+    // Number of recent spike times kept per neuron
+    static const size_t SPIKE_HISTORY_CAPACITY = 100;
+    
+    // Default STDP time constants (in time steps), shared by Network and
+    // SoANetwork for both STDP rules
+    static constexpr double STDP_TAU_PLUS = 20.0;
+    static constexpr double STDP_TAU_MINUS = 20.0;
+    
     // Connection structure to hold link to another neuron and weight
     struct Connection {
         Neuron* target;
@@ -21,10 +31,15 @@ private:
     double resting_potential;         // Resting membrane potential
     double decay_factor;             // Membrane potential decay
     std::vector<Connection> connections;  // Dynamic connections to other neurons
+    uint64_t topology_version;       // Bumped whenever a connection is added or removed
     bool has_spiked;                 // Whether neuron spiked in current time step
     int spike_count;                 // Total number of spikes
     int last_spike_time;             // Last time step when neuron spiked (for STDP)
-    std::vector<int> spike_history;  // History of spike times (for STDP)
+    // History of spike times (for STDP): ring buffer of the last
+    // SPIKE_HISTORY_CAPACITY spikes, the oldest at spike_history_start
+    std::array<int, SPIKE_HISTORY_CAPACITY> spike_history;
+    size_t spike_history_start;
+    size_t spike_history_size;
 
 public:
     // Constructor
@@ -33,12 +48,20 @@ public:
     // Add a connection to another neuron
     void add_connection(Neuron* target, double weight);
     
+    // Add many connections at once (same result as add_connection for each,
+    // in order; duplicates are detected once for the whole batch)
+    void add_connections(const std::vector<Connection>& batch);
+    
     // Remove a connection to a specific neuron
     void remove_connection(Neuron* target);
     
     // Update neuron state (called each time step)
     void update();
     
+    // Update spike flag and potential without sending spikes to the targets
+    // (used by Network's synchronous update); returns whether the neuron spiked
+    bool update_state();
+    
     // Receive input spike from another neuron
     void receive_spike(double weight);
     
@@ -60,17 +83,43 @@ public:
     // Get connections (for export/visualization)
     const std::vector<Connection>& get_connections() const { return connections; }
     
-    // Get mutable connections (for learning)
+    // Get mutable connections (for learning: change weights only, targets and
+    // order must stay as they are)
     std::vector<Connection>& get_connections_mutable() { return connections; }
     
+    // Changes whenever a connection is added or removed (for cached topologies)
+    uint64_t get_topology_version() const { return topology_version; }
+    
     // Get last spike time
     int get_last_spike_time() const { return last_spike_time; }
     
-    // Get spike history
-    const std::vector<int>& get_spike_history() const { return spike_history; }
+    // Get spike history (up to the last SPIKE_HISTORY_CAPACITY spike times, oldest first)
+    std::vector<int> get_spike_history() const;
+    
+    // Number of spike times in the history and the i-th oldest of them
+    size_t get_spike_history_size() const { return spike_history_size; }
+    int get_spike_history_at(size_t i) const {
+        return spike_history[(spike_history_start + i) % SPIKE_HISTORY_CAPACITY];
+    }
     
     // Update STDP learning rule (called after network update)
-    void update_stdp(int current_time, double learning_rate = 0.01, double tau_plus = 20.0, double tau_minus = 20.0);
+    void update_stdp(int current_time, double learning_rate = 0.01, double tau_plus = STDP_TAU_PLUS,
+                     double tau_minus = STDP_TAU_MINUS);
+    
+    // Apply the STDP rule to one connection given the last spike times of its
+    // pre- and post-synaptic neuron (-1 = never spiked)
+    static void apply_stdp(double& weight, int pre_spike_time, int post_spike_time,
+                           double learning_rate = 0.01, double tau_plus = STDP_TAU_PLUS,
+                           double tau_minus = STDP_TAU_MINUS);
+    
+    // Apply trace-based STDP to one connection: potentiation is the pre-synaptic
+    // trace when the post-synaptic neuron spikes, depression the post-synaptic
+    // trace when the pre-synaptic neuron spikes (0 otherwise)
+    static void apply_trace_stdp(double& weight, double potentiation, double depression,
+                                 double learning_rate = 0.01);
+    
+    // exp(-dt / tau) for dt >= 0, from a lookup table for the default tau of 20
+    static double stdp_window(int dt, double tau);
     
     // Reset neuron state
     void reset();
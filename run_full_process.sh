@@ -76,7 +76,7 @@ if [ -f "data/json/trained_network.json" ]; then
     ./simulate_spiking data/json/trained_network.json $TEST_DIGIT $SIMULATION_STEPS
     if [ $? -eq 0 ]; then
         echo -e "${GREEN}✅ Simulation completed${NC}"
-        echo "  Animation frames saved to: data/json/spike_animation_step*.json"
+        echo "  Animation frames saved to: data/json/spike_animation.snnr"
     else
         echo -e "${RED}❌ Simulation failed${NC}"
         exit 1
@@ -134,12 +134,12 @@ echo -e "${GREEN}✅ Visualizations: Complete${NC}"
 echo ""
 echo -e "${BLUE}Generated Files:${NC}"
 echo "  📊 Network: data/json/trained_network.json"
-echo "  🎬 Animation: data/json/spike_animation_step*.json"
+echo "  🎬 Animation: data/json/spike_animation.snnr"
 echo "  📈 Visualizations: *.png"
 echo ""
 echo -e "${BLUE}Next Steps:${NC}"
-echo "  • View 3D animation: python animate_3d_spiking.py data/json/spike_animation_step0.json"
-echo "  • View 2D animation: python visualize_network.py data/json/spike_animation_step0.json --time-series"
+echo "  • View 3D animation: python animate_3d_spiking.py data/json/spike_animation.snnr"
+echo "  • View 2D animation: python visualize_network.py data/json/spike_animation.snnr --time-series"
 echo "  • Train with animation: make animate-training"
 echo ""
 echo -e "${GREEN}🎉 Full process completed successfully!${NC}"
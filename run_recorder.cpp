@@ -0,0 +1,174 @@
+#include "run_recorder.h"
+#include <sstream>
+
+namespace {
+
+// Run container layout constants (must match network_run.py)
+const char RUN_MAGIC[4] = {'S', 'N', 'N', 'R'};
+const uint16_t RUN_VERSION = 1;
+const uint16_t RUN_HEADER_SIZE = 32;
+const uint32_t RECORD_DELTA = 0;
+const uint32_t RECORD_KEYFRAME = 1;
+
+// Write a plain value in host byte order (all supported hosts are little-endian)
+template <typename T>
+void write_raw(std::ostream& out, const T& value) {
+    out.write(reinterpret_cast<const char*>(&value), sizeof(T));
+}
+
+template <typename T>
+void write_array(std::ostream& out, const std::vector<T>& values) {
+    if (!values.empty()) {
+        out.write(reinterpret_cast<const char*>(values.data()), values.size() * sizeof(T));
+    }
+}
+
+void write_record_header(std::ostream& out, uint32_t payload_size, uint32_t type,
+                         int step, int epoch, int label, uint32_t kind) {
+    // record_size counts everything after the size field itself
+    write_raw(out, static_cast<uint32_t>(payload_size + 5 * sizeof(uint32_t)));
+    write_raw(out, type);
+    write_raw(out, static_cast<int32_t>(step));
+    write_raw(out, static_cast<int32_t>(epoch));
+    write_raw(out, static_cast<int32_t>(label));
+    write_raw(out, kind);
+}
+
+}  // namespace
+
+RunRecorder::RunRecorder(const std::string& filename, int keyframe_interval)
+    : out(filename, std::ios::binary), keyframe_interval(keyframe_interval),
+      frames_written(0), frames_since_keyframe(0) {
+    if (!out) {
+        return;
+    }
+    
+    out.write(RUN_MAGIC, 4);
+    write_raw(out, RUN_VERSION);
+    write_raw(out, RUN_HEADER_SIZE);
+    for (int i = 0; i < 6; ++i) {
+        write_raw(out, static_cast<uint32_t>(0));  // reserved
+    }
+}
+
+void RunRecorder::record(const Network& network, int step, int epoch, int label,
+                         FrameKind kind) {
+    if (!is_open()) {
+        return;
+    }
+    
+    bool need_keyframe = frames_written == 0 || topology_changed(network) ||
+        (keyframe_interval > 0 && frames_since_keyframe >= (size_t)keyframe_interval);
+    
+    if (need_keyframe) {
+        write_keyframe(network, step, epoch, label, kind);
+        frames_since_keyframe = 0;
+    } else {
+        write_delta(network, step, epoch, label, kind);
+    }
+    
+    frames_since_keyframe++;
+    frames_written++;
+}
+
+void RunRecorder::close() {
+    if (out.is_open()) {
+        out.flush();
+        out.close();
+    }
+}
+
+bool RunRecorder::topology_changed(const Network& network) const {
+    if (network.size() != last_row_sizes.size()) {
+        return true;
+    }
+    
+    size_t edge = 0;
+    for (size_t i = 0; i < network.size(); ++i) {
+        const auto& connections = network.get_neuron(i)->get_connections();
+        if (connections.size() != last_row_sizes[i]) {
+            return true;
+        }
+        for (const auto& conn : connections) {
+            if (conn.target != last_targets[edge++]) {
+                return true;
+            }
+        }
+    }
+    return false;
+}
+
+void RunRecorder::remember_topology(const Network& network) {
+    last_targets.clear();
+    last_weights.clear();
+    last_row_sizes.assign(network.size(), 0);
+    
+    for (size_t i = 0; i < network.size(); ++i) {
+        const auto& connections = network.get_neuron(i)->get_connections();
+        last_row_sizes[i] = connections.size();
+        for (const auto& conn : connections) {
+            last_targets.push_back(conn.target);
+            last_weights.push_back(static_cast<float>(conn.weight));
+        }
+    }
+}
+
+void RunRecorder::write_keyframe(const Network& network, int step, int epoch, int label,
+                                 FrameKind kind) {
+    std::ostringstream snapshot;
+    network.export_binary(snapshot, step);
+    const std::string payload = snapshot.str();
+    
+    write_record_header(out, static_cast<uint32_t>(payload.size()), RECORD_KEYFRAME,
+                        step, epoch, label, kind);
+    out.write(payload.data(), payload.size());
+    
+    remember_topology(network);
+}
+
+void RunRecorder::write_delta(const Network& network, int step, int epoch, int label,
+                              FrameKind kind) {
+    const size_t num_neurons = network.size();
+    std::vector<float> potential(num_neurons);
+    std::vector<int32_t> spike_count(num_neurons);
+    std::vector<uint32_t> spiked_ids;
+    std::vector<uint32_t> changed_edges;
+    std::vector<float> changed_weights;
+    
+    size_t edge = 0;
+    for (size_t i = 0; i < num_neurons; ++i) {
+        const Neuron* neuron = network.get_neuron(i);
+        potential[i] = static_cast<float>(neuron->get_potential());
+        spike_count[i] = neuron->get_spike_count();
+        if (neuron->spiked()) {
+            spiked_ids.push_back(static_cast<uint32_t>(i));
+        }
+        
+        for (const auto& conn : neuron->get_connections()) {
+            float weight = static_cast<float>(conn.weight);
+            if (weight != last_weights[edge]) {
+                changed_edges.push_back(static_cast<uint32_t>(edge));
+                changed_weights.push_back(weight);
+                last_weights[edge] = weight;
+            }
+            edge++;
+        }
+    }
+    
+    uint32_t payload_size = static_cast<uint32_t>(
+        4 * sizeof(uint32_t) +
+        num_neurons * (sizeof(float) + sizeof(int32_t)) +
+        spiked_ids.size() * sizeof(uint32_t) +
+        changed_edges.size() * (sizeof(uint32_t) + sizeof(float)));
+    
+    write_record_header(out, payload_size, RECORD_DELTA, step, epoch, label, kind);
+    write_raw(out, static_cast<uint32_t>(num_neurons));
+    write_raw(out, static_cast<uint32_t>(spiked_ids.size()));
+    write_raw(out, static_cast<uint32_t>(changed_edges.size()));
+    write_raw(out, static_cast<uint32_t>(0));  // reserved
+    write_array(out, potential);
+    write_array(out, spike_count);
+    write_array(out, spiked_ids);
+    write_array(out, changed_edges);
+    write_array(out, changed_weights);
+}
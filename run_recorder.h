@@ -0,0 +1,55 @@
+#ifndef RUN_RECORDER_H
+#define RUN_RECORDER_H
+
+#include "network.h"
+#include <fstream>
+#include <string>
+#include <vector>
+#include <cstdint>
+
+// Records a whole simulation run into a single delta-encoded container file
+// (see network_run.py for the layout). The first frame and every frame after
+// a topology change are written as full keyframes; all other frames only store
+// potentials, spike counts, the spiked set and the weights that changed.
+class RunRecorder {
+public:
+    // Frame kinds stored with every frame so viewers can filter a run
+    enum FrameKind {
+        FRAME_SIMULATION = 0,
+        FRAME_TRAINING = 1,
+        FRAME_TEST = 2,
+        FRAME_PROGRESS = 3
+    };
+    
+    // Open a container file; keyframe_interval > 0 forces a keyframe every N frames
+    explicit RunRecorder(const std::string& filename, int keyframe_interval = 0);
+    
+    // Check if the file was opened successfully
+    bool is_open() const { return out.is_open() && out.good(); }
+    
+    // Append the current network state as a frame
+    void record(const Network& network, int step, int epoch = -1, int label = -1,
+                FrameKind kind = FRAME_SIMULATION);
+    
+    // Number of frames written so far
+    size_t frame_count() const { return frames_written; }
+    
+    // Flush and close the file
+    void close();
+    
+private:
+    std::ofstream out;
+    int keyframe_interval;
+    size_t frames_written;
+    size_t frames_since_keyframe;
+    std::vector<const Neuron*> last_targets;  // Topology of the last keyframe
+    std::vector<size_t> last_row_sizes;
+    std::vector<float> last_weights;          // Weights as of the last frame
+    
+    bool topology_changed(const Network& network) const;
+    void write_keyframe(const Network& network, int step, int epoch, int label, FrameKind kind);
+    void write_delta(const Network& network, int step, int epoch, int label, FrameKind kind);
+    void remember_topology(const Network& network);
+};
+
+#endif // RUN_RECORDER_H
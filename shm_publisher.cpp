@@ -0,0 +1,186 @@
+#include "shm_publisher.h"
+#include <cstring>
+#include <fcntl.h>
+#include <unistd.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+
+namespace {
+
+// Segment layout constants (must match live_stream.py)
+const char SHM_MAGIC[4] = {'S', 'N', 'S', 'M'};
+const uint16_t SHM_VERSION = 1;
+const uint16_t SHM_HEADER_SIZE = 64;
+const uint32_t SHM_FLAG_WEIGHTS = 1;
+const size_t SHM_SEQUENCE_OFFSET = 48;  // u64 sequence of the last complete frame
+const size_t SLOT_HEADER_SIZE = 16;     // u64 sequence, i32 step, u32 reserved
+
+size_t align8(size_t offset) {
+    return (offset + 7) & ~static_cast<size_t>(7);
+}
+
+size_t align64(size_t offset) {
+    return (offset + 63) & ~static_cast<size_t>(63);
+}
+
+template <typename T>
+void put(unsigned char* dst, const T& value) {
+    std::memcpy(dst, &value, sizeof(T));
+}
+
+// Sequence numbers are read concurrently by the viewer; the release stores make
+// the slot contents visible before the sequence number that announces them
+void store_sequence(unsigned char* dst, uint64_t value) {
+    __atomic_store_n(reinterpret_cast<uint64_t*>(dst), value, __ATOMIC_RELEASE);
+}
+
+}  // namespace
+
+ShmPublisher::ShmPublisher(const std::string& segment, const Network& network, size_t num_slots,
+                           bool include_weights)
+    : name(segment.empty() || segment[0] != '/' ? "/" + segment : segment),
+      base(nullptr), total_size(0), num_neurons(network.size()), num_edges(0),
+      num_slots(num_slots < 2 ? 2 : num_slots), include_weights(include_weights),
+      slot_size(0), slots_offset(0), potential_offset(0), spike_count_offset(0),
+      spiked_offset(0), weights_offset(0), published(0), has_foreign_targets(false) {
+    neuron_index.reserve(num_neurons);
+    for (size_t i = 0; i < num_neurons; ++i) {
+        neuron_index[network.get_neuron(i)] = static_cast<uint32_t>(i);
+    }
+    // Connections to neurons outside the network are left out (as in export_binary)
+    for (size_t i = 0; i < num_neurons; ++i) {
+        for (const auto& conn : network.get_neuron(i)->get_connections()) {
+            if (neuron_index.count(conn.target)) {
+                num_edges++;
+            } else {
+                has_foreign_targets = true;
+            }
+        }
+    }
+    
+    // Topology region: indptr, indices, initial weights
+    size_t topology_offset = SHM_HEADER_SIZE;
+    size_t offset = topology_offset;
+    offset = align8(offset + sizeof(uint32_t) * (num_neurons + 1));
+    offset = align8(offset + sizeof(uint32_t) * num_edges);
+    offset = align8(offset + sizeof(float) * num_edges);
+    slots_offset = align64(offset);
+    
+    // Slot: header, potential, spike_count, spiked bitset, optional weights
+    potential_offset = SLOT_HEADER_SIZE;
+    spike_count_offset = align8(potential_offset + sizeof(float) * num_neurons);
+    spiked_offset = align8(spike_count_offset + sizeof(int32_t) * num_neurons);
+    weights_offset = align8(spiked_offset + (num_neurons + 7) / 8);
+    slot_size = align64(weights_offset + (include_weights ? sizeof(float) * num_edges : 0));
+    total_size = slots_offset + slot_size * this->num_slots;
+    
+    int fd = shm_open(name.c_str(), O_CREAT | O_RDWR, 0600);
+    if (fd < 0) {
+        return;
+    }
+    if (ftruncate(fd, static_cast<off_t>(total_size)) != 0) {
+        close(fd);
+        shm_unlink(name.c_str());
+        return;
+    }
+    void* mapped = mmap(nullptr, total_size, PROT_READ | PROT_WRITE, MAP_SHARED, fd, 0);
+    close(fd);
+    if (mapped == MAP_FAILED) {
+        shm_unlink(name.c_str());
+        return;
+    }
+    base = static_cast<unsigned char*>(mapped);
+    std::memset(base, 0, SHM_HEADER_SIZE);
+    
+    write_topology(network, topology_offset);
+    
+    // Header last: a reader seeing the magic finds a complete topology
+    put(base + 4, SHM_VERSION);
+    put(base + 6, SHM_HEADER_SIZE);
+    put(base + 8, static_cast<uint32_t>(num_neurons));
+    put(base + 12, static_cast<uint32_t>(num_edges));
+    put(base + 16, static_cast<uint32_t>(this->num_slots));
+    put(base + 20, include_weights ? SHM_FLAG_WEIGHTS : 0u);
+    put(base + 24, static_cast<uint64_t>(slot_size));
+    put(base + 32, static_cast<uint64_t>(topology_offset));
+    put(base + 40, static_cast<uint64_t>(slots_offset));
+    store_sequence(base + SHM_SEQUENCE_OFFSET, 0);
+    __atomic_thread_fence(__ATOMIC_RELEASE);
+    std::memcpy(base, SHM_MAGIC, 4);
+}
+
+ShmPublisher::~ShmPublisher() {
+    if (base != nullptr) {
+        munmap(base, total_size);
+        shm_unlink(name.c_str());
+        base = nullptr;
+    }
+}
+
+void ShmPublisher::write_topology(const Network& network, size_t topology_offset) {
+    unsigned char* indptr = base + topology_offset;
+    unsigned char* indices = base + align8(topology_offset + sizeof(uint32_t) * (num_neurons + 1));
+    unsigned char* weights = base + align8((indices - base) + sizeof(uint32_t) * num_edges);
+    
+    uint32_t edge = 0;
+    put(indptr, edge);
+    for (size_t i = 0; i < num_neurons; ++i) {
+        for (const auto& conn : network.get_neuron(i)->get_connections()) {
+            auto it = neuron_index.find(conn.target);
+            if (it == neuron_index.end()) {
+                continue;
+            }
+            put(indices + sizeof(uint32_t) * edge, it->second);
+            put(weights + sizeof(float) * edge, static_cast<float>(conn.weight));
+            edge++;
+        }
+        put(indptr + sizeof(uint32_t) * (i + 1), edge);
+    }
+}
+
+void ShmPublisher::publish(const Network& network, int step) {
+    if (!is_open()) {
+        return;
+    }
+    
+    uint64_t sequence = published + 1;
+    unsigned char* slot = base + slots_offset + slot_size * (sequence % num_slots);
+    
+    // Sequence 0 marks the slot as being written
+    store_sequence(slot, 0);
+    __atomic_thread_fence(__ATOMIC_RELEASE);
+    put(slot + 8, static_cast<int32_t>(step));
+    
+    float* potential = reinterpret_cast<float*>(slot + potential_offset);
+    int32_t* spike_count = reinterpret_cast<int32_t*>(slot + spike_count_offset);
+    unsigned char* spiked = slot + spiked_offset;
+    std::memset(spiked, 0, (num_neurons + 7) / 8);
+    for (size_t i = 0; i < num_neurons; ++i) {
+        const Neuron* neuron = network.get_neuron(i);
+        potential[i] = static_cast<float>(neuron->get_potential());
+        spike_count[i] = neuron->get_spike_count();
+        if (neuron->spiked()) {
+            spiked[i / 8] |= static_cast<unsigned char>(1u << (i % 8));
+        }
+    }
+    
+    if (include_weights) {
+        float* weights = reinterpret_cast<float*>(slot + weights_offset);
+        size_t edge = 0;
+        for (size_t i = 0; i < num_neurons && edge < num_edges; ++i) {
+            for (const auto& conn : network.get_neuron(i)->get_connections()) {
+                if (edge == num_edges) {
+                    break;
+                }
+                if (has_foreign_targets && !neuron_index.count(conn.target)) {
+                    continue;
+                }
+                weights[edge++] = static_cast<float>(conn.weight);
+            }
+        }
+    }
+    
+    store_sequence(slot, sequence);
+    store_sequence(base + SHM_SEQUENCE_OFFSET, sequence);
+    published = sequence;
+}
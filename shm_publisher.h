@@ -0,0 +1,60 @@
+#ifndef SHM_PUBLISHER_H
+#define SHM_PUBLISHER_H
+
+#include "network.h"
+#include <string>
+#include <vector>
+#include <unordered_map>
+#include <cstdint>
+#include <cstddef>
+
+// Publishes the live network state into a POSIX shared-memory ring buffer so
+// viewers can map it without any file I/O (see SharedStateReader in
+// live_stream.py for the layout). The topology and the initial weights are
+// written once; every publish() fills the next of num_slots slots with the
+// potentials, spike counts, spike bitset and optionally the weights, then
+// advances a sequence counter. The topology is captured at construction, so
+// connections must not be added afterwards.
+class ShmPublisher {
+public:
+    ShmPublisher(const std::string& name, const Network& network, size_t num_slots = 4,
+                 bool include_weights = false);
+    ~ShmPublisher();
+    
+    // Check if the shared-memory segment was created successfully
+    bool is_open() const { return base != nullptr; }
+    
+    // Copy the current network state into the next slot
+    void publish(const Network& network, int step);
+    
+    // Sequence number of the last published frame (0 = none yet)
+    uint64_t sequence() const { return published; }
+    
+    // Name of the segment (with leading '/')
+    const std::string& segment_name() const { return name; }
+    
+private:
+    std::string name;
+    unsigned char* base;
+    size_t total_size;
+    size_t num_neurons;
+    size_t num_edges;
+    size_t num_slots;
+    bool include_weights;
+    size_t slot_size;
+    size_t slots_offset;
+    size_t potential_offset;    // Section offsets within a slot
+    size_t spike_count_offset;
+    size_t spiked_offset;
+    size_t weights_offset;
+    uint64_t published;
+    std::unordered_map<const Neuron*, uint32_t> neuron_index;
+    bool has_foreign_targets;   // Some connections leave the network (not published)
+    
+    void write_topology(const Network& network, size_t topology_offset);
+    
+    ShmPublisher(const ShmPublisher&) = delete;
+    ShmPublisher& operator=(const ShmPublisher&) = delete;
+};
+
+#endif // SHM_PUBLISHER_H
@@ -1,4 +1,6 @@
 #include "network.h"
+#include "run_recorder.h"
+#include "frame_stream.h"
 #include <iostream>
 #include <fstream>
 #include <vector>
@@ -6,6 +8,8 @@
 #include <cmath>
 #include <algorithm>
 #include <iomanip>
+#include <chrono>
+#include <thread>
 
 // Number data loader (same as in train_numbers.cpp)
 class NumberDataLoader {
@@ -154,30 +158,61 @@ Network* recreate_network_from_json(const std::string& /* filename */) {
 }
 
 int main(int argc, char* argv[]) {
-    if (argc < 2) {
-        std::cerr << "Usage: " << argv[0] << " <trained_network.json> [digit] [num_steps]\n";
+    // Options may appear anywhere; everything else is positional
+    std::vector<std::string> args;
+    std::string stream_address;
+    int delay_ms = 0;
+    for (int i = 1; i < argc; ++i) {
+        std::string arg = argv[i];
+        if (arg == "--stream" && i + 1 < argc) {
+            stream_address = argv[++i];
+        } else if (arg == "--delay" && i + 1 < argc) {
+            delay_ms = std::stoi(argv[++i]);
+        } else {
+            args.push_back(arg);
+        }
+    }
+    
+    if (args.empty()) {
+        std::cerr << "Usage: " << argv[0] << " <trained_network.json> [digit] [num_steps] [format]"
+                  << " [--stream <address>] [--delay <ms>]\n";
         std::cerr << "  trained_network.json: Trained network file\n";
         std::cerr << "  digit: Digit to test (0-9, default: 0)\n";
         std::cerr << "  num_steps: Number of simulation steps (default: 30)\n";
+        std::cerr << "  format: run (single delta-encoded file, default), snn (binary snapshot per step)\n";
+        std::cerr << "          or json (JSON per step)\n";
+        std::cerr << "  --stream <address>: Also send every step to a live viewer, e.g.\n";
+        std::cerr << "          unix:/tmp/snn.sock or a named pipe (see live_stream.py)\n";
+        std::cerr << "  --delay <ms>: Pause between steps (useful with --stream)\n";
         return 1;
     }
     
-    std::string network_file = argv[1];
+    std::string network_file = args[0];
     int test_digit = 0;
     int num_steps = 30;
     
-    if (argc >= 3) {
-        test_digit = std::stoi(argv[2]);
+    if (args.size() >= 2) {
+        test_digit = std::stoi(args[1]);
         if (test_digit < 0 || test_digit > 9) {
             std::cerr << "Error: Digit must be between 0 and 9\n";
             return 1;
         }
     }
     
-    if (argc >= 4) {
-        num_steps = std::stoi(argv[3]);
+    if (args.size() >= 3) {
+        num_steps = std::stoi(args[2]);
     }
     
+    std::string format = "run";
+    if (args.size() >= 4) {
+        format = args[3];
+        if (format != "run" && format != "json" && format != "snn") {
+            std::cerr << "Error: Format must be run, json or snn\n";
+            return 1;
+        }
+    }
+    bool binary = (format == "snn");
+    
     std::cout << "=== Simulating Spike Network with Digit " << test_digit << " ===\n\n";
     
     // Create network (same architecture as training)
@@ -227,35 +262,78 @@ int main(int argc, char* argv[]) {
     
     // Run simulation and export at each step
     std::string base_filename = "data/json/spike_animation";
+    std::string run_file = base_filename + ".snnr";
+    std::unique_ptr<RunRecorder> recorder;
+    if (format == "run") {
+        recorder.reset(new RunRecorder(run_file));
+        if (!recorder->is_open()) {
+            std::cerr << "Error: Cannot open file " << run_file << " for writing\n";
+            return 1;
+        }
+    }
+    
+    std::unique_ptr<FrameStream> stream;
+    if (!stream_address.empty()) {
+        std::cout << "Connecting to live viewer at " << stream_address << "...\n";
+        stream.reset(new FrameStream(stream_address));
+        if (!stream->is_open()) {
+            std::cerr << "Error: Cannot connect to " << stream_address
+                      << " (start the viewer with --stream first)\n";
+            return 1;
+        }
+    }
     
     for (int step = 0; step < num_steps; ++step) {
         // Update network
         network.update();
         
-        // Export to JSON
-        std::string step_file = base_filename + "_step" + std::to_string(step) + ".json";
-        std::ofstream out(step_file);
-        if (!out) {
-            std::cerr << "Error: Cannot open file " << step_file << " for writing\n";
-            return 1;
+        if (stream && !stream->send(network, step)) {
+            std::cerr << "Live viewer disconnected, continuing without it\n";
+            stream.reset();
+        }
+        if (delay_ms > 0) {
+            std::this_thread::sleep_for(std::chrono::milliseconds(delay_ms));
         }
         
-        network.export_to_json(out);
-        out.close();
+        if (recorder) {
+            recorder->record(network, step, -1, test_digit);
+        } else {
+            // Export to JSON or binary snapshot
+            std::string step_file = base_filename + "_step" + std::to_string(step) + "." + format;
+            std::ofstream out(step_file, binary ? std::ios::binary : std::ios::out);
+            if (!out) {
+                std::cerr << "Error: Cannot open file " << step_file << " for writing\n";
+                return 1;
+            }
+            
+            if (binary) {
+                network.export_binary(out, step);
+            } else {
+                network.export_to_json(out);
+            }
+            out.close();
+        }
         
         if ((step + 1) % 5 == 0) {
             std::cout << "  Exported step " << step << "\n";
         }
     }
     
+    std::string first_file = base_filename + "_step0." + format;
     std::cout << "\nSimulation complete!\n";
-    std::cout << "Created " << num_steps << " time step files: " 
-              << base_filename << "_step0.json to " 
-              << base_filename << "_step" << (num_steps-1) << ".json\n\n";
+    if (recorder) {
+        recorder->close();
+        first_file = run_file;
+        std::cout << "Recorded " << num_steps << " time steps to " << run_file << "\n\n";
+    } else {
+        std::cout << "Created " << num_steps << " time step files: " 
+                  << first_file << " to " 
+                  << base_filename << "_step" << (num_steps-1) << "." << format << "\n\n";
+    }
     std::cout << "To visualize the animation:\n";
-    std::cout << "  python visualize_network.py " << base_filename << "_step0.json --time-series\n";
+    std::cout << "  python visualize_network.py " << first_file << " --time-series\n";
     std::cout << "Or for 3D animation:\n";
-    std::cout << "  python animate_3d_spiking.py " << base_filename << "_step0.json\n";
+    std::cout << "  python animate_3d_spiking.py " << first_file << "\n";
     
     return 0;
 }
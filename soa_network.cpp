@@ -0,0 +1,409 @@
+#include "soa_network.h"
+#include <algorithm>
+#include <cmath>
+#include <unordered_map>
+
+SoANetwork::SoANetwork(size_t num_neurons, double threshold, double resting, double decay)
+    : potential(num_neurons, resting), threshold(num_neurons, threshold),
+      resting_potential(num_neurons, resting), decay_factor(num_neurons, decay),
+      spiked_flag(num_neurons, 0), spike_count(num_neurons, 0),
+      last_spike_time(num_neurons, -1), input(num_neurons, 0.0), has_input(num_neurons, 0),
+      event_driven(false), steps_done(0), decayed_to(num_neurons, 0), default_decay(decay),
+      stdp_rule(Network::STDPRule::NearestSpike), pre_trace(num_neurons, 0.0),
+      post_trace(num_neurons, 0.0), offsets(num_neurons + 1, 0), in_offsets(num_neurons + 1, 0) {
+    // decay^k for the gaps between updates of a neuron seen in practice
+    decay_powers.resize(DECAY_TABLE_SIZE);
+    for (size_t k = 0; k < decay_powers.size(); ++k) {
+        decay_powers[k] = std::pow(decay, static_cast<double>(k));
+    }
+}
+
+SoANetwork SoANetwork::from_network(const Network& network) {
+    SoANetwork soa(network.size());
+    soa.stdp_rule = network.get_stdp_rule();
+    std::unordered_map<const Neuron*, uint32_t> neuron_to_index;
+    neuron_to_index.reserve(network.size());
+    for (size_t i = 0; i < network.size(); ++i) {
+        neuron_to_index[network.get_neuron(i)] = static_cast<uint32_t>(i);
+    }
+
+    for (size_t i = 0; i < network.size(); ++i) {
+        const Neuron* neuron = network.get_neuron(i);
+        soa.potential[i] = neuron->get_potential();
+        if (neuron->spiked()) {
+            soa.spiked_flag[i] = 1;
+            soa.spiked_list.push_back(static_cast<uint32_t>(i));
+        }
+        soa.spike_count[i] = neuron->get_spike_count();
+        soa.last_spike_time[i] = neuron->get_last_spike_time();
+        for (const auto& conn : neuron->get_connections()) {
+            auto it = neuron_to_index.find(conn.target);
+            if (it != neuron_to_index.end()) {
+                soa.pending.push_back({static_cast<uint32_t>(i), it->second, conn.weight});
+            }
+        }
+    }
+    soa.finalize();
+    return soa;
+}
+
+SoANetwork::NeuronRef SoANetwork::get_neuron(size_t index) {
+    return NeuronRef(index < size() ? this : nullptr, index);
+}
+
+void SoANetwork::connect(size_t from, size_t to, double weight) {
+    if (from < size() && to < size() && from != to) {
+        pending.push_back({static_cast<uint32_t>(from), static_cast<uint32_t>(to), weight});
+    }
+}
+
+void SoANetwork::connect_dense(size_t from_start, size_t from_count, size_t to_start, size_t to_count,
+                               const std::vector<double>& weights) {
+    // Written so that huge starts and counts cannot wrap around
+    if (from_start > size() || from_count > size() - from_start ||
+        to_start > size() || to_count > size() - to_start ||
+        (to_count > 0 && weights.size() / to_count < from_count)) {
+        return;
+    }
+    pending.reserve(pending.size() + from_count * to_count);
+    for (size_t i = 0; i < from_count; ++i) {
+        for (size_t j = 0; j < to_count; ++j) {
+            if (from_start + i != to_start + j) {
+                pending.push_back({static_cast<uint32_t>(from_start + i), static_cast<uint32_t>(to_start + j),
+                                   weights[i * to_count + j]});
+            }
+        }
+    }
+}
+
+void SoANetwork::finalize() {
+    if (pending.empty()) return;
+
+    // Existing synapses first so that later connect() calls win on duplicates
+    std::vector<PendingEdge> edges;
+    edges.reserve(targets.size() + pending.size());
+    for (size_t i = 0; i < size(); ++i) {
+        for (uint32_t e = offsets[i]; e < offsets[i + 1]; ++e) {
+            edges.push_back({static_cast<uint32_t>(i), targets[e], weights[e]});
+        }
+    }
+    edges.insert(edges.end(), pending.begin(), pending.end());
+    pending.clear();
+    pending.shrink_to_fit();
+
+    std::stable_sort(edges.begin(), edges.end(),
+        [](const PendingEdge& a, const PendingEdge& b) {
+            return a.from != b.from ? a.from < b.from : a.to < b.to;
+        });
+
+    targets.clear();
+    weights.clear();
+    std::fill(offsets.begin(), offsets.end(), 0);
+    for (size_t e = 0; e < edges.size(); ++e) {
+        // Keep only the last of a run of duplicates (same weight update semantics as Neuron)
+        if (e + 1 < edges.size() && edges[e + 1].from == edges[e].from && edges[e + 1].to == edges[e].to) {
+            continue;
+        }
+        targets.push_back(edges[e].to);
+        weights.push_back(edges[e].weight);
+        offsets[edges[e].from + 1]++;
+    }
+    for (size_t i = 0; i < size(); ++i) {
+        offsets[i + 1] += offsets[i];
+    }
+
+    // Incoming synapses per target, as synapse ids in ascending source order
+    in_offsets.assign(size() + 1, 0);
+    for (uint32_t target : targets) {
+        in_offsets[target + 1]++;
+    }
+    for (size_t i = 0; i < size(); ++i) {
+        in_offsets[i + 1] += in_offsets[i];
+    }
+    in_synapses.resize(targets.size());
+    in_sources.resize(targets.size());
+    std::vector<uint32_t> fill(in_offsets.begin(), in_offsets.end() - 1);
+    for (size_t i = 0; i < size(); ++i) {
+        for (uint32_t e = offsets[i]; e < offsets[i + 1]; ++e) {
+            uint32_t position = fill[targets[e]]++;
+            in_synapses[position] = e;
+            in_sources[position] = static_cast<uint32_t>(i);
+        }
+    }
+}
+
+size_t SoANetwork::row_size(size_t index) {
+    finalize();
+    return offsets[index + 1] - offsets[index];
+}
+
+size_t SoANetwork::edge_count() {
+    finalize();
+    return targets.size();
+}
+
+const std::vector<uint32_t>& SoANetwork::row_offsets() {
+    finalize();
+    return offsets;
+}
+
+const std::vector<uint32_t>& SoANetwork::target_indices() {
+    finalize();
+    return targets;
+}
+
+std::vector<double>& SoANetwork::synapse_weights() {
+    finalize();
+    return weights;
+}
+
+void SoANetwork::add_input(size_t index, double value) {
+    if (!event_driven) {
+        potential[index] += value;
+        return;
+    }
+    catch_up(index, steps_done);
+    double before = potential[index];
+    potential[index] = before + value;
+    if (potential[index] >= threshold[index] && before < threshold[index]) {
+        candidates.push_back(static_cast<uint32_t>(index));
+    }
+}
+
+double SoANetwork::current_potential(size_t index) {
+    if (event_driven) {
+        catch_up(index, steps_done);
+    }
+    return potential[index];
+}
+
+const std::vector<double>& SoANetwork::potentials() {
+    if (event_driven) {
+        for (size_t i = 0; i < size(); ++i) {
+            catch_up(i, steps_done);
+        }
+    }
+    return potential;
+}
+
+void SoANetwork::catch_up(size_t index, int64_t step) {
+    int64_t skipped = step - decayed_to[index];
+    if (skipped > 0) {
+        double factor;
+        if (decay_factor[index] == default_decay && skipped < static_cast<int64_t>(decay_powers.size())) {
+            factor = decay_powers[skipped];
+        } else {
+            factor = std::pow(decay_factor[index], static_cast<double>(skipped));
+        }
+        potential[index] = resting_potential[index] + (potential[index] - resting_potential[index]) * factor;
+        decayed_to[index] = step;
+    }
+}
+
+void SoANetwork::set_event_driven(bool enabled) {
+    if (enabled == event_driven) return;
+    potentials();  // Bring every potential up to date before switching
+    candidates.clear();
+    event_driven = enabled;
+    if (enabled) {
+        std::fill(decayed_to.begin(), decayed_to.end(), steps_done);
+        for (size_t i = 0; i < size(); ++i) {
+            if (potential[i] >= threshold[i]) {
+                candidates.push_back(static_cast<uint32_t>(i));
+            }
+        }
+    }
+}
+
+void SoANetwork::update() {
+    finalize();
+    for (uint32_t index : spiked_list) {
+        spiked_flag[index] = 0;
+    }
+    spiked_list.clear();
+    if (event_driven) {
+        update_events();
+    } else {
+        update_all();
+    }
+    steps_done++;
+}
+
+void SoANetwork::update_all() {
+    const size_t n = size();
+    double* v = potential.data();
+
+    // Same synchronous step as Network::update: spike or decay first, then
+    // deliver the spikes so that they arrive in the next step
+    for (size_t i = 0; i < n; ++i) {
+        if (v[i] >= threshold[i]) {
+            spiked_flag[i] = 1;
+            spiked_list.push_back(static_cast<uint32_t>(i));
+            spike_count[i]++;
+            v[i] = resting_potential[i];
+        } else {
+            v[i] = resting_potential[i] + (v[i] - resting_potential[i]) * decay_factor[i];
+        }
+    }
+    accumulate_spikes();
+    for (uint32_t index : received) {
+        if (input[index] != 0.0) {
+            v[index] += input[index];
+        }
+        input[index] = 0.0;
+        has_input[index] = 0;
+    }
+    received.clear();
+}
+
+void SoANetwork::accumulate_spikes() {
+    // Sources in ascending order, so every target sums its inputs in the same
+    // order as Network does
+    for (uint32_t i : spiked_list) {
+        for (uint32_t e = offsets[i]; e < offsets[i + 1]; ++e) {
+            uint32_t j = targets[e];
+            if (!has_input[j]) {
+                has_input[j] = 1;
+                received.push_back(j);
+            }
+            input[j] += weights[e];
+        }
+    }
+}
+
+void SoANetwork::update_events() {
+    const int64_t step = steps_done + 1;
+
+    // Only candidates (neurons that reached the threshold) can spike
+    std::sort(candidates.begin(), candidates.end());
+    for (uint32_t i : candidates) {
+        if (decayed_to[i] == step) continue;  // Queued twice
+        catch_up(i, step - 1);
+        decayed_to[i] = step;
+        if (potential[i] >= threshold[i]) {
+            spiked_flag[i] = 1;
+            spiked_list.push_back(i);
+            spike_count[i]++;
+            potential[i] = resting_potential[i];
+        } else {
+            // Pushed below the threshold again by negative input
+            potential[i] = resting_potential[i] + (potential[i] - resting_potential[i]) * decay_factor[i];
+        }
+    }
+    candidates.clear();
+
+    // Everything is below the threshold now, so the neurons that reach it
+    // with this step's input are the candidates of the next step
+    accumulate_spikes();
+    for (uint32_t j : received) {
+        catch_up(j, step);
+        if (input[j] != 0.0) {
+            potential[j] += input[j];
+        }
+        input[j] = 0.0;
+        has_input[j] = 0;
+        if (potential[j] >= threshold[j]) {
+            candidates.push_back(j);
+        }
+    }
+    received.clear();
+}
+
+void SoANetwork::update_with_learning(int time_step, double learning_rate) {
+    update();
+
+    for (uint32_t index : spiked_list) {
+        last_spike_time[index] = time_step;
+    }
+
+    if (stdp_rule == Network::STDPRule::Trace) {
+        update_traces(learning_rate);
+        return;
+    }
+    
+    // STDP on the synapses of the neurons that spiked in this step, same rule
+    // and order of updates as Network::update_with_learning
+    for (uint32_t pre : spiked_list) {
+        for (uint32_t e = offsets[pre]; e < offsets[pre + 1]; ++e) {
+            Neuron::apply_stdp(weights[e], time_step, last_spike_time[targets[e]], learning_rate);
+        }
+    }
+    for (uint32_t post : spiked_list) {
+        for (uint32_t k = in_offsets[post]; k < in_offsets[post + 1]; ++k) {
+            const uint32_t e = in_synapses[k];
+            const uint32_t pre = in_sources[k];
+            if (spiked_flag[pre]) continue;
+            Neuron::apply_stdp(weights[e], last_spike_time[pre], time_step, learning_rate);
+        }
+    }
+}
+
+void SoANetwork::update_traces(double learning_rate) {
+    const double pre_decay = Neuron::stdp_window(1, Neuron::STDP_TAU_PLUS);
+    const double post_decay = Neuron::stdp_window(1, Neuron::STDP_TAU_MINUS);
+    for (size_t i = 0; i < size(); ++i) {
+        pre_trace[i] *= pre_decay;
+        post_trace[i] *= post_decay;
+    }
+    
+    // Same passes as Network::update_traces
+    for (uint32_t pre : spiked_list) {
+        for (uint32_t e = offsets[pre]; e < offsets[pre + 1]; ++e) {
+            const uint32_t post = targets[e];
+            Neuron::apply_trace_stdp(weights[e], spiked_flag[post] ? pre_trace[pre] : 0.0,
+                                     post_trace[post], learning_rate);
+        }
+    }
+    for (uint32_t post : spiked_list) {
+        for (uint32_t k = in_offsets[post]; k < in_offsets[post + 1]; ++k) {
+            const uint32_t pre = in_sources[k];
+            if (spiked_flag[pre]) continue;
+            Neuron::apply_trace_stdp(weights[in_synapses[k]], pre_trace[pre], 0.0, learning_rate);
+        }
+    }
+    
+    for (uint32_t index : spiked_list) {
+        pre_trace[index] += 1.0;
+        post_trace[index] += 1.0;
+    }
+}
+
+void SoANetwork::set_stdp_rule(Network::STDPRule rule) {
+    stdp_rule = rule;
+    std::fill(pre_trace.begin(), pre_trace.end(), 0.0);
+    std::fill(post_trace.begin(), post_trace.end(), 0.0);
+}
+
+void SoANetwork::reset() {
+    potential = resting_potential;
+    std::fill(decayed_to.begin(), decayed_to.end(), steps_done);
+    candidates.clear();
+    spiked_list.clear();
+    std::fill(spiked_flag.begin(), spiked_flag.end(), 0);
+    std::fill(spike_count.begin(), spike_count.end(), 0);
+    std::fill(last_spike_time.begin(), last_spike_time.end(), -1);
+    std::fill(pre_trace.begin(), pre_trace.end(), 0.0);
+    std::fill(post_trace.begin(), post_trace.end(), 0.0);
+}
+
+void SoANetwork::copy_weights_to(Network& network) {
+    finalize();
+    std::unordered_map<const Neuron*, uint32_t> neuron_to_index;
+    neuron_to_index.reserve(network.size());
+    for (size_t i = 0; i < network.size(); ++i) {
+        neuron_to_index[network.get_neuron(i)] = static_cast<uint32_t>(i);
+    }
+
+    for (size_t i = 0; i < network.size() && i < size(); ++i) {
+        const uint32_t* row_begin = targets.data() + offsets[i];
+        const uint32_t* row_end = targets.data() + offsets[i + 1];
+        for (auto& conn : network.get_neuron(i)->get_connections_mutable()) {
+            auto it = neuron_to_index.find(conn.target);
+            if (it == neuron_to_index.end()) continue;
+            const uint32_t* found = std::lower_bound(row_begin, row_end, it->second);
+            if (found != row_end && *found == it->second) {
+                conn.weight = weights[found - targets.data()];
+            }
+        }
+    }
+}
@@ -0,0 +1,177 @@
+#ifndef SOA_NETWORK_H
+#define SOA_NETWORK_H
+
+#include "network.h"
+#include <vector>
+#include <cstdint>
+#include <cstddef>
+
+// Structure-of-arrays simulation engine with the same dynamics as Network.
+// Neuron state (potential, threshold, resting potential, decay, spike flag,
+// spike count, last spike time) lives in one contiguous array per field and
+// the synapses in CSR form (row offsets per source neuron, target indices,
+// weights), so a time step streams through memory instead of chasing Neuron
+// and Connection pointers. Code written against Network keeps working:
+// get_neuron(i)->apply_input(x) and get_neuron(i)->spiked() go through a
+// lightweight NeuronRef.
+//
+// In event-driven mode (set_event_driven(true)) a step only visits neurons
+// whose potential reached the threshold and the targets of those that spike.
+// Silent neurons are not decayed every step; their potential is brought up to
+// date with the closed form decay^dt whenever it is next read or receives
+// input. This assumes decay factors in [0, 1] and resting potentials below
+// the thresholds (true for the defaults), so a neuron without input can never
+// start spiking on its own.
+class SoANetwork {
+public:
+    // Handle to one neuron, mimicking the parts of Neuron the programs use
+    class NeuronRef {
+    public:
+        NeuronRef(SoANetwork* network, size_t index) : network(network), index(index) {}
+
+        // Allows network.get_neuron(i)->method() like with Neuron*
+        NeuronRef* operator->() { return this; }
+        const NeuronRef* operator->() const { return this; }
+
+        // False for an out-of-range index (where Network returns nullptr)
+        explicit operator bool() const { return network != nullptr; }
+
+        void apply_input(double current) { network->add_input(index, current); }
+        void receive_spike(double weight) { network->add_input(index, weight); }
+        bool spiked() const { return network->spiked_flag[index] != 0; }
+        double get_potential() const { return network->current_potential(index); }
+        int get_spike_count() const { return network->spike_count[index]; }
+        int get_last_spike_time() const { return network->last_spike_time[index]; }
+        size_t get_connection_count() const { return network->row_size(index); }
+
+    private:
+        SoANetwork* network;
+        size_t index;
+    };
+
+    // Constructor: creates a network with specified number of neurons
+    SoANetwork(size_t num_neurons, double threshold = 1.0, double resting = 0.0, double decay = 0.9);
+
+    // Copy the topology, weights and neuron state of an existing network
+    static SoANetwork from_network(const Network& network);
+
+    // Get neuron at index (evaluates to false if out of range)
+    NeuronRef get_neuron(size_t index);
+
+    // Connect two neurons (updates the weight if the connection exists)
+    void connect(size_t from, size_t to, double weight);
+    
+    // Connect two ranges of neurons from a row-major weight matrix (see Network::connect_dense)
+    void connect_dense(size_t from_start, size_t from_count, size_t to_start, size_t to_count,
+                       const std::vector<double>& weights);
+
+    // Update all neurons in the network (one time step)
+    void update();
+
+    // Update with learning (STDP)
+    void update_with_learning(int time_step, double learning_rate = 0.01);
+
+    // Select the learning rule of update_with_learning (clears the traces)
+    void set_stdp_rule(Network::STDPRule rule);
+    Network::STDPRule get_stdp_rule() const { return stdp_rule; }
+    
+    // Get number of neurons
+    size_t size() const { return potential.size(); }
+
+    // Get number of synapses
+    size_t edge_count();
+
+    // Reset all neurons
+    void reset();
+
+    // Switch between updating every neuron and event-driven updates
+    void set_event_driven(bool enabled);
+    bool is_event_driven() const { return event_driven; }
+
+    // Neurons that spiked in the last step
+    const std::vector<uint32_t>& spiked_neurons() const { return spiked_list; }
+
+    // Write the weights back into a Network with the same topology
+    void copy_weights_to(Network& network);
+
+    // Direct access to the state arrays (potentials are brought up to date first)
+    const std::vector<double>& potentials();
+    const std::vector<uint8_t>& spiked_flags() const { return spiked_flag; }
+    const std::vector<int>& spike_counts() const { return spike_count; }
+
+    // Direct access to the CSR synapse arrays
+    const std::vector<uint32_t>& row_offsets();
+    const std::vector<uint32_t>& target_indices();
+    std::vector<double>& synapse_weights();
+
+private:
+    // Neuron state
+    std::vector<double> potential;
+    std::vector<double> threshold;
+    std::vector<double> resting_potential;
+    std::vector<double> decay_factor;
+    std::vector<uint8_t> spiked_flag;
+    std::vector<int> spike_count;
+    std::vector<int> last_spike_time;
+    std::vector<uint32_t> spiked_list;  // Neurons with spiked_flag set
+
+    // Input delivered by the spikes of the current step
+    std::vector<double> input;
+    std::vector<uint8_t> has_input;
+    std::vector<uint32_t> received;     // Neurons with has_input set
+
+    // Event-driven state
+    bool event_driven;
+    int64_t steps_done;                 // Number of update() calls so far
+    std::vector<int64_t> decayed_to;    // Step up to which a potential includes the decay
+    std::vector<uint32_t> candidates;   // Neurons at or above threshold for the next step
+    double default_decay;               // Decay of all neurons created by the constructor
+    std::vector<double> decay_powers;   // default_decay^k for short gaps
+    static const size_t DECAY_TABLE_SIZE = 256;
+
+    // Trace-based STDP state (same rule as Network)
+    Network::STDPRule stdp_rule;
+    std::vector<double> pre_trace;
+    std::vector<double> post_trace;
+    
+    // Synapses in CSR form, targets sorted within each row
+    std::vector<uint32_t> offsets;
+    std::vector<uint32_t> targets;
+    std::vector<double> weights;
+    std::vector<uint32_t> in_offsets;   // Incoming synapses per target:
+    std::vector<uint32_t> in_synapses;  // synapse id and source neuron
+    std::vector<uint32_t> in_sources;
+
+    // Connections added since the last rebuild of the CSR arrays
+    struct PendingEdge {
+        uint32_t from;
+        uint32_t to;
+        double weight;
+    };
+    std::vector<PendingEdge> pending;
+
+    // Merge pending connections into the CSR arrays
+    void finalize();
+
+    size_t row_size(size_t index);
+
+    // Add input to a neuron (queues it for the next step if it reaches the threshold)
+    void add_input(size_t index, double value);
+
+    // Potential of a neuron after the last completed step
+    double current_potential(size_t index);
+
+    // Apply the decay of the steps a neuron was skipped for
+    void catch_up(size_t index, int64_t step);
+
+    // Sum the weights of the spiking neurons' synapses into input
+    void accumulate_spikes();
+
+    // Trace-based STDP on the synapses of this step's spiking neurons
+    void update_traces(double learning_rate);
+    
+    void update_all();
+    void update_events();
+};
+
+#endif // SOA_NETWORK_H
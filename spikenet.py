@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Python bindings for the C++ simulator
+
+Drives a network in-process through libspikenet.so (built with
+`make libspikenet.so` from spikenet_capi.cpp, soa_network.cpp, network.cpp
+and neuron.cpp) instead of spawning programs and reading JSON files:
+
+    import numpy as np
+    import spikenet
+
+    net = spikenet.Network(784 + 100)
+    net.connect_dense(0, 784, np.random.uniform(0.1, 0.5, (784, 100)))
+    net.apply_input(image.ravel() / 255.0 * 2.0)
+    spikes_per_step = net.run(30, learning_rate=0.01)
+    net.potentials, net.spiked, net.weights   # NumPy views, no copies
+
+The state and weight properties are views of the simulator's own arrays
+(SoANetwork, same dynamics as Network). They reflect every later step (also
+in event-driven mode, where run() brings the potentials up to date); call
+.copy() to keep a value. Every view keeps its network alive, and close()
+raises while views of it still exist. connect_* rebuilds the synapse arrays,
+so it raises while views of weights / indptr / indices exist; take new ones
+afterwards. The library path can be set with the SPIKENET_LIB environment
+variable.
+"""
+
+import ctypes
+import os
+import weakref
+
+import numpy as np
+
+
+LIBRARY_NAME = 'libspikenet.so'
+STDP_RULES = ('nearest', 'trace')
+
+_c_double_p = ctypes.POINTER(ctypes.c_double)
+_c_uint32_p = ctypes.POINTER(ctypes.c_uint32)
+_c_int32_p = ctypes.POINTER(ctypes.c_int32)
+_c_uint8_p = ctypes.POINTER(ctypes.c_uint8)
+
+# name: (restype, argtypes)
+_SIGNATURES = {
+    'snn_create': (ctypes.c_void_p, [ctypes.c_size_t]),
+    'snn_load': (ctypes.c_void_p, [ctypes.c_char_p]),
+    'snn_save': (ctypes.c_int, [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int]),
+    'snn_destroy': (None, [ctypes.c_void_p]),
+    'snn_size': (ctypes.c_size_t, [ctypes.c_void_p]),
+    'snn_edge_count': (ctypes.c_size_t, [ctypes.c_void_p]),
+    'snn_connect_dense': (ctypes.c_int, [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_size_t,
+                                         ctypes.c_size_t, ctypes.c_size_t, _c_double_p]),
+    'snn_connect_sparse': (ctypes.c_int, [ctypes.c_void_p, _c_uint32_p, _c_uint32_p,
+                                          _c_double_p, ctypes.c_size_t]),
+    'snn_apply_input': (ctypes.c_int, [ctypes.c_void_p, ctypes.c_size_t, _c_double_p,
+                                       ctypes.c_size_t]),
+    'snn_run': (ctypes.c_int, [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                               ctypes.c_double, _c_int32_p]),
+    'snn_reset': (None, [ctypes.c_void_p]),
+    'snn_set_stdp_rule': (ctypes.c_int, [ctypes.c_void_p, ctypes.c_int]),
+    'snn_get_stdp_rule': (ctypes.c_int, [ctypes.c_void_p]),
+    'snn_set_event_driven': (None, [ctypes.c_void_p, ctypes.c_int]),
+    'snn_is_event_driven': (ctypes.c_int, [ctypes.c_void_p]),
+    'snn_potentials': (_c_double_p, [ctypes.c_void_p]),
+    'snn_spiked': (_c_uint8_p, [ctypes.c_void_p]),
+    'snn_spike_counts': (_c_int32_p, [ctypes.c_void_p]),
+    'snn_row_offsets': (_c_uint32_p, [ctypes.c_void_p]),
+    'snn_targets': (_c_uint32_p, [ctypes.c_void_p]),
+    'snn_weights': (_c_double_p, [ctypes.c_void_p]),
+}
+
+_lib = None
+
+
+def load_library(path=None):
+    """
+    Load libspikenet.so (once)
+
+    Args:
+        path: Library path (default: $SPIKENET_LIB, else next to this module)
+    """
+    global _lib
+    if _lib is None:
+        path = path or os.environ.get('SPIKENET_LIB') or \
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), LIBRARY_NAME)
+        if not os.path.exists(path):
+            raise OSError(f"{path} not found; build it with 'make {LIBRARY_NAME}'")
+        lib = ctypes.CDLL(path)
+        for name, (restype, argtypes) in _SIGNATURES.items():
+            function = getattr(lib, name)
+            function.restype = restype
+            function.argtypes = argtypes
+        _lib = lib
+    return _lib
+
+
+class _ArrayMemory:
+    """
+    Memory of a C array exposed through the array interface; it is the base
+    of the NumPy views, so a view keeps its network (owner) alive
+    """
+
+    def __init__(self, owner, pointer, count, dtype, writeable):
+        self.owner = owner
+        self.__array_interface__ = {
+            'data': (ctypes.cast(pointer, ctypes.c_void_p).value, not writeable),
+            'shape': (count,),
+            'typestr': np.dtype(dtype).str,
+            'version': 3,
+        }
+
+
+def _as_pointer(array, ctype):
+    return array.ctypes.data_as(ctypes.POINTER(ctype))
+
+
+class Network:
+    """A spiking network simulated by the C++ engine"""
+
+    def __init__(self, num_neurons=None, _handle=None):
+        """
+        Args:
+            num_neurons: Number of neurons (default parameters, no connections)
+        """
+        self._lib = load_library()
+        self._handle = _handle if _handle is not None else self._lib.snn_create(int(num_neurons))
+        if not self._handle:
+            raise MemoryError("Could not create network")
+        self._views = weakref.WeakSet()          # Memory objects of the live views
+        self._synapse_views = weakref.WeakSet()  # ... of weights / indptr / indices
+        self.time_step = 0
+
+    @property
+    def handle(self):
+        """C handle of the network (ValueError once closed)"""
+        if not self._handle:
+            raise ValueError("Network is closed")
+        return self._handle
+
+    def _view(self, pointer, count, dtype, writeable=False, synapses=False):
+        """NumPy array over count elements at a C pointer (no copy)"""
+        if count == 0 or not pointer:
+            return np.zeros(0, dtype=dtype)
+        memory = _ArrayMemory(self, pointer, count, dtype, writeable)
+        self._views.add(memory)
+        if synapses:
+            self._synapse_views.add(memory)
+        return np.asarray(memory)
+
+    def _check_no_synapse_views(self):
+        if len(self._synapse_views):
+            raise RuntimeError(f"{len(self._synapse_views)} views of weights / indptr / indices "
+                               "still exist; delete them before connecting")
+
+    @classmethod
+    def load(cls, filename):
+        """Load a network saved as JSON (export_to_json) or as a binary snapshot (.snn)"""
+        lib = load_library()
+        handle = lib.snn_load(os.fsencode(filename))
+        if not handle:
+            raise ValueError(f"Could not load network from {filename}")
+        return cls(_handle=handle)
+
+    def save(self, filename):
+        """Save connections, weights and potentials (.snn: binary snapshot, else JSON)"""
+        binary = filename.endswith('.snn')
+        if self._lib.snn_save(self.handle, os.fsencode(filename), int(binary)) != 0:
+            raise OSError(f"Could not write {filename}")
+
+    def close(self):
+        """
+        Free the C++ network
+
+        Raises:
+            RuntimeError: If NumPy views of its arrays still exist (delete
+                them or keep copies first)
+        """
+        if self._handle:
+            if len(self._views):
+                raise RuntimeError(f"{len(self._views)} array views still reference this network")
+            self._lib.snn_destroy(self._handle)
+            self._handle = None
+
+    def __del__(self):
+        # Views reference the network, so none can be left at this point
+        if getattr(self, '_handle', None):
+            self._lib.snn_destroy(self.handle)
+            self._handle = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self._lib.snn_size(self.handle)
+
+    @property
+    def num_edges(self):
+        return self._lib.snn_edge_count(self.handle)
+
+    def connect_dense(self, from_start, to_start, weights):
+        """
+        Connect two neuron ranges from a weight matrix
+
+        Args:
+            from_start: First source neuron
+            to_start: First target neuron
+            weights: (from_count, to_count) matrix; weights[i, j] connects
+                from_start + i to to_start + j (self-connections are skipped)
+        """
+        weights = np.ascontiguousarray(weights, dtype=np.float64)
+        if weights.ndim != 2:
+            raise ValueError("weights must be a 2-D matrix")
+        if from_start < 0 or to_start < 0:
+            raise ValueError(f"Neuron ranges must start at 0 or above, got {from_start} -> {to_start}")
+        self._check_no_synapse_views()
+        from_count, to_count = weights.shape
+        if self._lib.snn_connect_dense(self.handle, from_start, from_count, to_start, to_count,
+                                       _as_pointer(weights, ctypes.c_double)) != 0:
+            raise ValueError(f"Ranges [{from_start}, {from_start + from_count}) -> "
+                             f"[{to_start}, {to_start + to_count}) exceed {len(self)} neurons")
+
+    def connect_sparse(self, sources, targets, weights):
+        """Connect the pairs sources[i] -> targets[i] (self-connections are skipped)"""
+        sources = np.asarray(sources).ravel()
+        targets = np.asarray(targets).ravel()
+        weights = np.ascontiguousarray(weights, dtype=np.float64).ravel()
+        if not len(sources) == len(targets) == len(weights):
+            raise ValueError("sources, targets and weights must have the same length")
+        invalid = int(np.count_nonzero((sources < 0) | (sources >= len(self)) |
+                                       (targets < 0) | (targets >= len(self))))
+        if invalid:
+            raise ValueError(f"{invalid} of {len(sources)} pairs refer to neurons outside 0..{len(self) - 1}")
+        self._check_no_synapse_views()
+        sources = np.ascontiguousarray(sources, dtype=np.uint32)
+        targets = np.ascontiguousarray(targets, dtype=np.uint32)
+        if self._lib.snn_connect_sparse(self.handle, _as_pointer(sources, ctypes.c_uint32),
+                                        _as_pointer(targets, ctypes.c_uint32),
+                                        _as_pointer(weights, ctypes.c_double), len(sources)) != 0:
+            raise ValueError("Could not connect neurons")
+
+    def connect(self, source, target, weight):
+        """Connect two neurons (updates the weight if the connection exists)"""
+        self.connect_sparse([source], [target], [weight])
+
+    def apply_input(self, currents, start=0):
+        """Add currents[i] to the potential of neuron start + i"""
+        currents = np.ascontiguousarray(currents, dtype=np.float64).ravel()
+        if start < 0:
+            raise ValueError(f"Inputs must start at neuron 0 or above, got {start}")
+        if self._lib.snn_apply_input(self.handle, start, _as_pointer(currents, ctypes.c_double),
+                                     len(currents)) != 0:
+            raise ValueError(f"{len(currents)} inputs from neuron {start} exceed {len(self)} neurons")
+
+    def run(self, steps, learning_rate=None):
+        """
+        Simulate steps time steps
+
+        Args:
+            steps: Number of updates
+            learning_rate: Apply STDP with this rate (update_with_learning);
+                None runs without learning
+
+        Returns:
+            Number of neurons that spiked in each step (int32 array)
+        """
+        totals = np.zeros(steps, dtype=np.int32)
+        learning = learning_rate is not None
+        self._lib.snn_run(self.handle, steps, int(learning), self.time_step,
+                          learning_rate if learning else 0.0, _as_pointer(totals, ctypes.c_int32))
+        self.time_step += steps
+        return totals
+
+    def reset(self):
+        """Reset potentials, spikes and traces; weights are kept"""
+        self._lib.snn_reset(self.handle)
+        self.time_step = 0
+
+    @property
+    def stdp_rule(self):
+        return STDP_RULES[self._lib.snn_get_stdp_rule(self.handle)]
+
+    @stdp_rule.setter
+    def stdp_rule(self, rule):
+        if rule not in STDP_RULES:
+            raise ValueError(f"stdp_rule must be one of {STDP_RULES}")
+        self._lib.snn_set_stdp_rule(self.handle, STDP_RULES.index(rule))
+
+    @property
+    def event_driven(self):
+        return bool(self._lib.snn_is_event_driven(self.handle))
+
+    @event_driven.setter
+    def event_driven(self, enabled):
+        self._lib.snn_set_event_driven(self.handle, int(bool(enabled)))
+
+    @property
+    def potentials(self):
+        """Membrane potentials (read-only view)"""
+        return self._view(self._lib.snn_potentials(self.handle), len(self), np.float64)
+
+    @property
+    def spiked(self):
+        """Whether each neuron spiked in the last step (read-only view)"""
+        return self._view(self._lib.snn_spiked(self.handle), len(self), np.bool_)
+
+    @property
+    def spike_counts(self):
+        """Spikes per neuron since the last reset (read-only view)"""
+        return self._view(self._lib.snn_spike_counts(self.handle), len(self), np.int32)
+
+    @property
+    def indptr(self):
+        """CSR row offsets of the outgoing synapses (read-only view)"""
+        return self._view(self._lib.snn_row_offsets(self.handle), len(self) + 1, np.uint32, synapses=True)
+
+    @property
+    def indices(self):
+        """Target neuron of every synapse, ascending within a row (read-only view)"""
+        return self._view(self._lib.snn_targets(self.handle), self.num_edges, np.uint32, synapses=True)
+
+    @property
+    def weights(self):
+        """Weight of every synapse in indptr / indices order (writable view)"""
+        return self._view(self._lib.snn_weights(self.handle), self.num_edges, np.float64, writeable=True, synapses=True)
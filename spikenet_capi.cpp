@@ -0,0 +1,185 @@
+#include "spikenet_capi.h"
+#include "soa_network.h"
+#include <fstream>
+#include <memory>
+#include <vector>
+#include <cstring>
+
+static_assert(sizeof(int) == sizeof(int32_t), "spike counts are exposed as int32");
+
+struct snn_network {
+    explicit snn_network(SoANetwork&& network) : soa(std::move(network)) {}
+    SoANetwork soa;
+};
+
+namespace {
+
+bool is_snapshot_file(const char* filename) {
+    std::ifstream file(filename, std::ios::binary);
+    char magic[4] = {0, 0, 0, 0};
+    file.read(magic, 4);
+    return file && std::memcmp(magic, "SNNS", 4) == 0;
+}
+
+// Network with the handle's topology, weights and potentials (for saving)
+std::unique_ptr<Network> to_network(SoANetwork& soa) {
+    const std::vector<uint32_t>& offsets = soa.row_offsets();
+    const std::vector<uint32_t>& targets = soa.target_indices();
+    const std::vector<double>& weights = soa.synapse_weights();
+    std::vector<Network::Synapse> synapses;
+    synapses.reserve(targets.size());
+    for (size_t i = 0; i < soa.size(); ++i) {
+        for (uint32_t k = offsets[i]; k < offsets[i + 1]; ++k) {
+            synapses.push_back({i, targets[k], weights[k]});
+        }
+    }
+    std::unique_ptr<Network> network(new Network(soa.size()));
+    network->connect_sparse(synapses);
+    const std::vector<double>& potentials = soa.potentials();
+    for (size_t i = 0; i < soa.size(); ++i) {
+        Neuron* neuron = network->get_neuron(i);
+        neuron->apply_input(potentials[i] - neuron->get_potential());
+    }
+    network->set_stdp_rule(soa.get_stdp_rule());
+    return network;
+}
+
+}  // namespace
+
+extern "C" {
+
+snn_network* snn_create(size_t num_neurons) {
+    return new snn_network(SoANetwork(num_neurons));
+}
+
+snn_network* snn_load(const char* filename) {
+    if (!filename) return nullptr;
+    std::unique_ptr<Network> network(is_snapshot_file(filename) ? Network::load_binary(filename)
+                                                                : Network::load_from_json(filename));
+    if (!network) return nullptr;
+    return new snn_network(SoANetwork::from_network(*network));
+}
+
+int snn_save(snn_network* network, const char* filename, int binary) {
+    if (!network || !filename) return -1;
+    std::ofstream out(filename, binary ? std::ios::binary : std::ios::out);
+    if (!out.is_open()) return -1;
+    std::unique_ptr<Network> copy = to_network(network->soa);
+    if (binary) {
+        copy->export_binary(out);
+    } else {
+        copy->export_to_json(out);
+    }
+    return out ? 0 : -1;
+}
+
+void snn_destroy(snn_network* network) {
+    delete network;
+}
+
+size_t snn_size(const snn_network* network) {
+    return network ? network->soa.size() : 0;
+}
+
+size_t snn_edge_count(snn_network* network) {
+    return network ? network->soa.edge_count() : 0;
+}
+
+int snn_connect_dense(snn_network* network, size_t from_start, size_t from_count,
+                      size_t to_start, size_t to_count, const double* weights) {
+    size_t size = network ? network->soa.size() : 0;
+    if (!network || !weights || from_start > size || from_count > size - from_start ||
+        to_start > size || to_count > size - to_start) {
+        return -1;
+    }
+    network->soa.connect_dense(from_start, from_count, to_start, to_count,
+                               std::vector<double>(weights, weights + from_count * to_count));
+    return 0;
+}
+
+int snn_connect_sparse(snn_network* network, const uint32_t* from, const uint32_t* to,
+                       const double* weights, size_t count) {
+    if (!network || (count > 0 && (!from || !to || !weights))) return -1;
+    for (size_t i = 0; i < count; ++i) {
+        network->soa.connect(from[i], to[i], weights[i]);
+    }
+    return 0;
+}
+
+int snn_apply_input(snn_network* network, size_t start, const double* currents, size_t count) {
+    if (!network || (count > 0 && !currents)) return -1;
+    size_t size = network->soa.size();
+    if (start > size || count > size - start) return -1;
+    for (size_t i = 0; i < count; ++i) {
+        network->soa.get_neuron(start + i)->apply_input(currents[i]);
+    }
+    return 0;
+}
+
+int snn_run(snn_network* network, int steps, int learning, int first_time_step,
+            double learning_rate, int32_t* spike_totals) {
+    if (!network || steps < 0) return -1;
+    for (int step = 0; step < steps; ++step) {
+        if (learning) {
+            network->soa.update_with_learning(first_time_step + step, learning_rate);
+        } else {
+            network->soa.update();
+        }
+        if (spike_totals) {
+            spike_totals[step] = static_cast<int32_t>(network->soa.spiked_neurons().size());
+        }
+    }
+    if (network->soa.is_event_driven()) {
+        // Decay the neurons the steps skipped, so potential views are current
+        network->soa.potentials();
+    }
+    return 0;
+}
+
+void snn_reset(snn_network* network) {
+    if (network) network->soa.reset();
+}
+
+int snn_set_stdp_rule(snn_network* network, int rule) {
+    if (!network || rule < 0 || rule > 1) return -1;
+    network->soa.set_stdp_rule(rule == 1 ? Network::STDPRule::Trace : Network::STDPRule::NearestSpike);
+    return 0;
+}
+
+int snn_get_stdp_rule(const snn_network* network) {
+    return network && network->soa.get_stdp_rule() == Network::STDPRule::Trace ? 1 : 0;
+}
+
+void snn_set_event_driven(snn_network* network, int enabled) {
+    if (network) network->soa.set_event_driven(enabled != 0);
+}
+
+int snn_is_event_driven(const snn_network* network) {
+    return network && network->soa.is_event_driven() ? 1 : 0;
+}
+
+const double* snn_potentials(snn_network* network) {
+    return network ? network->soa.potentials().data() : nullptr;
+}
+
+const uint8_t* snn_spiked(const snn_network* network) {
+    return network ? network->soa.spiked_flags().data() : nullptr;
+}
+
+const int32_t* snn_spike_counts(const snn_network* network) {
+    return network ? network->soa.spike_counts().data() : nullptr;
+}
+
+const uint32_t* snn_row_offsets(snn_network* network) {
+    return network ? network->soa.row_offsets().data() : nullptr;
+}
+
+const uint32_t* snn_targets(snn_network* network) {
+    return network ? network->soa.target_indices().data() : nullptr;
+}
+
+double* snn_weights(snn_network* network) {
+    return network ? network->soa.synapse_weights().data() : nullptr;
+}
+
+}  // extern "C"
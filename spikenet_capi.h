@@ -0,0 +1,80 @@
+#ifndef SPIKENET_CAPI_H
+#define SPIKENET_CAPI_H
+
+#include <stddef.h>
+#include <stdint.h>
+
+// C interface of the simulator for the Python bindings (spikenet.py loads it
+// from libspikenet.so with ctypes). A handle owns a SoANetwork, which has the
+// same dynamics as Network but keeps the neuron state and the CSR synapses in
+// contiguous arrays, so the array functions return pointers Python can wrap
+// without copying. Pointers stay valid until the next connect call on the
+// handle (the CSR arrays are rebuilt) or snn_destroy. Functions returning int
+// return 0 on success and -1 on invalid arguments.
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+
+typedef struct snn_network snn_network;
+
+// Create a network of num_neurons unconnected neurons with default parameters
+snn_network* snn_create(size_t num_neurons);
+
+// Load a network saved by Network::export_to_json or export_binary (NULL on error)
+snn_network* snn_load(const char* filename);
+
+// Save the network (connections, weights, potentials) as a binary snapshot
+// (binary != 0) or as export_to_json JSON
+int snn_save(snn_network* network, const char* filename, int binary);
+
+void snn_destroy(snn_network* network);
+
+size_t snn_size(const snn_network* network);
+size_t snn_edge_count(snn_network* network);
+
+// Connect [from_start, from_start + from_count) to [to_start, to_start + to_count)
+// from a row-major from_count x to_count weight matrix (Network::connect_dense)
+int snn_connect_dense(snn_network* network, size_t from_start, size_t from_count,
+                      size_t to_start, size_t to_count, const double* weights);
+
+// Connect count (from[i], to[i], weights[i]) pairs; invalid pairs and
+// self-connections are skipped, a later duplicate updates the weight
+int snn_connect_sparse(snn_network* network, const uint32_t* from, const uint32_t* to,
+                       const double* weights, size_t count);
+
+// Add currents[i] to the potential of neuron start + i
+int snn_apply_input(snn_network* network, size_t start, const double* currents, size_t count);
+
+// Run steps updates; with learning != 0 update_with_learning is called with
+// time steps first_time_step, first_time_step + 1, ... Spikes per step are
+// written to spike_totals (if not NULL, steps entries). In event-driven mode
+// all potentials are brought up to date afterwards.
+int snn_run(snn_network* network, int steps, int learning, int first_time_step,
+            double learning_rate, int32_t* spike_totals);
+
+void snn_reset(snn_network* network);
+
+// 0: nearest-spike STDP, 1: trace-based STDP
+int snn_set_stdp_rule(snn_network* network, int rule);
+int snn_get_stdp_rule(const snn_network* network);
+
+void snn_set_event_driven(snn_network* network, int enabled);
+int snn_is_event_driven(const snn_network* network);
+
+// State arrays (num_neurons entries; potentials are brought up to date first)
+const double* snn_potentials(snn_network* network);
+const uint8_t* snn_spiked(const snn_network* network);
+const int32_t* snn_spike_counts(const snn_network* network);
+
+// CSR synapse arrays: row offsets (num_neurons + 1), targets and weights
+// (edge count entries, targets ascending within a row). Weights are writable.
+const uint32_t* snn_row_offsets(snn_network* network);
+const uint32_t* snn_targets(snn_network* network);
+double* snn_weights(snn_network* network);
+
+#ifdef __cplusplus
+}
+#endif
+
+#endif // SPIKENET_CAPI_H
@@ -1,7 +1,15 @@
 #include "network.h"
+#include "soa_network.h"
 #include <iostream>
 #include <cassert>
 #include <cmath>
+#include <random>
+#include <fstream>
+#include <sstream>
+#include <cstdio>
+#ifdef _OPENMP
+#include <omp.h>
+#endif
 
 // Test helper function
 bool approximately_equal(double a, double b, double epsilon = 0.001) {
@@ -116,20 +124,21 @@ void test_network_propagation() {
     assert(network.get_neuron(0)->spiked());
     assert(network.get_neuron(0)->get_spike_count() == 1);
     
-    // Neuron 1 should have received spike and then decayed (0.5 * 0.9 = 0.45)
-    // Note: In the same update cycle, neuron 1 receives the spike then decays
-    assert(approximately_equal(network.get_neuron(1)->get_potential(), 0.45));
+    // Neuron 1 receives the spike at the end of the step, after the decay
+    // (updates are synchronous, so this does not depend on the neuron order)
+    assert(approximately_equal(network.get_neuron(1)->get_potential(), 0.5));
+    assert(!network.get_neuron(1)->spiked());
     
     // Neuron 2 should not have received spike yet (neuron 1 hasn't spiked)
     assert(approximately_equal(network.get_neuron(2)->get_potential(), 0.0));
     
     // Apply more input to neuron 1 to push it over threshold
-    network.get_neuron(1)->apply_input(0.6); // 0.45 + 0.6 = 1.05 > 1.0
+    network.get_neuron(1)->apply_input(0.6); // 0.5 + 0.6 = 1.1 > 1.0
     
     // Update again - neuron 1 should spike now
     network.update();
     assert(network.get_neuron(1)->spiked());
-    assert(approximately_equal(network.get_neuron(2)->get_potential(), 0.45)); // 0.5 * 0.9 after decay
+    assert(approximately_equal(network.get_neuron(2)->get_potential(), 0.5));
     
     std::cout << "  ✓ Passed\n\n";
 }
@@ -162,6 +171,491 @@ void test_sustained_input() {
     std::cout << "  ✓ Passed\n\n";
 }
 
+void test_soa_network_matches() {
+    std::cout << "Test 6: Structure-of-Arrays Engine Matches Network\n";
+    
+    // Small layered network with a backward and a duplicate connection
+    Network network(6);
+    SoANetwork soa(6);
+    const int edges[][2] = {{0, 2}, {0, 3}, {1, 2}, {1, 3}, {2, 4}, {3, 4}, {3, 5}, {4, 1}, {0, 2}};
+    double weight = 0.35;
+    for (const auto& edge : edges) {
+        network.connect(edge[0], edge[1], weight);
+        soa.connect(edge[0], edge[1], weight);
+        weight += 0.07;
+    }
+    assert(soa.edge_count() == 8);
+    assert(soa.get_neuron(0)->get_connection_count() == network.get_neuron(0)->get_connection_count());
+    assert(!soa.get_neuron(10));
+    
+    for (int step = 0; step < 20; ++step) {
+        network.get_neuron(0)->apply_input(0.6);
+        network.get_neuron(1)->apply_input(0.3);
+        soa.get_neuron(0)->apply_input(0.6);
+        soa.get_neuron(1)->apply_input(0.3);
+        network.update_with_learning(step, 0.05);
+        soa.update_with_learning(step, 0.05);
+        for (size_t i = 0; i < network.size(); ++i) {
+            assert(network.get_neuron(i)->spiked() == soa.get_neuron(i)->spiked());
+            assert(network.get_neuron(i)->get_potential() == soa.get_neuron(i)->get_potential());
+        }
+    }
+    
+    // Weights written back must equal the ones learned by Network
+    Network copy(6);
+    for (const auto& edge : edges) {
+        copy.connect(edge[0], edge[1], 0.0);
+    }
+    soa.copy_weights_to(copy);
+    for (size_t i = 0; i < network.size(); ++i) {
+        const auto& expected = network.get_neuron(i)->get_connections();
+        const auto& actual = copy.get_neuron(i)->get_connections();
+        for (size_t j = 0; j < expected.size(); ++j) {
+            assert(expected[j].weight == actual[j].weight);
+        }
+    }
+    
+    // Conversion keeps topology and state
+    SoANetwork converted = SoANetwork::from_network(network);
+    assert(converted.edge_count() == 8);
+    assert(converted.get_neuron(4)->get_spike_count() == network.get_neuron(4)->get_spike_count());
+    
+    std::cout << "  ✓ Passed\n\n";
+}
+
+void test_soa_event_driven() {
+    std::cout << "Test 7: Event-Driven Updates Match Dense Updates\n";
+    
+    // Two layers plus a recurrent edge, driven only by a few inputs
+    SoANetwork dense(12);
+    SoANetwork events(12);
+    events.set_event_driven(true);
+    for (int i = 0; i < 4; ++i) {
+        for (int j = 4; j < 10; ++j) {
+            dense.connect(i, j, 0.2 + 0.05 * ((i + j) % 4));
+            events.connect(i, j, 0.2 + 0.05 * ((i + j) % 4));
+        }
+    }
+    for (int j = 4; j < 10; ++j) {
+        dense.connect(j, 10 + j % 2, 0.3);
+        events.connect(j, 10 + j % 2, 0.3);
+    }
+    dense.connect(11, 2, 0.6);
+    events.connect(11, 2, 0.6);
+    
+    for (int step = 0; step < 40; ++step) {
+        if (step % 5 == 0) {
+            dense.get_neuron(step % 4)->apply_input(1.1);
+            events.get_neuron(step % 4)->apply_input(1.1);
+        }
+        dense.update_with_learning(step, 0.02);
+        events.update_with_learning(step, 0.02);
+        assert(dense.spiked_neurons() == events.spiked_neurons());
+    }
+    
+    // Silent neurons are decayed lazily, up to rounding of decay^dt
+    for (size_t i = 0; i < dense.size(); ++i) {
+        assert(approximately_equal(dense.get_neuron(i)->get_potential(),
+                                   events.get_neuron(i)->get_potential(), 1e-9));
+        assert(dense.get_neuron(i)->get_spike_count() == events.get_neuron(i)->get_spike_count());
+    }
+    
+    // Input after a reset must still be picked up
+    events.reset();
+    events.get_neuron(0)->apply_input(1.5);
+    events.update();
+    assert(events.get_neuron(0)->spiked());
+    assert(events.spiked_neurons().size() == 1);
+    
+    std::cout << "  ✓ Passed\n\n";
+}
+
+void test_network_synchronous_update() {
+    std::cout << "Test 8: Synchronous Update Independent of Order and Threads\n";
+    
+    // The same random network twice, the second one with reversed neuron order
+    const size_t n = 600;  // Large enough to be updated in parallel
+    Network network(n);
+    Network reversed(n);
+    std::mt19937 gen(3);
+    std::uniform_real_distribution<> weight_dist(0.05, 0.4);
+    std::uniform_int_distribution<size_t> neuron_dist(0, n - 1);
+    for (int e = 0; e < 6000; ++e) {
+        size_t from = neuron_dist(gen), to = neuron_dist(gen);
+        double weight = weight_dist(gen);
+        network.connect(from, to, weight);
+        reversed.connect(n - 1 - from, n - 1 - to, weight);
+    }
+    
+    std::vector<double> potentials;
+    for (int step = 0; step < 25; ++step) {
+        for (size_t i = 0; i < n; i += 7) {
+            network.get_neuron(i)->apply_input(0.4);
+            reversed.get_neuron(n - 1 - i)->apply_input(0.4);
+        }
+        network.update();
+        reversed.update();
+        for (size_t i = 0; i < n; ++i) {
+            assert(network.get_neuron(i)->spiked() == reversed.get_neuron(n - 1 - i)->spiked());
+            assert(approximately_equal(network.get_neuron(i)->get_potential(),
+                                       reversed.get_neuron(n - 1 - i)->get_potential(), 1e-9));
+        }
+    }
+    for (size_t i = 0; i < n; ++i) {
+        potentials.push_back(network.get_neuron(i)->get_potential());
+    }
+    
+#ifdef _OPENMP
+    // Replaying with one thread and with several gives bit-identical potentials
+    std::vector<std::vector<double>> runs;
+    for (int threads : {1, 4}) {
+        omp_set_num_threads(threads);
+        network.reset();
+        for (int step = 0; step < 25; ++step) {
+            for (size_t i = 0; i < n; i += 7) {
+                network.get_neuron(i)->apply_input(0.4);
+            }
+            network.update();
+        }
+        runs.emplace_back();
+        for (size_t i = 0; i < n; ++i) {
+            runs.back().push_back(network.get_neuron(i)->get_potential());
+        }
+    }
+    assert(runs[0] == runs[1]);
+    assert(runs[0] == potentials);
+#endif
+    
+    std::cout << "  ✓ Passed\n\n";
+}
+
+void test_stdp_spike_events() {
+    std::cout << "Test 9: STDP Applied Once per Spike Event\n";
+    
+    // 0 -> 1 -> 2, weight 1 is strong enough to make neuron 1 follow neuron 0
+    Network network(3);
+    network.connect(0, 1, 1.0);
+    network.connect(1, 2, 0.2);
+    network.connect(2, 0, 0.5);
+    
+    network.get_neuron(0)->apply_input(1.5);
+    network.update_with_learning(0, 0.1);  // Neuron 0 spikes
+    network.update_with_learning(1, 0.1);  // Neuron 1 spikes
+    assert(network.get_neuron(1)->spiked());
+    
+    // 0 -> 1: pre at 0, post at 1 -> potentiation (clamped at 1.0)
+    // 1 -> 2: neuron 2 never spiked -> unchanged
+    // 2 -> 0: pre never spiked -> unchanged
+    assert(approximately_equal(network.get_neuron(0)->get_connections()[0].weight, 1.0, 1e-12));
+    assert(approximately_equal(network.get_neuron(1)->get_connections()[0].weight, 0.2, 1e-12));
+    assert(approximately_equal(network.get_neuron(2)->get_connections()[0].weight, 0.5, 1e-12));
+    
+    // Neuron 2 spikes at step 2: 1 -> 2 potentiated once with dt = 2 - 1,
+    // 2 -> 0 depressed once with dt = 0 - 2
+    network.get_neuron(2)->apply_input(1.0);
+    network.update_with_learning(2, 0.1);
+    network.update_with_learning(3, 0.1);
+    assert(network.get_neuron(2)->get_last_spike_time() == 2);
+    double w12 = 0.2 + 0.1 * exp(-1.0 / 20.0);
+    double w20 = 0.5 - 0.1 * exp(-2.0 / 20.0);
+    assert(approximately_equal(network.get_neuron(1)->get_connections()[0].weight, w12, 1e-12));
+    assert(approximately_equal(network.get_neuron(2)->get_connections()[0].weight, w20, 1e-12));
+    
+    // Steps without spikes leave the weights alone
+    for (int step = 4; step < 10; ++step) {
+        network.update_with_learning(step, 0.1);
+    }
+    assert(approximately_equal(network.get_neuron(1)->get_connections()[0].weight, w12, 1e-12));
+    assert(approximately_equal(network.get_neuron(2)->get_connections()[0].weight, w20, 1e-12));
+    
+    // The lookup table matches exp()
+    for (int dt = 0; dt < 2000; dt += 37) {
+        assert(Neuron::stdp_window(dt, 20.0) == exp(-dt / 20.0));
+    }
+    
+    std::cout << "  ✓ Passed\n\n";
+}
+
+void test_trace_stdp() {
+    std::cout << "Test 10: Trace-Based STDP\n";
+    
+    Network network(2);
+    network.connect(0, 1, 0.3);
+    network.set_stdp_rule(Network::STDPRule::Trace);
+    assert(network.get_stdp_rule() == Network::STDPRule::Trace);
+    
+    // Neuron 0 spikes at steps 0 and 2, neuron 1 at step 3
+    network.get_neuron(0)->apply_input(1.5);
+    network.update_with_learning(0, 0.1);
+    network.update_with_learning(1, 0.1);
+    network.get_neuron(0)->apply_input(1.5);
+    network.update_with_learning(2, 0.1);
+    network.get_neuron(1)->apply_input(1.0);
+    network.update_with_learning(3, 0.1);
+    assert(network.get_neuron(1)->spiked());
+    
+    // Both earlier pre-synaptic spikes potentiate, not just the nearest one
+    double expected = 0.3 + 0.1 * (exp(-3.0 / 20.0) + exp(-1.0 / 20.0));
+    assert(approximately_equal(network.get_neuron(0)->get_connections()[0].weight, expected, 1e-12));
+    
+    // Neuron 0 spiking after neuron 1 depresses the synapse
+    network.get_neuron(0)->apply_input(1.5);
+    network.update_with_learning(4, 0.1);
+    expected -= 0.1 * exp(-1.0 / 20.0);
+    assert(approximately_equal(network.get_neuron(0)->get_connections()[0].weight, expected, 1e-12));
+    
+    // SoANetwork implements the same rule
+    Network layered(6);
+    SoANetwork soa(6);
+    const int edges[][2] = {{0, 2}, {0, 3}, {1, 2}, {1, 3}, {2, 4}, {3, 4}, {3, 5}, {4, 1}};
+    double weight = 0.35;
+    for (const auto& edge : edges) {
+        layered.connect(edge[0], edge[1], weight);
+        soa.connect(edge[0], edge[1], weight);
+        weight += 0.07;
+    }
+    layered.set_stdp_rule(Network::STDPRule::Trace);
+    soa.set_stdp_rule(Network::STDPRule::Trace);
+    for (int step = 0; step < 20; ++step) {
+        layered.get_neuron(0)->apply_input(0.6);
+        layered.get_neuron(1)->apply_input(0.3);
+        soa.get_neuron(0)->apply_input(0.6);
+        soa.get_neuron(1)->apply_input(0.3);
+        layered.update_with_learning(step, 0.05);
+        soa.update_with_learning(step, 0.05);
+    }
+    Network copy(6);
+    for (const auto& edge : edges) {
+        copy.connect(edge[0], edge[1], 0.0);
+    }
+    soa.copy_weights_to(copy);
+    for (size_t i = 0; i < layered.size(); ++i) {
+        const auto& expected_connections = layered.get_neuron(i)->get_connections();
+        const auto& actual = copy.get_neuron(i)->get_connections();
+        for (size_t j = 0; j < expected_connections.size(); ++j) {
+            assert(expected_connections[j].weight == actual[j].weight);
+        }
+    }
+    
+    std::cout << "  ✓ Passed\n\n";
+}
+
+void test_spike_history() {
+    std::cout << "Test 11: Spike History Ring Buffer\n";
+    
+    Neuron neuron(1.0, 0.0, 0.9);
+    for (int t = 0; t < 250; ++t) {
+        neuron.apply_input(2.0);
+        neuron.update();
+        neuron.set_time_step(t * 2);
+        if (t == 39) {
+            std::vector<int> history = neuron.get_spike_history();
+            assert(history.size() == 40);
+            assert(history.front() == 0 && history.back() == 78);
+        }
+    }
+    
+    // Only the last 100 spike times are kept, oldest first
+    std::vector<int> history = neuron.get_spike_history();
+    assert(history.size() == Neuron::SPIKE_HISTORY_CAPACITY);
+    for (size_t i = 0; i < history.size(); ++i) {
+        assert(history[i] == static_cast<int>(2 * (150 + i)));
+        assert(neuron.get_spike_history_at(i) == history[i]);
+    }
+    assert(neuron.get_last_spike_time() == 498);
+    
+    neuron.reset();
+    assert(neuron.get_spike_history().empty());
+    assert(neuron.get_spike_history_size() == 0);
+    
+    std::cout << "  ✓ Passed\n\n";
+}
+
+void test_bulk_connect() {
+    std::cout << "Test 12: Bulk Connection Building\n";
+    
+    // Dense: same connections and order as connect() in a double loop
+    Network dense(7);
+    Network reference(7);
+    std::vector<double> weights;
+    for (size_t i = 0; i < 3; ++i) {
+        for (size_t j = 0; j < 4; ++j) {
+            weights.push_back(0.1 * (i + 1) + 0.01 * j);
+            reference.connect(i, 2 + j, weights.back());
+        }
+    }
+    dense.connect_dense(0, 3, 2, 4, weights);  // Overlapping ranges: 2 -> 2 is skipped
+    for (size_t i = 0; i < 7; ++i) {
+        const auto& expected = reference.get_neuron(i)->get_connections();
+        const auto& actual = dense.get_neuron(i)->get_connections();
+        assert(expected.size() == actual.size());
+        for (size_t j = 0; j < expected.size(); ++j) {
+            assert(dense.index_of(actual[j].target) == reference.index_of(expected[j].target));
+            assert(actual[j].weight == expected[j].weight);
+        }
+    }
+    assert(dense.get_neuron(2)->get_connection_count() == 3);
+    
+    // Invalid ranges and short weight matrices connect nothing
+    dense.connect_dense(5, 3, 0, 2, std::vector<double>(6, 0.5));
+    dense.connect_dense(3, 2, 0, 2, std::vector<double>(3, 0.5));
+    assert(dense.get_neuron(5)->get_connection_count() == 0);
+    assert(dense.get_neuron(3)->get_connection_count() == 0);
+    
+    // Starts that would wrap around start + count are out of bounds too
+    const size_t huge = static_cast<size_t>(-1);
+    dense.connect_dense(huge, 1, 0, 2, std::vector<double>(2, 0.5));
+    dense.connect_dense(0, 1, huge - 1, 2, std::vector<double>(2, 0.5));
+    assert(dense.get_neuron(0)->get_connection_count() == 4);
+    SoANetwork soa(7);
+    soa.connect_dense(huge, 1, 0, 2, std::vector<double>(2, 0.5));
+    soa.connect_dense(0, 1, huge - 1, 2, std::vector<double>(2, 0.5));
+    soa.connect_dense(0, huge, 0, 2, std::vector<double>(2, 0.5));
+    assert(soa.edge_count() == 0);
+    
+    // Sparse: later duplicates and existing connections get their weight updated
+    Network sparse(4);
+    sparse.connect(0, 1, 0.9);
+    std::vector<Network::Synapse> synapses = {
+        {0, 2, 0.2}, {0, 1, 0.3}, {2, 3, 0.4}, {0, 2, 0.5}, {3, 3, 1.0}, {1, 9, 1.0}, {3, 0, 0.6}
+    };
+    sparse.connect_sparse(synapses);
+    const auto& row = sparse.get_neuron(0)->get_connections();
+    assert(row.size() == 2);
+    assert(row[0].target == sparse.get_neuron(1) && row[0].weight == 0.3);
+    assert(row[1].target == sparse.get_neuron(2) && row[1].weight == 0.5);
+    assert(sparse.get_neuron(1)->get_connection_count() == 0);
+    assert(sparse.get_neuron(2)->get_connections()[0].weight == 0.4);
+    assert(sparse.get_neuron(3)->get_connection_count() == 1);
+    
+    // The bulk-built network propagates spikes like one built with connect()
+    sparse.get_neuron(0)->apply_input(1.5);
+    sparse.update();
+    assert(approximately_equal(sparse.get_neuron(1)->get_potential(), 0.3));
+    assert(approximately_equal(sparse.get_neuron(2)->get_potential(), 0.5));
+    
+    std::cout << "  ✓ Passed\n\n";
+}
+
+void test_load_from_json() {
+    std::cout << "Test 13: Loading Networks from JSON\n";
+    const char* filename = "test_functionality_network.json";
+    
+    // Round trip through export_to_json (weights are written with 4 decimals)
+    Network network(5);
+    network.connect(0, 2, 0.25);
+    network.connect(0, 1, 0.5);
+    network.connect(3, 4, 0.125);
+    network.connect(4, 0, 0.0625);
+    {
+        std::ofstream out(filename);
+        network.export_to_json(out);
+    }
+    Network* loaded = Network::load_from_json(filename);
+    assert(loaded != nullptr);
+    assert(loaded->size() == 5);
+    for (size_t i = 0; i < network.size(); ++i) {
+        const auto& expected = network.get_neuron(i)->get_connections();
+        const auto& actual = loaded->get_neuron(i)->get_connections();
+        assert(expected.size() == actual.size());
+        for (size_t j = 0; j < expected.size(); ++j) {
+            assert(loaded->index_of(actual[j].target) == network.index_of(expected[j].target));
+            assert(approximately_equal(actual[j].weight, expected[j].weight, 1e-4));
+        }
+    }
+    delete loaded;
+    
+    // Any layout: one line, other key order, unknown keys, ids out of order
+    {
+        std::ofstream out(filename);
+        out << "{\"step\": 3, \"neurons\": [{\"connections\": [{\"weight\": -1.5e-1, \"target\": 0}],"
+               "\"id\": 2, \"label\": \"out\\\"put\"}, {\"id\": 0, \"spiked\": false, \"connections\": "
+               "[{\"target\": 2, \"weight\": 0.3}, {\"target\": 7, \"weight\": 1}]}, {\"id\": 1, "
+               "\"meta\": {\"tags\": [1, null, true]}, \"connections\": []}]}";
+    }
+    loaded = Network::load_from_json(filename);
+    assert(loaded != nullptr);
+    assert(loaded->size() == 3);
+    assert(loaded->get_neuron(0)->get_connection_count() == 1);  // Target 7 does not exist
+    assert(loaded->get_neuron(0)->get_connections()[0].weight == 0.3);
+    assert(loaded->get_neuron(2)->get_connections()[0].target == loaded->get_neuron(0));
+    assert(loaded->get_neuron(2)->get_connections()[0].weight == -0.15);
+    delete loaded;
+    
+    // Malformed files are rejected
+    {
+        std::ofstream out(filename);
+        out << "{\"neurons\": [{\"id\": 0, \"connections\": [{\"target\": 1, \"weight\": }]}]}";
+    }
+    assert(Network::load_from_json(filename) == nullptr);
+    assert(Network::load_from_json("does_not_exist.json") == nullptr);
+    std::remove(filename);
+    
+    std::cout << "  ✓ Passed\n\n";
+}
+
+void test_binary_round_trip() {
+    std::cout << "Test 14: Binary Export and Load\n";
+    
+    Network network(4);
+    network.connect(0, 1, 0.75);
+    network.connect(0, 3, 0.5);
+    network.connect(2, 0, 0.25);
+    network.get_neuron(2)->apply_input(0.375);
+    
+    std::ostringstream out(std::ios::binary);
+    network.export_binary(out, 7);
+    const std::string snapshot = out.str();
+    
+    std::istringstream in(snapshot, std::ios::binary);
+    Network* loaded = Network::load_binary(in);
+    assert(loaded != nullptr);
+    assert(loaded->size() == 4);
+    for (size_t i = 0; i < network.size(); ++i) {
+        const auto& expected = network.get_neuron(i)->get_connections();
+        const auto& actual = loaded->get_neuron(i)->get_connections();
+        assert(expected.size() == actual.size());
+        for (size_t j = 0; j < expected.size(); ++j) {
+            assert(loaded->index_of(actual[j].target) == network.index_of(expected[j].target));
+            assert(actual[j].weight == expected[j].weight);  // Exact in float32
+        }
+        assert(loaded->get_neuron(i)->get_potential() == network.get_neuron(i)->get_potential());
+    }
+    delete loaded;
+    
+    // A flipped bit fails the checksum, a short snapshot is rejected
+    std::string corrupted = snapshot;
+    corrupted[40] ^= 1;
+    std::istringstream corrupted_in(corrupted, std::ios::binary);
+    assert(Network::load_binary(corrupted_in) == nullptr);
+    std::istringstream truncated_in(snapshot.substr(0, snapshot.size() - 8), std::ios::binary);
+    assert(Network::load_binary(truncated_in) == nullptr);
+    
+    std::cout << "  ✓ Passed\n\n";
+}
+
+void test_rewired_connection() {
+    std::cout << "Test 15: Rewiring a Connection Updates the Cached Topology\n";
+    
+    Network network(3);
+    network.connect(0, 1, 0.7);
+    network.get_neuron(0)->apply_input(1.5);
+    network.update();  // Builds the cached topology
+    
+    // Same row size as before, different target
+    Neuron* source = network.get_neuron(0);
+    source->remove_connection(network.get_neuron(1));
+    source->add_connection(network.get_neuron(2), 0.7);
+    
+    network.reset();
+    source->apply_input(1.5);
+    network.update();
+    assert(network.get_neuron(1)->get_potential() == 0.0);
+    assert(std::abs(network.get_neuron(2)->get_potential() - 0.7) < 1e-9);
+    
+    std::cout << "  ✓ Passed\n\n";
+}
+
 int main() {
     std::cout << "=== Running Functionality Tests ===\n\n";
     
@@ -171,6 +665,16 @@ int main() {
         test_network_basic();
         test_network_propagation();
         test_sustained_input();
+        test_soa_network_matches();
+        test_soa_event_driven();
+        test_network_synchronous_update();
+        test_stdp_spike_events();
+        test_trace_stdp();
+        test_spike_history();
+        test_bulk_connect();
+        test_load_from_json();
+        test_binary_round_trip();
+        test_rewired_connection();
         
         std::cout << "=== All Tests Passed! ===\n";
         return 0;
@@ -67,56 +67,34 @@ Network* recreate_network(const NetworkArchitecture& arch) {
     std::mt19937 gen(rd());
     std::uniform_real_distribution<> weight_dist(0.1, 0.3);
     
-    // Connect input to first hidden layer
-    for (int i = 0; i < arch.input_size; ++i) {
-        for (int j = 0; j < arch.hidden_sizes[0]; ++j) {
-            network->connect(i, arch.input_size + j, weight_dist(gen));
-        }
-    }
-    
-    // Connect hidden layers
-    for (size_t layer = 0; layer < arch.hidden_sizes.size() - 1; ++layer) {
-        int current_layer_start = arch.input_size;
-        for (size_t i = 0; i < layer; ++i) {
-            current_layer_start += arch.hidden_sizes[i];
-        }
-        int current_layer_end = current_layer_start + arch.hidden_sizes[layer];
-        int next_layer_start = arch.input_size;
-        for (size_t i = 0; i <= layer; ++i) {
-            next_layer_start += arch.hidden_sizes[i];
-        }
-        
-        for (int i = current_layer_start; i < current_layer_end; ++i) {
-            for (int j = 0; j < arch.hidden_sizes[layer + 1]; ++j) {
-                network->connect(i, next_layer_start + j, weight_dist(gen));
-            }
-        }
-    }
-    
-    // Connect last hidden layer to output
-    int last_hidden_start = arch.input_size;
-    for (size_t i = 0; i < arch.hidden_sizes.size() - 1; ++i) {
-        last_hidden_start += arch.hidden_sizes[i];
-    }
-    int last_hidden_end = last_hidden_start + arch.hidden_sizes.back();
-    int output_start = arch.get_output_start();
-    
-    for (int i = last_hidden_start; i < last_hidden_end; ++i) {
-        for (int j = 0; j < arch.output_size; ++j) {
-            network->connect(i, output_start + j, weight_dist(gen));
+    // Fully connect consecutive layers: input -> hidden layers -> output
+    std::vector<int> layer_sizes;
+    layer_sizes.push_back(arch.input_size);
+    layer_sizes.insert(layer_sizes.end(), arch.hidden_sizes.begin(), arch.hidden_sizes.end());
+    layer_sizes.push_back(arch.output_size);
+    
+    int layer_start = 0;
+    std::vector<double> weights;
+    for (size_t layer = 0; layer + 1 < layer_sizes.size(); ++layer) {
+        int next_layer_start = layer_start + layer_sizes[layer];
+        weights.resize(static_cast<size_t>(layer_sizes[layer]) * layer_sizes[layer + 1]);
+        for (auto& weight : weights) {
+            weight = weight_dist(gen);
         }
+        network->connect_dense(layer_start, layer_sizes[layer], next_layer_start, layer_sizes[layer + 1], weights);
+        layer_start = next_layer_start;
     }
     
     return network;
 }
 
 int predict_digit(Network& network, const NetworkArchitecture& arch, 
-                  const std::vector<double>& image, int simulation_steps = 30) {
+                  const uint8_t* image, size_t pixels, int simulation_steps = 30) {
     network.reset();
     
-    // Apply input (rate coding)
-    for (size_t i = 0; i < image.size() && i < (size_t)arch.input_size; ++i) {
-        double input_current = image[i] * 2.0;
+    // Apply input (rate coding: pixel 0-255 -> input current 0-2)
+    for (size_t i = 0; i < pixels && i < (size_t)arch.input_size; ++i) {
+        double input_current = image[i] / 255.0 * 2.0;
         network.get_neuron(i)->apply_input(input_current);
     }
     
@@ -160,7 +138,7 @@ int main(int argc, char* argv[]) {
     std::string network_file = "data/json/mnist_trained_network.json";
     
     if (argc > 1) architecture_type = argv[1];  // simple, medium, complex
-    if (argc > 2) test_file = argv[2];          // MNIST test CSV file
+    if (argc > 2) test_file = argv[2];          // MNIST test file (CSV, IDX images, cache or .npy dataset directory)
     if (argc > 3) num_test_samples = std::stoi(argv[3]);
     if (argc > 4) simulation_steps = std::stoi(argv[4]);
     
@@ -186,12 +164,19 @@ int main(int argc, char* argv[]) {
     std::cout << "Loading network...\n";
     Network* network = nullptr;
     
-    // Try to load from JSON file first
+    // Prefer the binary snapshot train_mnist writes next to the JSON file
+    std::string binary_file = "data/json/mnist_trained_network.snn";
+    bool binary = std::ifstream(binary_file).good();
+    if (binary) {
+        network_file = binary_file;
+    }
+    
+    // Try to load from file first
     std::ifstream check_file(network_file);
     if (check_file.good()) {
         check_file.close();
         std::cout << "Loading trained network from: " << network_file << "\n";
-        network = Network::load_from_json(network_file);
+        network = binary ? Network::load_binary(network_file) : Network::load_from_json(network_file);
         if (network) {
             std::cout << "✅ Successfully loaded network with " << network->size() << " neurons\n\n";
             
@@ -203,7 +188,7 @@ int main(int argc, char* argv[]) {
                 std::cerr << "   Architecture may not match. Results may be incorrect.\n\n";
             }
         } else {
-            std::cerr << "⚠️  Failed to load from JSON. Creating new network with random weights.\n";
+            std::cerr << "⚠️  Failed to load " << network_file << ". Creating new network with random weights.\n";
             network = recreate_network(arch);
         }
     } else {
@@ -221,30 +206,28 @@ int main(int argc, char* argv[]) {
     
     // Load test data
     std::cout << "Loading test data...\n";
-    std::vector<MNISTLoader::Sample> test_data;
+    MNISTLoader::Dataset test_data;
     
     if (!test_file.empty()) {
-        std::cout << "Attempting to load from CSV: " << test_file << "\n";
-        test_data = MNISTLoader::load_from_csv(test_file);
+        std::cout << "Attempting to load from: " << test_file << "\n";
+        test_data = MNISTLoader::load_dataset(test_file);
+        test_data.truncate(num_test_samples);
         
         if (test_data.empty()) {
-            std::cout << "⚠️  Could not load CSV file. Falling back to synthetic MNIST-like data.\n";
+            std::cout << "⚠️  Could not load MNIST file. Falling back to synthetic MNIST-like data.\n";
             std::cout << "   To use real MNIST, download from:\n";
             std::cout << "   https://www.kaggle.com/datasets/oddrationale/mnist-in-csv\n";
             std::cout << "   And place mnist_test.csv in the project directory.\n\n";
-            test_data = MNISTLoader::generate_synthetic_mnist(num_test_samples / 10);  // Adjust for requested samples
+            test_data = MNISTLoader::generate_synthetic_dataset(num_test_samples / 10);  // Adjust for requested samples
         } else {
-            if (test_data.size() > (size_t)num_test_samples) {
-                test_data.resize(num_test_samples);
-            }
-            std::cout << "✅ Successfully loaded " << test_data.size() << " samples from CSV\n\n";
+            std::cout << "✅ Successfully loaded " << test_data.size() << " samples\n\n";
         }
     } else {
         std::cout << "Using synthetic MNIST-like data (for testing)\n";
         std::cout << "To test with real MNIST, download test CSV from:\n";
         std::cout << "  https://www.kaggle.com/datasets/oddrationale/mnist-in-csv\n";
         std::cout << "Then run: ./test_mnist medium mnist_test.csv " << num_test_samples << "\n\n";
-        test_data = MNISTLoader::generate_synthetic_mnist(num_test_samples / 10);  // Adjust for requested samples
+        test_data = MNISTLoader::generate_synthetic_dataset(num_test_samples / 10);  // Adjust for requested samples
     }
     
     if (test_data.empty()) {
@@ -270,9 +253,8 @@ int main(int argc, char* argv[]) {
     std::cout << "-------|--------|-----------|--------\n";
     
     for (size_t i = 0; i < test_data.size(); ++i) {
-        const auto& sample = test_data[i];
-        int actual = sample.label;
-        int predicted = predict_digit(*network, arch, sample.data, simulation_steps);
+        int actual = test_data.label(i);
+        int predicted = predict_digit(*network, arch, test_data.image(i), test_data.pixels(), simulation_steps);
         
         digit_total[actual]++;
         bool is_correct = (predicted == actual);
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Tests of the Python bindings (spikenet.py); builds libspikenet.so with make
+
+Run with: python3 -m pytest -q test_spikenet.py
+"""
+
+import ctypes
+import gc
+import os
+import shutil
+import subprocess
+
+import numpy as np
+import pytest
+
+import network_snapshot
+import spikenet
+
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture(scope='module', autouse=True)
+def library(tmp_path_factory):
+    if not shutil.which('make') or not shutil.which(os.environ.get('CXX', 'g++')):
+        pytest.skip('make and a C++ compiler are needed to build libspikenet.so')
+    path = str(tmp_path_factory.mktemp('lib') / spikenet.LIBRARY_NAME)
+    subprocess.run(['make', '-s', '-C', REPO_DIR, f'PY_LIB={path}', path], check=True)
+    spikenet._lib = None
+    return spikenet.load_library(path)
+
+
+def layered_network(seed=0):
+    rng = np.random.default_rng(seed)
+    net = spikenet.Network(20 + 8 + 4)
+    net.connect_dense(0, 20, rng.uniform(0.1, 0.4, (20, 8)))
+    net.connect_dense(20, 28, rng.uniform(0.2, 0.6, (8, 4)))
+    return net
+
+
+def test_connect_dense_builds_csr():
+    net = layered_network()
+    assert len(net) == 32
+    assert net.num_edges == 20 * 8 + 8 * 4
+    assert net.indptr[20] == 160 and net.indptr[-1] == 192
+    assert np.array_equal(net.indices[:8], np.arange(20, 28))
+
+    with pytest.raises(ValueError):
+        net.connect_dense(30, 0, np.ones((5, 2)))
+    for from_start, to_start in [(-1, 0), (-2, 0), (0, -1)]:
+        with pytest.raises(ValueError):
+            net.connect_dense(from_start, to_start, np.ones((1, 2)))
+    assert net.num_edges == 192
+
+
+def test_connect_dense_rejects_wrapping_ranges(library):
+    # Values that wrap around in start + count must not pass the C bounds check
+    net = spikenet.Network(4)
+    weights = np.ones((1, 2))
+    size_max = ctypes.c_size_t(-1).value
+    assert library.snn_connect_dense(net.handle, size_max, 1, 0, 2,
+                                     weights.ctypes.data_as(ctypes.POINTER(ctypes.c_double))) == -1
+    assert library.snn_connect_dense(net.handle, 0, 1, size_max - 1, 2,
+                                     weights.ctypes.data_as(ctypes.POINTER(ctypes.c_double))) == -1
+    assert net.num_edges == 0
+
+
+def test_connect_sparse_validates_ids():
+    net = spikenet.Network(10)
+    net.connect_sparse([0, 1, 3, 3], [1, 2, 3, 4], [0.5, 0.6, 1.0, 0.7])
+    assert net.num_edges == 3  # 3 -> 3 is skipped
+
+    with pytest.raises(ValueError, match='1 of 2 pairs'):
+        net.connect_sparse([0, 1], [5, 99999], [0.1, 0.2])
+    assert net.num_edges == 3
+
+
+def test_run_propagates_spikes():
+    net = spikenet.Network(3)
+    net.connect(0, 1, 1.2)
+    net.connect(1, 2, 1.2)
+    net.apply_input([1.5])
+    totals = net.run(3)
+    assert totals.tolist() == [1, 1, 1]
+    assert net.spike_counts.tolist() == [1, 1, 1]
+    assert net.time_step == 3
+
+    net.reset()
+    assert net.time_step == 0
+    assert not net.potentials.any()
+
+
+def test_apply_input_rejects_out_of_range_start(library):
+    net = spikenet.Network(4)
+    with pytest.raises(ValueError):
+        net.apply_input([1.0], start=-1)
+    with pytest.raises(ValueError):
+        net.apply_input([1.0, 1.0], start=3)
+    currents = np.ones(1)
+    assert library.snn_apply_input(net.handle, ctypes.c_size_t(-1).value,
+                                   currents.ctypes.data_as(ctypes.POINTER(ctypes.c_double)), 1) == -1
+    assert not net.potentials.any()
+
+
+def test_views_alias_simulator_arrays():
+    net = layered_network()
+    potentials = net.potentials
+    spiked = net.spiked
+    net.apply_input(np.full(20, 1.5))
+    assert np.all(potentials[:20] == 1.5)
+    net.run(1)
+    assert spiked[:20].all()
+    with pytest.raises(ValueError):
+        potentials[0] = 0.0
+
+    # Weights are writable and used by the next step
+    weights = net.weights
+    weights[:] = 0.0
+    net.reset()
+    net.apply_input(np.full(20, 1.5))
+    assert net.run(2).tolist() == [20, 0]
+
+
+def test_potentials_view_is_current_after_event_driven_run():
+    net = spikenet.Network(3)
+    net.event_driven = True
+    potentials = net.potentials
+    net.apply_input([0.5] * 3)
+    net.run(5)
+    # Read through the old view only; fetching net.potentials would catch up by itself
+    values = potentials.copy()
+
+    reference = spikenet.Network(3)
+    reference.apply_input([0.5] * 3)
+    reference.run(5)
+    assert values[0] < 0.5
+    assert np.allclose(values, reference.potentials)
+
+
+def test_views_keep_network_alive():
+    potentials = spikenet.Network(50000).potentials
+    gc.collect()
+    garbage = [np.ones(1000) for _ in range(100)]
+    assert len(potentials) == 50000 and not potentials.any()
+    del garbage
+
+    net = spikenet.Network(5)
+    view = net.spike_counts
+    with pytest.raises(RuntimeError):
+        net.close()
+    del view
+    net.close()
+    with pytest.raises(ValueError):
+        len(net)
+
+
+def test_connect_with_synapse_views_raises():
+    net = layered_network()
+    weights = net.weights
+    with pytest.raises(RuntimeError):
+        net.connect(0, 1, 0.5)
+    del weights
+    net.connect(0, 1, 0.5)
+    assert net.num_edges == 193
+
+
+@pytest.mark.parametrize('extension', ['.snn', '.json'])
+def test_save_load_round_trip(tmp_path, extension):
+    net = layered_network()
+    net.apply_input(np.linspace(0.0, 0.9, 20))
+    net.run(1, learning_rate=0.01)
+    filename = str(tmp_path / f'network{extension}')
+    net.save(filename)
+
+    loaded = spikenet.Network.load(filename)
+    assert len(loaded) == len(net)
+    assert np.array_equal(loaded.indptr, net.indptr)
+    assert np.array_equal(loaded.indices, net.indices)
+    assert np.allclose(loaded.weights, net.weights, atol=1e-4)
+    if extension == '.snn':
+        # Binary snapshots also keep the potentials (float32)
+        assert np.allclose(loaded.potentials, net.potentials, atol=1e-6)
+        snapshot = network_snapshot.read_snapshot(filename)
+        assert np.allclose(snapshot.weights, net.weights, atol=1e-6)
+
+    with pytest.raises(ValueError):
+        spikenet.Network.load(str(tmp_path / 'missing.json'))
@@ -1,4 +1,5 @@
 #include "network.h"
+#include "shm_publisher.h"
 #include "load_mnist.cpp"
 #include <iostream>
 #include <fstream>
@@ -7,8 +8,12 @@
 #include <random>
 #include <cmath>
 #include <algorithm>
+#include <numeric>
 #include <iomanip>
 #include <sstream>
+#include <csignal>
+#include <unistd.h>
+#include <sys/mman.h>
 
 // MNIST Training Program for Spike Neural Network
 // Recommended architectures:
@@ -66,54 +71,35 @@ NetworkArchitecture create_complex_architecture() {
 
 void build_network(Network& network, const NetworkArchitecture& arch, 
                    std::mt19937& gen, std::uniform_real_distribution<>& weight_dist) {
-    // Connect input to first hidden layer
-    for (int i = 0; i < arch.input_size; ++i) {
-        for (int j = 0; j < arch.hidden_sizes[0]; ++j) {
-            network.connect(i, arch.input_size + j, weight_dist(gen));
-        }
-    }
+    // Fully connect consecutive layers: input -> hidden layers -> output
+    std::vector<int> layer_sizes;
+    layer_sizes.push_back(arch.input_size);
+    layer_sizes.insert(layer_sizes.end(), arch.hidden_sizes.begin(), arch.hidden_sizes.end());
+    layer_sizes.push_back(arch.output_size);
     
-    // Connect hidden layers
-    for (size_t layer = 0; layer < arch.hidden_sizes.size() - 1; ++layer) {
-        // Calculate start and end indices for current layer
-        int current_layer_start = arch.input_size;
-        for (size_t i = 0; i < layer; ++i) {
-            current_layer_start += arch.hidden_sizes[i];
-        }
-        int current_layer_end = current_layer_start + arch.hidden_sizes[layer];
+    int layer_start = 0;
+    std::vector<double> weights;
+    for (size_t layer = 0; layer + 1 < layer_sizes.size(); ++layer) {
+        int next_layer_start = layer_start + layer_sizes[layer];
         
-        // Calculate start index for next layer
-        int next_layer_start = arch.input_size;
-        for (size_t i = 0; i <= layer; ++i) {
-            next_layer_start += arch.hidden_sizes[i];
-        }
-        
-        // Connect current layer to next layer
-        for (int i = current_layer_start; i < current_layer_end; ++i) {
-            for (int j = 0; j < arch.hidden_sizes[layer + 1]; ++j) {
-                network.connect(i, next_layer_start + j, weight_dist(gen));
-            }
-        }
-    }
-    
-    // Connect last hidden layer to output
-    int last_hidden_start = arch.input_size;
-    for (size_t i = 0; i < arch.hidden_sizes.size() - 1; ++i) {
-        last_hidden_start += arch.hidden_sizes[i];
-    }
-    int last_hidden_end = last_hidden_start + arch.hidden_sizes.back();
-    int output_start = arch.input_size;
-    for (int h : arch.hidden_sizes) {
-        output_start += h;
-    }
-    
-    for (int i = last_hidden_start; i < last_hidden_end; ++i) {
-        for (int j = 0; j < arch.output_size; ++j) {
-            network.connect(i, output_start + j, weight_dist(gen));
+        // Weight matrix of the layer pair, one row per neuron of the current layer
+        weights.resize(static_cast<size_t>(layer_sizes[layer]) * layer_sizes[layer + 1]);
+        for (auto& weight : weights) {
+            weight = weight_dist(gen);
         }
+        network.connect_dense(layer_start, layer_sizes[layer], next_layer_start, layer_sizes[layer + 1], weights);
+        layer_start = next_layer_start;
     }
 }
 
+// Shared-memory segment to remove when training is interrupted (Ctrl-C)
+static std::string live_segment;
+
+static void remove_live_segment(int sig) {
+    shm_unlink(live_segment.c_str());
+    _exit(128 + sig);
+}
+
 int main(int argc, char* argv[]) {
     std::cout << "=== MNIST Spike Neural Network Training ===\n\n";
     
@@ -121,12 +107,37 @@ int main(int argc, char* argv[]) {
     std::string architecture_type = "medium";  // simple, medium, complex
     double learning_rate = 0.01;
     int epochs = 5;
-    std::string mnist_file = "";  // CSV file path, empty = use synthetic
+    std::string mnist_file = "";  // CSV, IDX images, cache file or .npy dataset directory, empty = use synthetic
+    
+    // Options may appear anywhere; everything else is positional
+    std::vector<std::string> args;
+    std::string shm_name;        // Publish live state for viewers (live_stream.py)
+    bool shm_weights = false;    // Include the weights in every published frame
+    bool trace_stdp = false;     // Trace-based STDP instead of nearest-spike STDP
+    for (int i = 1; i < argc; ++i) {
+        std::string arg = argv[i];
+        if (arg == "--shm" && i + 1 < argc) {
+            shm_name = argv[++i];
+        } else if (arg == "--shm-weights") {
+            shm_weights = true;
+        } else if (arg == "--stdp") {
+            std::string rule = i + 1 < argc ? argv[++i] : "";
+            if (rule != "nearest" && rule != "trace") {
+                std::cerr << "Error: --stdp expects 'nearest' or 'trace', got '" << rule << "'\n";
+                std::cerr << "Usage: " << argv[0] << " [simple|medium|complex] [learning_rate] [epochs]"
+                          << " [mnist_file] [--stdp nearest|trace] [--shm name] [--shm-weights]\n";
+                return 1;
+            }
+            trace_stdp = rule == "trace";
+        } else {
+            args.push_back(arg);
+        }
+    }
     
-    if (argc > 1) architecture_type = argv[1];
-    if (argc > 2) learning_rate = std::stod(argv[2]);
-    if (argc > 3) epochs = std::stoi(argv[3]);
-    if (argc > 4) mnist_file = argv[4];
+    if (args.size() > 0) architecture_type = args[0];
+    if (args.size() > 1) learning_rate = std::stod(args[1]);
+    if (args.size() > 2) epochs = std::stoi(args[2]);
+    if (args.size() > 3) mnist_file = args[3];
     
     // Select architecture
     NetworkArchitecture arch;
@@ -156,6 +167,10 @@ int main(int argc, char* argv[]) {
     std::uniform_real_distribution<> weight_dist(0.05, 0.15);  // Smaller weights for larger network
     
     build_network(network, arch, gen, weight_dist);
+    if (trace_stdp) {
+        network.set_stdp_rule(Network::STDPRule::Trace);
+    }
+    std::cout << "STDP rule: " << (trace_stdp ? "trace" : "nearest spike") << "\n";
     
     // Calculate total connections
     int total_connections = 0;
@@ -167,30 +182,46 @@ int main(int argc, char* argv[]) {
     
     std::cout << "Total connections: " << total_connections << "\n\n";
     
-    // Load MNIST data
+    std::unique_ptr<ShmPublisher> publisher;
+    if (!shm_name.empty()) {
+        publisher.reset(new ShmPublisher(shm_name, network, 8, shm_weights));
+        if (!publisher->is_open()) {
+            std::cerr << "Error: Cannot create shared memory segment " << shm_name << "\n";
+            return 1;
+        }
+        live_segment = publisher->segment_name();
+        std::signal(SIGINT, remove_live_segment);
+        std::signal(SIGTERM, remove_live_segment);
+        std::cout << "Publishing live state to shared memory " << publisher->segment_name()
+                  << (shm_weights ? " (with weights)" : "") << "\n";
+        std::cout << "  View with: python animate_3d_spiking.py shm:" << shm_name
+                  << " --lod spiking\n\n";
+    }
+    
+    // Load MNIST data (uint8 pixels in one array, mapped from the cache when possible)
     std::cout << "Loading MNIST data...\n";
-    std::vector<MNISTLoader::Sample> training_data;
+    MNISTLoader::Dataset training_data;
     
     if (!mnist_file.empty()) {
-        std::cout << "Loading from CSV: " << mnist_file << "\n";
-        training_data = MNISTLoader::load_from_csv(mnist_file);
+        std::cout << "Loading from: " << mnist_file << "\n";
+        training_data = MNISTLoader::load_dataset(mnist_file);
         
         if (training_data.empty()) {
-            std::cout << "⚠️  Could not load CSV file. Falling back to synthetic MNIST-like data.\n";
+            std::cout << "⚠️  Could not load MNIST file. Falling back to synthetic MNIST-like data.\n";
             std::cout << "   To use real MNIST, download from:\n";
             std::cout << "   https://www.kaggle.com/datasets/oddrationale/mnist-in-csv\n";
             std::cout << "   And place mnist_train.csv in the project directory.\n";
             std::cout << "   Or run: ./download_mnist.sh\n\n";
-            training_data = MNISTLoader::generate_synthetic_mnist(100);
+            training_data = MNISTLoader::generate_synthetic_dataset(100);
         } else {
-            std::cout << "✅ Successfully loaded " << training_data.size() << " samples from CSV\n\n";
+            std::cout << "✅ Successfully loaded " << training_data.size() << " samples\n\n";
         }
     } else {
         std::cout << "Using synthetic MNIST-like data (for testing)\n";
         std::cout << "To use real MNIST, download from:\n";
         std::cout << "  https://www.kaggle.com/datasets/oddrationale/mnist-in-csv\n";
         std::cout << "Then run: ./train_mnist medium 0.01 10 mnist_train.csv\n\n";
-        training_data = MNISTLoader::generate_synthetic_mnist(100);
+        training_data = MNISTLoader::generate_synthetic_dataset(100);
     }
     
     if (training_data.empty()) {
@@ -204,9 +235,13 @@ int main(int argc, char* argv[]) {
     std::cout << "Starting training...\n";
     std::cout << "Epochs: " << epochs << ", Learning rate: " << learning_rate << "\n\n";
     
+    // Samples are visited through a shuffled index instead of moving the images
+    std::vector<size_t> order(training_data.size());
+    std::iota(order.begin(), order.end(), 0);
+    
     for (int epoch = 0; epoch < epochs; ++epoch) {
         std::cout << "=== Epoch " << (epoch + 1) << "/" << epochs << " ===\n";
-        std::shuffle(training_data.begin(), training_data.end(), gen);
+        std::shuffle(order.begin(), order.end(), gen);
         
         int correct = 0;
         double total_loss = 0.0;
@@ -216,14 +251,15 @@ int main(int argc, char* argv[]) {
         int batch_size = std::min(100, (int)training_data.size());
         
         for (size_t sample_idx = 0; sample_idx < training_data.size(); ++sample_idx) {
-            const auto& sample = training_data[sample_idx];
+            const uint8_t* image = training_data.image(order[sample_idx]);
+            const int label = training_data.label(order[sample_idx]);
             network.reset();
             
             // Apply input (rate coding: pixel intensity -> input current)
-            for (size_t i = 0; i < sample.data.size() && i < (size_t)arch.input_size; ++i) {
-                // Convert pixel value (0-1) to input current (0-2)
+            for (size_t i = 0; i < training_data.pixels() && i < (size_t)arch.input_size; ++i) {
+                // Convert pixel value (0-255) to input current (0-2)
                 // Higher pixel intensity = stronger input
-                double input_current = sample.data[i] * 2.0;
+                double input_current = image[i] / 255.0 * 2.0;
                 network.get_neuron(i)->apply_input(input_current);
             }
             
@@ -233,6 +269,9 @@ int main(int argc, char* argv[]) {
             
             for (int step = 0; step < simulation_steps; ++step) {
                 network.update_with_learning(step, learning_rate);
+                if (publisher) {
+                    publisher->publish(network, step);
+                }
                 
                 // Count spikes in output layer
                 int output_start = arch.input_size;
@@ -258,12 +297,12 @@ int main(int argc, char* argv[]) {
                 }
             }
             
-            if (predicted == sample.label) correct++;
+            if (predicted == label) correct++;
             
             // Calculate loss
             double loss = 0.0;
             for (int i = 0; i < arch.output_size; ++i) {
-                double target = (i == sample.label) ? 1.0 : 0.0;
+                double target = (i == label) ? 1.0 : 0.0;
                 double actual = (double)output_spikes[i] / simulation_steps;
                 loss += (target - actual) * (target - actual);
             }
@@ -298,6 +337,12 @@ int main(int argc, char* argv[]) {
         out_file.close();
         std::cout << "Network saved to data/json/mnist_trained_network.json\n";
     }
+    std::ofstream binary_file("data/json/mnist_trained_network.snn", std::ios::binary);
+    if (binary_file.is_open()) {
+        network.export_binary(binary_file);
+        binary_file.close();
+        std::cout << "Network saved to data/json/mnist_trained_network.snn\n";
+    }
     
     std::cout << "\n=== Training Complete ===\n";
     return 0;
@@ -1,4 +1,6 @@
 #include "network.h"
+#include "run_recorder.h"
+#include "frame_stream.h"
 #include <iostream>
 #include <fstream>
 #include <vector>
@@ -123,6 +125,30 @@ private:
     }
 };
 
+// Export network state to "<base_name>.<format>" (format: json or snn)
+bool export_frame(const Network& network, const std::string& base_name,
+                  const std::string& format, int step) {
+    bool binary = (format == "snn");
+    std::ofstream out(base_name + "." + format, binary ? std::ios::binary : std::ios::out);
+    if (!out) {
+        return false;
+    }
+    if (binary) {
+        network.export_binary(out, step);
+    } else {
+        network.export_to_json(out);
+    }
+    return true;
+}
+
+// Send a frame to the live viewer, dropping the stream once the viewer went away
+void stream_frame(std::unique_ptr<FrameStream>& stream, const Network& network, int step) {
+    if (stream && !stream->send(network, step)) {
+        std::cerr << "Live viewer disconnected, continuing without it\n";
+        stream.reset();
+    }
+}
+
 int main(int argc, char* argv[]) {
     std::cout << "=== Training with Animation - All Digits ===\n\n";
     
@@ -136,8 +162,51 @@ int main(int argc, char* argv[]) {
     int samples_per_digit = 10;
     int export_interval = 5;  // Export every N samples
     
-    if (argc > 1) epochs = std::stoi(argv[1]);
-    if (argc > 2) learning_rate = std::stod(argv[2]);
+    // --stream <address> may appear anywhere; everything else is positional
+    std::vector<std::string> args;
+    std::string stream_address;
+    for (int i = 1; i < argc; ++i) {
+        std::string arg = argv[i];
+        if (arg == "--stream" && i + 1 < argc) {
+            stream_address = argv[++i];
+        } else {
+            args.push_back(arg);
+        }
+    }
+    
+    if (args.size() > 0) epochs = std::stoi(args[0]);
+    if (args.size() > 1) learning_rate = std::stod(args[1]);
+    
+    // run: single delta-encoded file, snn: binary snapshot per frame, json: JSON per frame
+    std::string format = "run";
+    if (args.size() > 2) format = args[2];
+    if (format != "run" && format != "json" && format != "snn") {
+        std::cerr << "Error: Format must be run, json or snn\n";
+        return 1;
+    }
+    
+    std::string run_file = "data/json/training_run.snnr";
+    std::unique_ptr<RunRecorder> recorder;
+    if (format == "run") {
+        system("mkdir -p data/json");
+        recorder.reset(new RunRecorder(run_file));
+        if (!recorder->is_open()) {
+            std::cerr << "Error: Cannot open file " << run_file << " for writing\n";
+            return 1;
+        }
+    }
+    
+    // Live viewer (live_stream.py) receiving every simulation step
+    std::unique_ptr<FrameStream> stream;
+    if (!stream_address.empty()) {
+        std::cout << "Connecting to live viewer at " << stream_address << "...\n";
+        stream.reset(new FrameStream(stream_address));
+        if (!stream->is_open()) {
+            std::cerr << "Error: Cannot connect to " << stream_address
+                      << " (start the viewer with --stream first)\n";
+            return 1;
+        }
+    }
     
     Network network(total_neurons);
     
@@ -193,6 +262,7 @@ int main(int argc, char* argv[]) {
             // Run simulation and export at key steps
             for (int step = 0; step < simulation_steps; ++step) {
                 network.update_with_learning(step, learning_rate);
+                stream_frame(stream, network, step);
                 
                 for (int i = 0; i < output_size; ++i) {
                     int neuron_idx = input_size + hidden_size + i;
@@ -203,15 +273,18 @@ int main(int argc, char* argv[]) {
                 
                 // Export network state at certain steps during first few samples of each epoch
                 if (sample_idx < 3 && (step == 0 || step == 5 || step == 10 || step == simulation_steps - 1)) {
-                    system("mkdir -p data/json");
-                    std::string filename = "data/json/training_epoch" + std::to_string(epoch) + 
-                                         "_digit" + std::to_string(sample.label) + 
-                                         "_step" + std::to_string(step) + ".json";
-                    std::ofstream out(filename);
-                    if (out) {
-                        network.export_to_json(out);
-                        out.close();
+                    if (recorder) {
+                        recorder->record(network, step, epoch, sample.label,
+                                         RunRecorder::FRAME_TRAINING);
                         frame_count++;
+                    } else {
+                        system("mkdir -p data/json");
+                        std::string filename = "data/json/training_epoch" + std::to_string(epoch) + 
+                                             "_digit" + std::to_string(sample.label) + 
+                                             "_step" + std::to_string(step);
+                        if (export_frame(network, filename, format, step)) {
+                            frame_count++;
+                        }
                     }
                 }
             }
@@ -230,12 +303,13 @@ int main(int argc, char* argv[]) {
             
             // Export final state after each sample (for animation)
             if (total_samples % export_interval == 0) {
-                system("mkdir -p data/json");
-                std::string filename = "data/json/training_progress_sample" + std::to_string(total_samples) + ".json";
-                std::ofstream out(filename);
-                if (out) {
-                    network.export_to_json(out);
-                    out.close();
+                if (recorder) {
+                    recorder->record(network, total_samples, epoch, sample.label,
+                                     RunRecorder::FRAME_PROGRESS);
+                } else {
+                    system("mkdir -p data/json");
+                    std::string filename = "data/json/training_progress_sample" + std::to_string(total_samples);
+                    export_frame(network, filename, format, -1);
                 }
             }
         }
@@ -260,18 +334,21 @@ int main(int argc, char* argv[]) {
             int simulation_steps = 20;
             for (int step = 0; step < simulation_steps; ++step) {
                 network.update();
+                stream_frame(stream, network, step);
                 
                 // Export at key steps
                 if (step == 0 || step == 5 || step == 10 || step == 15 || step == simulation_steps - 1) {
-                    system("mkdir -p data/json");
-                    std::string filename = "data/json/training_epoch" + std::to_string(epoch) + 
-                                         "_test_digit" + std::to_string(digit) + 
-                                         "_step" + std::to_string(step) + ".json";
-                    std::ofstream out(filename);
-                    if (out) {
-                        network.export_to_json(out);
-                        out.close();
+                    if (recorder) {
+                        recorder->record(network, step, epoch, digit, RunRecorder::FRAME_TEST);
                         frame_count++;
+                    } else {
+                        system("mkdir -p data/json");
+                        std::string filename = "data/json/training_epoch" + std::to_string(epoch) + 
+                                             "_test_digit" + std::to_string(digit) + 
+                                             "_step" + std::to_string(step);
+                        if (export_frame(network, filename, format, step)) {
+                            frame_count++;
+                        }
                     }
                 }
             }
@@ -282,7 +359,12 @@ int main(int argc, char* argv[]) {
     std::cout << "Training complete!\n";
     std::cout << "Exported " << frame_count << " animation frames\n";
     std::cout << "\nTo view training animation:\n";
-    std::cout << "  python animate_training.py data/json/training_epoch0_test_digit0_step0.json\n";
+    if (recorder) {
+        recorder->close();
+        std::cout << "  python animate_training.py " << run_file << "\n";
+    } else {
+        std::cout << "  python animate_training.py data/json/training_epoch0_test_digit0_step0." << format << "\n";
+    }
     
     return 0;
 }
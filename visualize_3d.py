@@ -13,7 +13,6 @@ import numpy as np
 try:
     import matplotlib.pyplot as plt
     from mpl_toolkits.mplot3d import Axes3D
-    from mpl_toolkits.mplot3d.art3d import Line3DCollection
 except ImportError:
     print("ERROR: matplotlib not found.")
     print("Please install it using: pip install matplotlib")
@@ -26,6 +25,12 @@ except ImportError:
     print("Please install it using: pip install networkx")
     sys.exit(1)
 
+from network_snapshot import NetworkSnapshot, load_network_state
+from network_graph import CompactGraph, layered_layout
+from network_render import (edge_segments, node_style, draw_edges, draw_nodes,
+                            set_equal_aspect_3d)
+from edge_lod import EdgeLOD, add_lod_arguments, lod_options
+
 
 class Network3DVisualizer:
     def __init__(self, json_file=None, data=None):
@@ -50,35 +55,22 @@ class Network3DVisualizer:
             raise ValueError("Either json_file or data must be provided")
     
     def load_from_file(self, json_file):
-        """Load network data from JSON file"""
-        with open(json_file, 'r') as f:
-            self.current_data = json.load(f)
+        """Load network data from a JSON export or binary snapshot file"""
+        self.current_data = load_network_state(json_file)
         self._build_graph()
     
     def load_data(self, data):
         """Load network data directly"""
         if isinstance(data, str):
-            self.current_data = json.loads(data)
-        else:
-            self.current_data = data
+            data = json.loads(data)
+        if not isinstance(data, NetworkSnapshot):
+            data = NetworkSnapshot.from_dict(data)
+        self.current_data = data
         self._build_graph()
     
     def _build_graph(self):
-        """Build networkx graph from JSON data"""
-        self.G = nx.DiGraph()
-        
-        # Add nodes
-        for neuron in self.current_data['neurons']:
-            self.G.add_node(neuron['id'], 
-                          potential=neuron['potential'],
-                          spiked=neuron['spiked'],
-                          spike_count=neuron['spike_count'])
-        
-        # Add edges
-        for neuron in self.current_data['neurons']:
-            for conn in neuron['connections']:
-                self.G.add_edge(neuron['id'], conn['target'], 
-                              weight=conn['weight'])
+        """Build the compact graph from snapshot arrays"""
+        self.G = CompactGraph.from_snapshot(self.current_data)
     
     def _calculate_3d_layout(self, layout_type='spring'):
         """
@@ -87,86 +79,28 @@ class Network3DVisualizer:
         Args:
             layout_type: 'spring', 'circular', 'layered', or 'spherical'
         """
-        num_nodes = len(self.G.nodes())
+        num_nodes = self.G.num_nodes
         
         if layout_type == 'spring':
             # Use spring layout in 2D, then add z dimension based on layer
-            pos_2d = nx.spring_layout(self.G, k=2, iterations=50, seed=42)
-            self.pos_3d = {}
-            
-            # Try to detect layers (input, hidden, output)
-            # Simple heuristic: nodes with no incoming edges are input
-            # nodes with no outgoing edges are output
-            in_degree = dict(self.G.in_degree())
-            out_degree = dict(self.G.out_degree())
-            
-            for node_id in self.G.nodes():
-                x, y = pos_2d[node_id]
-                # Assign z based on degree (input=0, hidden=1, output=2)
-                if in_degree[node_id] == 0:
-                    z = 0  # Input layer
-                elif out_degree[node_id] == 0:
-                    z = 2  # Output layer
-                else:
-                    z = 1  # Hidden layer
-                
-                self.pos_3d[node_id] = np.array([x, y, z])
+            pos_2d = nx.spring_layout(self.G.to_networkx(), k=2, iterations=50, seed=42)
+            self.pos_3d = np.zeros((num_nodes, 3))
+            self.pos_3d[:, :2] = [pos_2d[node_id] for node_id in self.G.nodes()]
+            # Assign z based on degree (input=0, hidden=1, output=2)
+            self.pos_3d[:, 2] = self.G.layer_index()
         
         elif layout_type == 'circular':
             # Arrange in a circle in XY plane, stack layers in Z
             angles = np.linspace(0, 2*np.pi, num_nodes, endpoint=False)
             radius = 2.0
             
-            in_degree = dict(self.G.in_degree())
-            out_degree = dict(self.G.out_degree())
-            
-            self.pos_3d = {}
-            for i, node_id in enumerate(self.G.nodes()):
-                x = radius * np.cos(angles[i])
-                y = radius * np.sin(angles[i])
-                
-                if in_degree[node_id] == 0:
-                    z = 0
-                elif out_degree[node_id] == 0:
-                    z = 2
-                else:
-                    z = 1
-                
-                self.pos_3d[node_id] = np.array([x, y, z])
+            self.pos_3d = np.column_stack([radius * np.cos(angles),
+                                           radius * np.sin(angles),
+                                           self.G.layer_index()])
         
         elif layout_type == 'layered':
             # Explicit layered layout
-            in_degree = dict(self.G.in_degree())
-            out_degree = dict(self.G.out_degree())
-            
-            input_nodes = [n for n in self.G.nodes() if in_degree[n] == 0]
-            output_nodes = [n for n in self.G.nodes() if out_degree[n] == 0]
-            hidden_nodes = [n for n in self.G.nodes() 
-                          if n not in input_nodes and n not in output_nodes]
-            
-            self.pos_3d = {}
-            
-            # Input layer (z=0)
-            for i, node_id in enumerate(input_nodes):
-                x = -2.0 + (i % 7) * 0.6
-                y = -1.0 + (i // 7) * 0.6
-                self.pos_3d[node_id] = np.array([x, y, 0])
-            
-            # Hidden layer (z=1)
-            for i, node_id in enumerate(hidden_nodes):
-                angle = 2 * np.pi * i / len(hidden_nodes)
-                radius = 1.5
-                self.pos_3d[node_id] = np.array([
-                    radius * np.cos(angle),
-                    radius * np.sin(angle),
-                    1
-                ])
-            
-            # Output layer (z=2)
-            for i, node_id in enumerate(output_nodes):
-                x = -1.5 + i * 0.3
-                y = 2.0
-                self.pos_3d[node_id] = np.array([x, y, 2])
+            self.pos_3d = layered_layout(self.G)
         
         elif layout_type == 'spherical':
             # Arrange nodes on a sphere
@@ -174,18 +108,15 @@ class Network3DVisualizer:
             theta = np.linspace(0, 2*np.pi, num_nodes)
             radius = 2.0
             
-            self.pos_3d = {}
-            for i, node_id in enumerate(self.G.nodes()):
-                x = radius * np.sin(phi[i]) * np.cos(theta[i])
-                y = radius * np.sin(phi[i]) * np.sin(theta[i])
-                z = radius * np.cos(phi[i])
-                self.pos_3d[node_id] = np.array([x, y, z])
+            self.pos_3d = np.column_stack([radius * np.sin(phi) * np.cos(theta),
+                                           radius * np.sin(phi) * np.sin(theta),
+                                           radius * np.cos(phi)])
         
         else:
             raise ValueError(f"Unknown layout type: {layout_type}")
     
     def draw_3d_network(self, layout_type='layered', show_labels=True, 
-                       node_size_scale=100, edge_width_scale=2):
+                       node_size_scale=100, edge_width_scale=2, lod_options=None):
         """
         Draw the network in 3D
         
@@ -194,6 +125,7 @@ class Network3DVisualizer:
             show_labels: Whether to show neuron labels
             node_size_scale: Scale factor for node sizes
             edge_width_scale: Scale factor for edge widths
+            lod_options: EdgeLOD keyword arguments for large networks (None = all edges)
         """
         self.fig = plt.figure(figsize=(16, 12))
         self.ax = self.fig.add_subplot(111, projection='3d')
@@ -201,63 +133,30 @@ class Network3DVisualizer:
         # Calculate 3D positions
         self._calculate_3d_layout(layout_type)
         
-        # Prepare node data
-        node_colors = []
-        node_sizes = []
-        node_positions = []
-        
-        for node_id in self.G.nodes():
-            node_data = self.G.nodes[node_id]
-            potential = node_data['potential']
-            spiked = node_data['spiked']
-            spike_count = node_data['spike_count']
-            
-            pos = self.pos_3d[node_id]
-            node_positions.append(pos)
-            
-            # Color based on state
-            if spiked:
-                node_colors.append('#FF0000')  # Red for spiked
-                node_sizes.append(node_size_scale * 1.5)
-            else:
-                # Color intensity based on potential
-                intensity = min(1.0, max(0.0, potential))
-                # Use colormap: blue (low) to green (high)
-                node_colors.append(plt.cm.viridis(intensity))
-                node_sizes.append(node_size_scale * (0.5 + intensity))
-        
-        # Draw edges
-        edge_positions = []
-        edge_colors = []
-        edge_widths = []
+        # Draw edges in one collection, darker for stronger weights
+        segments = edge_segments(self.pos_3d, self.G.sources, self.G.targets)
+        weights = self.G.weights
+        lod = EdgeLOD(self.G, **(lod_options or {}))
+        lod.calibrate(segments, self.fig.get_size_inches(), self.fig.dpi)
+        edge_ids = lod.select(weights, self.G.spiked)
+        if edge_ids is not None:
+            print(f"LOD '{lod.mode}': drawing {len(edge_ids)} of {self.G.num_edges} edges")
+            segments, weights = segments[edge_ids], weights[edge_ids]
+            lod.draw_bundles(self.ax, self.pos_3d)
+        edge_colors = plt.cm.Greys(0.3 + weights * 0.5, alpha=0.4)
+        draw_edges(self.ax, segments, edge_colors, weights * edge_width_scale)
         
-        for u, v in self.G.edges():
-            pos_u = self.pos_3d[u]
-            pos_v = self.pos_3d[v]
-            weight = self.G[u][v]['weight']
-            
-            edge_positions.append([pos_u, pos_v])
-            edge_colors.append(plt.cm.Greys(0.3 + weight * 0.5))  # Darker for stronger weights
-            edge_widths.append(weight * edge_width_scale)
-        
-        # Draw edges as lines
-        for i, (edge_pos, color, width) in enumerate(zip(edge_positions, edge_colors, edge_widths)):
-            x = [edge_pos[0][0], edge_pos[1][0]]
-            y = [edge_pos[0][1], edge_pos[1][1]]
-            z = [edge_pos[0][2], edge_pos[1][2]]
-            self.ax.plot(x, y, z, color=color, alpha=0.4, linewidth=width)
+        # Draw nodes as a single scatter colored by state
+        node_colors, node_sizes = node_style(self.G.potential, self.G.spiked,
+                                             base_size=node_size_scale * 0.5,
+                                             size_range=node_size_scale,
+                                             spiked_size=node_size_scale * 1.5)
+        draw_nodes(self.ax, self.pos_3d, node_colors, node_sizes, alpha=0.8, linewidths=1)
         
-        # Draw nodes
-        for i, (pos, color, size) in enumerate(zip(node_positions, node_colors, node_sizes)):
-            self.ax.scatter(pos[0], pos[1], pos[2], 
-                          c=[color], s=size, alpha=0.8, 
-                          edgecolors='black', linewidths=1)
-            
-            # Add labels
-            if show_labels:
-                node_id = list(self.G.nodes())[i]
-                node_data = self.G.nodes[node_id]
-                label = f"{node_id}\n{node_data['potential']:.2f}"
+        # Add labels
+        if show_labels:
+            for node_id, pos in enumerate(self.pos_3d):
+                label = f"{node_id}\n{self.G.potential[node_id]:.2f}"
                 self.ax.text(pos[0], pos[1], pos[2], label, 
                            fontsize=6, ha='center', va='center')
         
@@ -281,19 +180,7 @@ class Network3DVisualizer:
         self.ax.legend(handles=legend_elements, loc='upper left')
         
         # Set equal aspect ratio
-        max_range = np.array([
-            max([p[0] for p in node_positions]) - min([p[0] for p in node_positions]),
-            max([p[1] for p in node_positions]) - min([p[1] for p in node_positions]),
-            max([p[2] for p in node_positions]) - min([p[2] for p in node_positions])
-        ]).max() / 2.0
-        
-        mid_x = (max([p[0] for p in node_positions]) + min([p[0] for p in node_positions])) * 0.5
-        mid_y = (max([p[1] for p in node_positions]) + min([p[1] for p in node_positions])) * 0.5
-        mid_z = (max([p[2] for p in node_positions]) + min([p[2] for p in node_positions])) * 0.5
-        
-        self.ax.set_xlim(mid_x - max_range, mid_x + max_range)
-        self.ax.set_ylim(mid_y - max_range, mid_y + max_range)
-        self.ax.set_zlim(mid_z - max_range, mid_z + max_range)
+        set_equal_aspect_3d(self.ax, self.pos_3d)
     
     def show(self):
         """Display the 3D visualization"""
@@ -308,7 +195,7 @@ class Network3DVisualizer:
 
 def main():
     parser = argparse.ArgumentParser(description='3D visualization of spike neural network')
-    parser.add_argument('json_file', nargs='?', help='JSON file with network data')
+    parser.add_argument('json_file', nargs='?', help='JSON or .snn snapshot file with network data')
     parser.add_argument('--layout', choices=['spring', 'circular', 'layered', 'spherical'],
                        default='layered', help='3D layout type (default: layered)')
     parser.add_argument('--no-labels', action='store_true',
@@ -319,6 +206,7 @@ def main():
                        help='Edge width scale (default: 2)')
     parser.add_argument('--save', type=str, default=None,
                        help='Save visualization to file instead of displaying')
+    add_lod_arguments(parser)
     
     args = parser.parse_args()
     
@@ -330,10 +218,12 @@ def main():
         print("  --node-size <num>   Node size scale")
         print("  --edge-width <num>  Edge width scale")
         print("  --save <file>       Save to file instead of displaying")
+        print("  --lod <mode>        Edge level of detail: all, topk, spiking, stratified")
         print("\nExamples:")
         print("  python visualize_3d.py network.json")
         print("  python visualize_3d.py network.json --layout spherical")
         print("  python visualize_3d.py network.json --save network_3d.png")
+        print("  python visualize_3d.py mnist_network.snn --lod topk --max-edges 5000")
         sys.exit(1)
     
     try:
@@ -342,7 +232,8 @@ def main():
             layout_type=args.layout,
             show_labels=not args.no_labels,
             node_size_scale=args.node_size,
-            edge_width_scale=args.edge_width
+            edge_width_scale=args.edge_width,
+            lod_options=lod_options(args)
         )
         
         if args.save:
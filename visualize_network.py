@@ -5,6 +5,7 @@ Shows neurons as nodes and connections as edges with real-time state updates
 """
 
 import json
+import os
 import sys
 import time
 import argparse
@@ -41,7 +42,11 @@ except ImportError:
     print("  3. Or activate venv and: pip install -r requirements.txt")
     sys.exit(1)
 
-from matplotlib.patches import FancyBboxPatch
+from network_snapshot import NetworkSnapshot, load_network_state
+from frame_store import open_frame_store
+from network_graph import CompactGraph
+from network_render import node_style
+from live_stream import open_live_stream
 
 class NetworkVisualizer:
     def __init__(self, json_file=None, data=None, update_interval=0.5):
@@ -62,7 +67,10 @@ class NetworkVisualizer:
         self.time_steps = []  # List of time step data
         self.current_step = 0
         self.previous_data = None  # For detecting active connections
-        self.connection_activity = {}  # Track connection usage over time
+        self.active_mask = None  # Edges active in the last drawn frame
+        self._artists = None  # Persistent artists of the last axis drawn into
+        self._animation = None  # Running FuncAnimation (its blit background is reset on redraws)
+        self.connection_activity = None  # Per-edge activation counts (aligned with self.G edges)
         
         if json_file:
             self.load_from_file(json_file)
@@ -72,171 +80,116 @@ class NetworkVisualizer:
             raise ValueError("Either json_file or data must be provided")
     
     def load_from_file(self, json_file):
-        """Load network data from JSON file"""
-        with open(json_file, 'r') as f:
-            self.current_data = json.load(f)
+        """Load network data from a JSON export or binary snapshot file"""
+        self.current_data = load_network_state(json_file)
         self._build_graph()
     
     def load_data(self, data):
         """Load network data directly"""
-        if isinstance(data, str):
-            self.current_data = json.loads(data)
-        else:
-            self.current_data = data
+        self.current_data = self._as_snapshot(data)
         self._build_graph()
     
+    @staticmethod
+    def _as_snapshot(data):
+        """Convert JSON text, a JSON dict or a NetworkSnapshot to a NetworkSnapshot"""
+        if isinstance(data, NetworkSnapshot):
+            return data
+        if isinstance(data, str):
+            data = json.loads(data)
+        return NetworkSnapshot.from_dict(data)
+    
     def _build_graph(self):
-        """Build networkx graph from JSON data"""
-        self.G = nx.DiGraph()
-        
-        # Add nodes
-        for neuron in self.current_data['neurons']:
-            self.G.add_node(neuron['id'], 
-                          potential=neuron['potential'],
-                          spiked=neuron['spiked'],
-                          spike_count=neuron['spike_count'])
-        
-        # Add edges
-        for neuron in self.current_data['neurons']:
-            for conn in neuron['connections']:
-                self.G.add_edge(neuron['id'], conn['target'], 
-                              weight=conn['weight'])
-        
-        # Calculate layout (circular for better visualization)
-        self.pos = nx.spring_layout(self.G, k=2, iterations=50, seed=42)
+        """Build the compact graph from snapshot arrays"""
+        self.G = CompactGraph.from_snapshot(self.current_data)
+        self.connection_activity = np.zeros(self.G.num_edges, dtype=np.int64)
+        
+        # Calculate layout (spring layout needs a networkx graph)
+        self.pos = nx.spring_layout(self.G.to_networkx(), k=2, iterations=50, seed=42)
         # Alternative: circular layout
-        # self.pos = nx.circular_layout(self.G)
+        # self.pos = nx.circular_layout(self.G.to_networkx())
     
     def update_data(self, data):
-        """Update network data and rebuild graph"""
-        if isinstance(data, str):
-            self.current_data = json.loads(data)
+        """
+        Update network data
+        
+        If the topology is unchanged only the node state and weight arrays are
+        refreshed and node positions stay where they are; the graph and layout
+        are rebuilt only when the edge set differs.
+        """
+        self.current_data = self._as_snapshot(data)
+        if self.G is not None and self.G.matches_topology(self.current_data):
+            self.G.update_state(self.current_data)
         else:
-            self.current_data = data
-        self._build_graph()
+            self._build_graph()
     
     def _detect_active_connections(self):
-        """Detect which connections are active (just transmitted a spike)"""
-        active_edges = set()
-        
-        if self.previous_data is None:
-            return active_edges
+        """
+        Detect which connections are active (just transmitted a spike)
         
-        # Create mapping of previous neuron states
-        prev_neurons = {n['id']: n for n in self.previous_data['neurons']}
-        curr_neurons = {n['id']: n for n in self.current_data['neurons']}
+        An edge is active if its source just spiked, or if its source spiked in
+        the previous step and the potential of its target rose noticeably.
         
-        # Find connections that transmitted spikes
-        for neuron in self.current_data['neurons']:
-            neuron_id = neuron['id']
-            prev_neuron = prev_neurons.get(neuron_id)
-            
-            if prev_neuron:
-                # Check if this neuron just spiked
-                if neuron['spiked'] and not prev_neuron['spiked']:
-                    # This neuron just spiked, mark all its outgoing connections as active
-                    for conn in neuron['connections']:
-                        active_edges.add((neuron_id, conn['target']))
-                
-                # Check if potential increased significantly (received spike)
-                potential_increase = neuron['potential'] - prev_neuron['potential']
-                if potential_increase > 0.01:  # Threshold for detecting received spike
-                    # Find which connection might have caused this
-                    for prev_neuron_data in self.previous_data['neurons']:
-                        if prev_neuron_data['spiked']:
-                            for conn in prev_neuron_data['connections']:
-                                if conn['target'] == neuron_id:
-                                    active_edges.add((prev_neuron_data['id'], neuron_id))
-        
-        return active_edges
+        Returns:
+            Boolean mask over the edges of self.G
+        """
+        graph = self.G
+        if self.previous_data is None:
+            return np.zeros(graph.num_edges, dtype=bool)
+        
+        prev = self.previous_data
+        curr = self.current_data
+        n = min(curr.num_neurons, prev.num_neurons)
+        
+        # Node masks over the current graph (neurons missing from prev stay False)
+        just_spiked = np.zeros(graph.num_nodes, dtype=bool)
+        just_spiked[:n] = curr.spiked[:n] & ~prev.spiked[:n]
+        prev_spiked = np.zeros(graph.num_nodes, dtype=bool)
+        prev_spiked[:n] = prev.spiked[:n]
+        # Potential increase above threshold = target received a spike
+        received = np.zeros(graph.num_nodes, dtype=bool)
+        received[:n] = (curr.potential[:n] - prev.potential[:n]) > 0.01
+        
+        sources = graph.sources
+        return just_spiked[sources] | (prev_spiked[sources] & received[graph.targets])
     
-    def draw_network(self, ax=None, step_info=None):
-        """Draw the network visualization with dynamic connection highlighting"""
-        if ax is None:
-            ax = self.ax
+    def _record_activity(self, active_mask):
+        """Add one activation to the counter of every active edge"""
+        self.connection_activity += active_mask
+    
+    def _create_artists(self, ax):
+        """
+        Create the persistent artists for the current graph
         
+        Every edge gets one arrow patch in the inactive style. These patches form
+        the static background of the animation; active edges are drawn as a small
+        overlay on top of them each frame.
+        """
         ax.clear()
-        
-        # Detect active connections (just used for spike propagation)
-        active_edges = self._detect_active_connections()
-        
-        # Color nodes based on state
-        node_colors = []
-        node_sizes = []
-        for node_id in self.G.nodes():
-            node_data = self.G.nodes[node_id]
-            potential = node_data['potential']
-            spiked = node_data['spiked']
-            
-            # Color: red if spiked, intensity based on potential
-            if spiked:
-                node_colors.append('#FF0000')  # Bright red for spiked
-                node_sizes.append(800)
-            else:
-                # Color intensity based on potential (0-1 range, mapped to blue-green)
-                intensity = min(1.0, max(0.0, potential))
-                node_colors.append(plt.cm.viridis(intensity))
-                node_sizes.append(300 + intensity * 200)
-        
-        # Draw inactive edges first (background)
-        inactive_edges = [(u, v) for u, v in self.G.edges() if (u, v) not in active_edges]
-        if inactive_edges:
-            edge_widths_inactive = [self.G[u][v]['weight'] * 2 for u, v in inactive_edges]
-            nx.draw_networkx_edges(self.G, self.pos, ax=ax,
-                                  edgelist=inactive_edges,
-                                  width=edge_widths_inactive,
-                                  edge_color='lightgray',
-                                  alpha=0.3,
-                                  arrows=True,
-                                  arrowsize=15,
-                                  arrowstyle='->',
-                                  connectionstyle='arc3,rad=0.1')
-        
-        # Draw active edges (highlighted, thicker, brighter)
-        if active_edges:
-            edge_widths_active = [self.G[u][v]['weight'] * 5 for u, v in active_edges]
-            nx.draw_networkx_edges(self.G, self.pos, ax=ax,
-                                  edgelist=list(active_edges),
-                                  width=edge_widths_active,
-                                  edge_color='#FF6600',  # Bright orange for active
-                                  alpha=0.9,
-                                  arrows=True,
-                                  arrowsize=25,
-                                  arrowstyle='->',
-                                  connectionstyle='arc3,rad=0.1',
-                                  style='dashed')  # Dashed to make active connections stand out
-        
-        # Draw nodes
-        nx.draw_networkx_nodes(self.G, self.pos, ax=ax,
-                              node_color=node_colors,
-                              node_size=node_sizes,
-                              alpha=0.8,
-                              edgecolors='black',
-                              linewidths=2)
-        
-        # Add labels with potential values
-        labels = {}
-        for node_id in self.G.nodes():
-            node_data = self.G.nodes[node_id]
-            potential = node_data['potential']
-            spike_count = node_data['spike_count']
-            labels[node_id] = f"{node_id}\n{potential:.2f}\n({spike_count})"
-        
-        nx.draw_networkx_labels(self.G, self.pos, labels, ax=ax,
-                                font_size=8, font_weight='bold')
-        
-        # Add edge labels (weights) - only for active edges to reduce clutter
-        if active_edges:
-            edge_labels = {(u, v): f"{self.G[u][v]['weight']:.2f}" 
-                          for u, v in active_edges}
-            nx.draw_networkx_edge_labels(self.G, self.pos, edge_labels, ax=ax,
-                                         font_size=7, alpha=0.9, font_color='red')
-        
-        # Title with step information
-        title = "Spike Neural Network - Dynamic Connection Visualization"
-        if step_info is not None:
-            title += f" (Step {step_info})"
-        ax.set_title(title, fontsize=14, fontweight='bold')
+        nx_graph = self.G.to_networkx(attributes=False)
+        edgelist = list(zip(self.G.sources.tolist(), self.G.targets.tolist()))
+        
+        # All edges start inactive (background style)
+        edges = nx.draw_networkx_edges(nx_graph, self.pos, ax=ax,
+                                       edgelist=edgelist,
+                                       width=self.G.weights * 2,
+                                       edge_color='lightgray',
+                                       alpha=0.3,
+                                       arrows=True,
+                                       arrowsize=15,
+                                       arrowstyle='->',
+                                       connectionstyle='arc3,rad=0.1')
+        nodes = nx.draw_networkx_nodes(nx_graph, self.pos, ax=ax,
+                                       node_size=300,
+                                       alpha=0.8,
+                                       edgecolors='black',
+                                       linewidths=2)
+        labels = nx.draw_networkx_labels(nx_graph, self.pos, ax=ax,
+                                         font_size=8, font_weight='bold')
+        
+        ax.set_title("Spike Neural Network - Dynamic Connection Visualization",
+                     fontsize=14, fontweight='bold')
+        caption = ax.text(0.5, 1.0, '', transform=ax.transAxes, ha='center', va='top',
+                          fontsize=11, fontweight='bold')
         ax.axis('off')
         ax.set_aspect('equal')
         
@@ -248,6 +201,120 @@ class NetworkVisualizer:
             Patch(facecolor='lightgray', label='Inactive Connection')
         ]
         ax.legend(handles=legend_elements, loc='upper left', fontsize=9)
+        
+        self._artists = {
+            'ax': ax,
+            'graph': self.G,
+            'edges': edges,
+            'nodes': nodes,
+            'labels': [labels[node_id] for node_id in self.G.nodes()],
+            'active_edges': [],
+            'edge_labels': [],
+            'caption': caption,
+            'edge_weights': self.G.weights.copy(),  # Weights the edge patches are drawn with
+        }
+    
+    def _update_edge_artists(self, active_mask):
+        """Replace the active-edge overlay and follow weight changes of the base edges"""
+        artists = self._artists
+        ax = artists['ax']
+        weights = self.G.weights
+        
+        # Base edge widths (seen on the next full redraw)
+        for edge in np.flatnonzero(weights != artists['edge_weights']):
+            artists['edges'][edge].set_linewidth(weights[edge] * 2)
+        artists['edge_weights'] = weights.copy()
+        
+        for artist in artists['active_edges'] + artists['edge_labels']:
+            artist.remove()
+        artists['active_edges'] = []
+        artists['edge_labels'] = []
+        if not active_mask.any():
+            return
+        
+        nx_graph = self.G.to_networkx(attributes=False)
+        active_edges = list(zip(self.G.sources[active_mask].tolist(),
+                                self.G.targets[active_mask].tolist()))
+        active_weights = weights[active_mask]
+        
+        # Draw active edges (highlighted, thicker, brighter)
+        artists['active_edges'] = nx.draw_networkx_edges(nx_graph, self.pos, ax=ax,
+                                                         edgelist=active_edges,
+                                                         width=active_weights * 5,
+                                                         edge_color='#FF6600',  # Bright orange for active
+                                                         alpha=0.9,
+                                                         arrows=True,
+                                                         arrowsize=25,
+                                                         arrowstyle='->',
+                                                         connectionstyle='arc3,rad=0.1',
+                                                         style='dashed')  # Dashed to make active connections stand out
+        
+        # Add edge labels (weights) - only for active edges to reduce clutter
+        edge_labels = {edge: f"{weight:.2f}" 
+                      for edge, weight in zip(active_edges, active_weights.tolist())}
+        artists['edge_labels'] = list(nx.draw_networkx_edge_labels(nx_graph, self.pos, edge_labels, ax=ax,
+                                                                   font_size=7, alpha=0.9,
+                                                                   font_color='red').values())
+    
+    def draw_network(self, ax=None, step_info=None):
+        """
+        Draw the network visualization with dynamic connection highlighting
+        
+        The artists are created on the first call (or when the topology changes)
+        and only updated in place afterwards.
+        
+        Returns:
+            List of artists that changed, for blitting
+        """
+        if ax is None:
+            ax = self.ax
+        
+        recreated = (self._artists is None or self._artists['ax'] is not ax or
+                     self._artists['graph'] is not self.G)
+        if recreated:
+            self._create_artists(ax)
+        artists = self._artists
+        
+        # Detect active connections (just used for spike propagation)
+        active_mask = self._detect_active_connections()
+        self.active_mask = active_mask
+        self._update_edge_artists(active_mask)
+        
+        # Color nodes based on state: red if spiked, otherwise by potential
+        node_colors, node_sizes = node_style(self.G.potential, self.G.spiked,
+                                             base_size=300, size_range=200, spiked_size=800)
+        artists['nodes'].set_facecolor(node_colors)
+        artists['nodes'].set_sizes(node_sizes)
+        
+        # Labels with potential values
+        for node_id, label in enumerate(artists['labels']):
+            label.set_text(f"{node_id}\n{self.G.potential[node_id]:.2f}\n({self.G.spike_count[node_id]})")
+        
+        # Step information
+        artists['caption'].set_text(f"Step {step_info}" if step_info is not None else '')
+        
+        changed = [*artists['active_edges'], artists['nodes'], *artists['labels'],
+                   *artists['edge_labels'], artists['caption']]
+        if recreated:
+            self._recapture_blit_background(changed)
+        return changed
+    
+    def _recapture_blit_background(self, changed):
+        """
+        Redraw the static artists and drop the cached blit background
+        
+        FuncAnimation only copies the background again when the axis view
+        changes, so after a topology change it would keep restoring the old
+        edges. The figure is redrawn without the per-frame artists and the
+        cache is cleared, so the next blit copies the new background.
+        """
+        ani = self._animation
+        if ani is None or not ani._blit:
+            return
+        for artist in changed:
+            artist.set_animated(True)
+        self.fig.canvas.draw()
+        ani._blit_cache.clear()
     
     def show_static(self):
         """Show a static visualization"""
@@ -261,46 +328,16 @@ class NetworkVisualizer:
         Load multiple time step files for animation
         
         Args:
-            base_filename: Base filename (e.g., 'network_step0.json')
+            base_filename: Base filename (e.g., 'network_step0.json') or run file (.snnr)
             num_steps: Number of steps to load (None = auto-detect)
         """
-        import os
-        import re
-        
-        # Extract base path and pattern
-        match = re.search(r'(.+)_step\d+\.json$', base_filename)
-        if match:
-            base_path = match.group(1)
-            pattern = f"{base_path}_step(\\d+)\\.json"
-        else:
-            # Try to find step files
-            base_path = base_filename.replace('.json', '')
-            pattern = f"{base_path}_step(\\d+)\\.json"
-        
-        # Find all step files
-        step_files = []
-        dir_path = os.path.dirname(base_filename) if os.path.dirname(base_filename) else '.'
-        for filename in os.listdir(dir_path):
-            match = re.match(pattern, filename)
-            if match:
-                step_num = int(match.group(1))
-                step_files.append((step_num, os.path.join(dir_path, filename)))
-        
-        step_files.sort(key=lambda x: x[0])
-        
-        if num_steps:
-            step_files = step_files[:num_steps]
-        
-        # Load all time steps
-        self.time_steps = []
-        for step_num, filepath in step_files:
-            with open(filepath, 'r') as f:
-                self.time_steps.append(json.load(f))
-        
-        if not self.time_steps:
-            raise ValueError(f"No time step files found matching pattern: {pattern}")
-        
-        print(f"Loaded {len(self.time_steps)} time steps")
+        # Index all steps; frames are decoded on first access
+        self.time_steps = open_frame_store(base_filename, num_steps)
+        
+        if not len(self.time_steps):
+            raise ValueError(f"No time step files found for: {base_filename}")
+        
+        print(f"Indexed {len(self.time_steps)} time steps")
         return len(self.time_steps)
     
     def animate_time_series(self, interval=0.8, loop=True):
@@ -311,7 +348,7 @@ class NetworkVisualizer:
             interval: Time between frames in seconds
             loop: Whether to loop the animation
         """
-        if not self.time_steps:
+        if self.time_steps is None or not len(self.time_steps):
             raise ValueError("No time steps loaded. Use load_time_series() first.")
         
         self.fig, self.ax = plt.subplots(figsize=(16, 10))
@@ -321,6 +358,9 @@ class NetworkVisualizer:
         self.previous_data = None
         self._build_graph()
         
+        # Only the per-frame artists are redrawn when the backend can blit
+        blit = self.fig.canvas.supports_blit
+        
         def update_frame(frame):
             try:
                 step_idx = frame % len(self.time_steps) if loop else min(frame, len(self.time_steps) - 1)
@@ -329,83 +369,109 @@ class NetworkVisualizer:
                 self.current_data = self.time_steps[step_idx]
                 self.update_data(self.current_data)
                 
-                self.draw_network(step_info=step_idx)
+                changed = self.draw_network(step_info=step_idx)
                 
                 # Update connection activity tracking
-                active = self._detect_active_connections()
-                for edge in active:
-                    if edge not in self.connection_activity:
-                        self.connection_activity[edge] = 0
-                    self.connection_activity[edge] += 1
+                self._record_activity(self.active_mask)
+                return changed
                 
             except Exception as e:
                 print(f"Error updating frame: {e}")
+                return []
         
         ani = animation.FuncAnimation(self.fig, update_frame, 
                                      interval=int(interval * 1000),
-                                     blit=False, cache_frame_data=False,
+                                     blit=blit, cache_frame_data=False,
                                      repeat=loop)
+        self._animation = ani
         plt.tight_layout()
         plt.show()
         return ani
     
-    def animate(self, json_file=None, callback=None):
+    def animate(self, json_file=None, callback=None, stream=None):
         """
-        Create animated visualization that updates from file or callback
+        Create animated visualization that updates from file, callback or live stream
+        
+        Only new data is drawn: the file is re-read when its modification time or
+        size changes, and a stream frame is drawn once when it arrives.
         
         Args:
             json_file: Path to JSON file that gets updated
             callback: Function that returns new JSON data
+            stream: FrameStreamReader receiving frames from a running simulator
         """
         self.fig, self.ax = plt.subplots(figsize=(14, 10))
+        blit = self.fig.canvas.supports_blit
+        last_stat = [None]
+        
+        def poll_file():
+            try:
+                st = os.stat(json_file)
+            except OSError:
+                return None
+            signature = (st.st_mtime_ns, st.st_size)
+            if signature == last_stat[0]:
+                return None
+            try:
+                new_data = load_network_state(json_file)
+            except ValueError:
+                return None  # Caught the writer mid-write; retry on the next tick
+            last_stat[0] = signature
+            return new_data
         
         def update_frame(frame):
             try:
-                if json_file:
-                    # Reload from file
-                    with open(json_file, 'r') as f:
-                        new_data = json.load(f)
-                    self.previous_data = self.current_data
-                    self.update_data(new_data)
+                if stream is not None:
+                    new_data = stream.latest()
+                elif json_file:
+                    new_data = poll_file()
                 elif callback:
-                    # Get new data from callback
                     new_data = callback()
-                    if new_data:
-                        self.previous_data = self.current_data
-                        self.update_data(new_data)
+                else:
+                    new_data = None
                 
-                self.draw_network()
+                if new_data:
+                    self.previous_data = self.current_data
+                    self.update_data(new_data)
+                elif self._artists is not None:
+                    return []  # Nothing new, keep the last frame on screen
+                
+                return self.draw_network()
             except Exception as e:
                 print(f"Error updating frame: {e}")
+                return []
         
         ani = animation.FuncAnimation(self.fig, update_frame, 
                                      interval=int(self.update_interval * 1000),
-                                     blit=False, cache_frame_data=False)
+                                     blit=blit, cache_frame_data=False)
+        self._animation = ani
         plt.tight_layout()
         plt.show()
         return ani
     
     def show_connection_statistics(self):
         """Print statistics about connection usage"""
-        if not self.connection_activity:
+        if self.connection_activity is None or not self.connection_activity.any():
             print("No connection activity data available.")
             return
         
         print("\n=== Connection Activity Statistics ===")
-        sorted_connections = sorted(self.connection_activity.items(), 
-                                   key=lambda x: x[1], reverse=True)
+        counts = self.connection_activity
+        top = np.argsort(counts, kind='stable')[::-1][:10]
         
         print(f"\nMost Active Connections (used {len(self.time_steps)} time steps):")
-        for (from_node, to_node), count in sorted_connections[:10]:
-            print(f"  {from_node} -> {to_node}: {count} activations")
+        for edge in top:
+            if counts[edge] == 0:
+                break
+            print(f"  {self.G.sources[edge]} -> {self.G.targets[edge]}: {counts[edge]} activations")
         
-        print(f"\nTotal unique connections used: {len(self.connection_activity)}")
-        print(f"Total activations: {sum(self.connection_activity.values())}")
+        print(f"\nTotal unique connections used: {np.count_nonzero(counts)}")
+        print(f"Total activations: {int(counts.sum())}")
 
 
 def main():
     parser = argparse.ArgumentParser(description='Visualize spike neural network')
-    parser.add_argument('json_file', nargs='?', help='JSON file with network data')
+    parser.add_argument('json_file', nargs='?', help='JSON or .snn snapshot file with network data')
     parser.add_argument('--animate', action='store_true', 
                        help='Animate visualization (updates from file)')
     parser.add_argument('--time-series', action='store_true',
@@ -418,9 +484,29 @@ def main():
                        help='Don\'t loop the animation')
     parser.add_argument('--stats', action='store_true',
                        help='Show connection activity statistics after animation')
+    parser.add_argument('--stream', type=str, default=None, metavar='ADDRESS',
+                       help='Show frames streamed live by a simulator '
+                            '(unix:/path/to.sock, a named pipe path or shm:<name>)')
     
     args = parser.parse_args()
     
+    if args.stream:
+        print(f"Waiting for a simulator on {args.stream} "
+              f"(e.g. ./simulate_spiking net.json 0 100 --stream {args.stream})...")
+        reader = open_live_stream(args.stream)
+        try:
+            first_frame = reader.wait()
+            visualizer = NetworkVisualizer(data=first_frame, update_interval=args.interval)
+            print("Streaming live. Close the window to stop.")
+            visualizer.animate(stream=reader)
+            print(f"Received {reader.frames_received} frames, "
+                  f"dropped {reader.frames_dropped} stale frames")
+        except KeyboardInterrupt:
+            pass
+        finally:
+            reader.close()
+        return
+    
     if not args.json_file:
         print("Usage: python visualize_network.py <json_file> [options]")
         print("\nOptions:")
@@ -430,10 +516,12 @@ def main():
         print("  --steps <num>      Number of steps to load (default: auto-detect)")
         print("  --no-loop          Don't loop the animation")
         print("  --stats            Show connection statistics after animation")
+        print("  --stream <addr>    Show frames streamed live by a simulator")
         print("\nExamples:")
         print("  python visualize_network.py network_step0.json")
         print("  python visualize_network.py network_step0.json --time-series")
         print("  python visualize_network.py network.json --animate --interval 0.5")
+        print("  python visualize_network.py --stream unix:/tmp/snn.sock")
         sys.exit(1)
     
     try:
@@ -53,7 +53,7 @@ def create_code_structure_diagram():
         'has_spiked (bool)',
         'spike_count (int)',
         'last_spike_time (int)',
-        'spike_history (vector<int>)'
+        'spike_history (ring of 100 int)'
     ]
     
     y_pos = 11.2
@@ -386,7 +386,7 @@ def create_method_call_flow():
     
     learning_steps = [
         '5. set_time_step(time) - Called after update()',
-        '    • If has_spiked: record last_spike_time and add to spike_history',
+        '    • If has_spiked: record last_spike_time and add to spike_history ring',
         '6. update_stdp(current_time, learning_rate)',
         '    • For each connection:',
         '    • Get post-synaptic neuron last_spike_time',